@@ -0,0 +1,264 @@
+"""キー入力を専用スレッドで非同期に送信するアクチュエーション。
+
+検知スレッドはキューにキーイベントを積むだけで戻り、
+入力の注入（PyAutoGUIのポーズやフェイルセーフ確認を含む）を待ちません。
+送信先はバックエンドとして差し替えられます。
+"""
+
+from __future__ import annotations
+
+import queue
+import sys
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, Final, Optional, Protocol
+
+from gesturner.key_controller import KeyRecorder
+from gesturner.metrics import METRICS
+
+
+@dataclass
+class KeyEvent:
+    """キューに積まれたキー入力。
+
+    Attributes:
+        key: キー名（"up", "down" など）
+        enqueued_at: キューに積んだ時刻（time.perf_counter）
+        emitted_at: 送信が完了した時刻（未送信の場合はNone）
+        frame_time: キーを送信すべきと判定したフレームの取得時刻（不明な場合はNone）
+    """
+
+    key: str
+    enqueued_at: float
+    emitted_at: Optional[float] = None
+    frame_time: Optional[float] = None
+
+    @property
+    def latency_ms(self) -> Optional[float]:
+        """キューに積んでから送信が完了するまでの時間（ミリ秒）。"""
+        if self.emitted_at is None:
+            return None
+        return (self.emitted_at - self.enqueued_at) * 1000.0
+
+
+class KeyBackend(Protocol):
+    """キー入力の送信先。"""
+
+    def press(self, key: str) -> None:
+        """キーを1回押して離します。"""
+        ...
+
+
+class PyAutoGuiBackend:
+    """PyAutoGUIでキー入力を送信するバックエンド。"""
+
+    def __init__(self) -> None:
+        """PyAutoGuiBackendを初期化します。"""
+        import pyautogui
+
+        # 専用スレッドで送信するため、呼び出しごとのポーズは不要
+        pyautogui.PAUSE = 0
+        self._pyautogui = pyautogui
+
+    def press(self, key: str) -> None:
+        """キーを1回押して離します。
+
+        Args:
+            key: PyAutoGUIのキー名
+        """
+        self._pyautogui.press(key)
+
+
+class Win32Backend:
+    """Win32 API（keybd_event）で直接キー入力を送信するバックエンド。"""
+
+    VIRTUAL_KEYS: Final[Dict[str, int]] = {
+        "pageup": 0x21,
+        "pagedown": 0x22,
+        "end": 0x23,
+        "home": 0x24,
+        "left": 0x25,
+        "up": 0x26,
+        "right": 0x27,
+        "down": 0x28,
+        "enter": 0x0D,
+        "escape": 0x1B,
+        "space": 0x20,
+        "tab": 0x09,
+        "backspace": 0x08,
+    }
+    EXTENDED_KEYS: Final[frozenset[str]] = frozenset(
+        {"pageup", "pagedown", "end", "home", "left", "up", "right", "down"}
+    )
+
+    def __init__(self) -> None:
+        """Win32Backendを初期化します。
+
+        Raises:
+            RuntimeError: Windows以外で実行した場合
+        """
+        if sys.platform != "win32":
+            raise RuntimeError("The os key backend is only available on Windows")
+        import win32api  # type: ignore
+        import win32con  # type: ignore
+
+        self._win32api: Any = win32api
+        self._win32con: Any = win32con
+
+    def press(self, key: str) -> None:
+        """キーを1回押して離します。
+
+        Args:
+            key: VIRTUAL_KEYS に定義されたキー名
+        """
+        vk: int = self.VIRTUAL_KEYS[key]
+        flags: int = (
+            self._win32con.KEYEVENTF_EXTENDEDKEY if key in self.EXTENDED_KEYS else 0
+        )
+        self._win32api.keybd_event(vk, 0, flags, 0)
+        self._win32api.keybd_event(vk, 0, flags | self._win32con.KEYEVENTF_KEYUP, 0)
+
+
+# 選択可能なバックエンド（"recorder" は送信せずにメモリ上に記録する。テスト用）
+BACKENDS: Final[Dict[str, Callable[[], KeyBackend]]] = {
+    "pyautogui": PyAutoGuiBackend,
+    "os": Win32Backend,
+    "recorder": KeyRecorder,
+}
+
+
+def supported_keys(backend_name: str) -> Optional[frozenset[str]]:
+    """バックエンドが送信できるキー名を返します。
+
+    Args:
+        backend_name: BACKENDS のキー
+
+    Returns:
+        送信できるキー名（制限が無い、または確認できない場合はNone）
+    """
+    if backend_name == "os":
+        return frozenset(Win32Backend.VIRTUAL_KEYS)
+    if backend_name == "pyautogui":
+        try:
+            import pyautogui
+        except Exception:  # ディスプレイの無い環境では読み込めない
+            return None
+        return frozenset(pyautogui.KEYBOARD_KEYS)
+    return None
+
+
+class KeyActuator:
+    """キーイベントをキューから取り出して送信するワーカー。
+
+    インスタンスは KeySender として GestureController に渡せます。
+    同じキーが短い間隔で連続して積まれた場合は1回にまとめます。間隔はキューに
+    積んだ時刻ではなくフレームの取得時刻で測るため、推論や送信の遅れに左右されず、
+    リプレイでも同じ結果になります。
+    """
+
+    def __init__(
+        self,
+        backend: KeyBackend,
+        dedupe_window: float = 0.3,
+        on_emit: Optional[Callable[[KeyEvent], None]] = None,
+    ) -> None:
+        """KeyActuatorを初期化し、ワーカースレッドを起動します。
+
+        Args:
+            backend: キー入力の送信先
+            dedupe_window: 同じキーを1回にまとめる間隔（フレームの取得時刻での秒数）。
+                キーを割り当てたジェスチャーの保持時間より短くする
+            on_emit: 送信完了時に呼び出す関数（ワーカースレッドから呼ばれる）
+        """
+        self.backend: KeyBackend = backend
+        self.dedupe_window: float = dedupe_window
+        self.on_emit: Optional[Callable[[KeyEvent], None]] = on_emit
+        self.history: Deque[KeyEvent] = deque(maxlen=256)  # 送信済みのイベント
+        self.dropped: int = 0  # まとめられて送信されなかったイベント数
+
+        self._queue: queue.SimpleQueue[Optional[KeyEvent]] = queue.SimpleQueue()
+        # キーごとの最後に送信したフレームの取得時刻（ワーカースレッドのみが使う）
+        self._last_frame_time: Dict[str, float] = {}
+        self._thread: threading.Thread = threading.Thread(
+            target=self._worker, daemon=True
+        )
+        self._thread.start()
+
+    def __call__(self, key: str, timestamp: Optional[float] = None) -> None:
+        """キーを送信キューに積みます（KeySenderとしての呼び出し）。
+
+        Args:
+            key: キー名
+            timestamp: キーを送信すべきと判定したフレームの取得時刻（秒）
+        """
+        self.submit(key, timestamp)
+
+    def submit(self, key: str, frame_time: Optional[float] = None) -> None:
+        """キーを送信キューに積みます。ブロックせずにすぐ戻ります。
+
+        Args:
+            key: キー名
+            frame_time: キーを送信すべきと判定したフレームの取得時刻（秒）。
+                Noneの場合はまとめずに送信する
+        """
+        self._queue.put(KeyEvent(key, time.perf_counter(), frame_time=frame_time))
+
+    def close(self) -> None:
+        """キューに残ったイベントを送信し、ワーカースレッドを終了します。"""
+        self._queue.put(None)
+        self._thread.join(timeout=1.0)
+
+    def _worker(self) -> None:
+        """キューからイベントを取り出して送信するループ。"""
+        while True:
+            event: Optional[KeyEvent] = self._queue.get()
+            if event is None:
+                break
+            if self._is_duplicate(event):
+                self.dropped += 1
+                METRICS.increment("dropped.keys")
+                continue
+            try:
+                with METRICS.span("key_press"):
+                    self.backend.press(event.key)
+            except Exception as e:  # 送信に失敗してもワーカーは止めない
+                print(f"[actuation] failed to press {event.key!r}: {e}")
+                continue
+            event.emitted_at = time.perf_counter()
+            self.history.append(event)
+            if self.on_emit is not None:
+                self.on_emit(event)
+
+    def _is_duplicate(self, event: KeyEvent) -> bool:
+        """直前に送信した同じキーから dedupe_window 秒以内のフレームのイベントかどうか。
+
+        Args:
+            event: キューから取り出したイベント
+
+        Returns:
+            まとめて送信しない場合True
+        """
+        if event.frame_time is None:
+            return False
+        last: Optional[float] = self._last_frame_time.get(event.key)
+        if last is not None and event.frame_time - last < self.dedupe_window:
+            return True
+        self._last_frame_time[event.key] = event.frame_time
+        return False
+
+
+def create_actuator(
+    backend_name: str, on_emit: Optional[Callable[[KeyEvent], None]] = None
+) -> KeyActuator:
+    """名前で指定したバックエンドを使うKeyActuatorを生成します。
+
+    Args:
+        backend_name: BACKENDS のキー（"pyautogui", "os", "recorder"）
+        on_emit: 送信完了時に呼び出す関数
+
+    Returns:
+        起動済みのKeyActuator
+    """
+    return KeyActuator(BACKENDS[backend_name](), on_emit=on_emit)
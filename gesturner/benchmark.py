@@ -0,0 +1,192 @@
+"""リプレイモードを使ったヘッドレスのベンチマーク。
+
+検知器の構成ごとに録画をリプレイし、処理速度・フレームごとの遅延・
+ジェスチャー開始からキー送信までの時間・ピークメモリを計測します。
+構成ごとに別プロセスで実行するため、ピークメモリは構成単位の値になります。
+
+使い方:
+    python -m gesturner.benchmark <動画ファイルまたは画像ディレクトリ> [--config adaptive+roi ...]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import multiprocessing
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from gesturner.controller import GestureController, ProcessResult
+from gesturner.replay import replay
+
+# 検知器の構成（GestureControllerへの引数）
+CONFIGURATIONS: Dict[str, Dict[str, Any]] = {
+    "baseline": {"adaptive": False, "roi_tracking": False},
+    "adaptive": {"adaptive": True, "roi_tracking": False},
+    "roi": {"adaptive": False, "roi_tracking": True},
+    "adaptive+roi": {"adaptive": True, "roi_tracking": True},
+    "lite+roi": {"adaptive": False, "roi_tracking": True, "tier": "lite"},
+}
+
+
+@dataclass
+class BenchmarkReport:
+    """1構成分のベンチマーク結果。
+
+    Attributes:
+        config: 構成名
+        frames: 処理したフレーム数
+        fps: 1秒あたりの処理フレーム数
+        p50_ms: フレームごとの処理時間の中央値（ミリ秒）
+        p95_ms: フレームごとの処理時間の95パーセンタイル（ミリ秒）
+        p99_ms: フレームごとの処理時間の99パーセンタイル（ミリ秒）
+        keys: 送信されたキーの数
+        onset_to_key_ms: ジェスチャー開始からキー送信までの平均時間（ミリ秒）
+        peak_memory_mb: ピークメモリ使用量（MB、取得できない環境ではNone）
+    """
+
+    config: str
+    frames: int
+    fps: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    keys: int
+    onset_to_key_ms: Optional[float]
+    peak_memory_mb: Optional[float]
+
+
+def _peak_memory_mb() -> Optional[float]:
+    """現在のプロセスのピーク常駐メモリ（MB）を返します。"""
+    if sys.platform == "win32":
+        return None  # resource モジュールが無い
+    import resource
+
+    peak: int = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux は KB 単位、macOS は byte 単位
+    return peak / (1024.0 * 1024.0) if sys.platform == "darwin" else peak / 1024.0
+
+
+def benchmark(source: str, config: str, fps: float = 30.0) -> BenchmarkReport:
+    """1つの構成で録画をリプレイし、計測結果を返します。
+
+    Args:
+        source: 動画ファイルのパス、または画像ファイルを含むディレクトリ
+        config: CONFIGURATIONS の構成名
+        fps: 連番画像に使うフレームレート
+
+    Returns:
+        ベンチマーク結果
+    """
+    controller: GestureController = GestureController(**CONFIGURATIONS[config])
+
+    process_ms: List[float] = []
+    onset_to_key_ms: List[float] = []
+    # ジェスチャーごとの開始時刻（動画上の時刻）
+    onsets: Dict[str, Optional[float]] = {"down": None, "up": None}
+
+    start: float = time.perf_counter()
+    for frame in replay(source, controller, fps):
+        process_ms.append(frame.process_ms)
+
+        result: ProcessResult = frame.result
+        active: Dict[str, bool] = {
+            "down": result["mouth_detected"],
+            "up": result["gaze_direction"] == "UP",
+        }
+        for key, is_active in active.items():
+            if not is_active:
+                onsets[key] = None
+            elif onsets[key] is None:
+                onsets[key] = frame.timestamp
+
+        for key in frame.keys:
+            onset: Optional[float] = onsets.get(key)
+            if onset is not None:
+                # 保持時間（動画上の時刻）にキー送信フレームの処理時間を加える
+                onset_to_key_ms.append(
+                    (frame.timestamp - onset) * 1000.0 + frame.process_ms
+                )
+            # キー送信後は次のフレームから保持をやり直す
+            onsets[key] = None
+    elapsed: float = time.perf_counter() - start
+
+    latencies: np.ndarray = np.asarray(process_ms, dtype=np.float64)
+    p50, p95, p99 = (
+        np.percentile(latencies, [50, 95, 99]) if latencies.size else (0.0, 0.0, 0.0)
+    )
+    return BenchmarkReport(
+        config=config,
+        frames=int(latencies.size),
+        fps=latencies.size / elapsed if elapsed > 0 else 0.0,
+        p50_ms=float(p50),
+        p95_ms=float(p95),
+        p99_ms=float(p99),
+        keys=len(onset_to_key_ms),
+        onset_to_key_ms=(float(np.mean(onset_to_key_ms)) if onset_to_key_ms else None),
+        peak_memory_mb=_peak_memory_mb(),
+    )
+
+
+def run() -> None:
+    """ベンチマークを実行し、結果を表形式で表示します。
+
+    --max-p95 を指定した場合、いずれかの構成の95パーセンタイルが
+    上限を超えると終了コード1で終了します（CIでの回帰検出用）。
+    """
+    parser = argparse.ArgumentParser(description="Benchmark the detection pipeline")
+    parser.add_argument("source", help="Video file or directory of images")
+    parser.add_argument(
+        "--config",
+        action="append",
+        choices=sorted(CONFIGURATIONS),
+        help="Configuration to benchmark (repeatable, default: all)",
+    )
+    parser.add_argument(
+        "--fps", type=float, default=30.0, help="Frame rate for image sequences"
+    )
+    parser.add_argument("--json", help="Write results as JSON to this path")
+    parser.add_argument(
+        "--max-p95", type=float, help="Fail if any p95 latency exceeds this (ms)"
+    )
+    args = parser.parse_args()
+
+    configs: List[str] = args.config or list(CONFIGURATIONS)
+    reports: List[BenchmarkReport] = []
+    # 構成ごとに新しいプロセスで計測し、ピークメモリが混ざらないようにする
+    context = multiprocessing.get_context("spawn")
+    for config in configs:
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            reports.append(
+                executor.submit(benchmark, args.source, config, args.fps).result()
+            )
+
+    print(
+        f"{'config':<14}{'frames':>8}{'fps':>9}{'p50':>9}{'p95':>9}{'p99':>9}"
+        f"{'keys':>6}{'onset->key':>12}{'peak MB':>10}"
+    )
+    for r in reports:
+        onset: str = (
+            f"{r.onset_to_key_ms:.0f}" if r.onset_to_key_ms is not None else "-"
+        )
+        memory: str = f"{r.peak_memory_mb:.0f}" if r.peak_memory_mb is not None else "-"
+        print(
+            f"{r.config:<14}{r.frames:>8}{r.fps:>9.1f}{r.p50_ms:>9.2f}"
+            f"{r.p95_ms:>9.2f}{r.p99_ms:>9.2f}{r.keys:>6}{onset:>12}{memory:>10}"
+        )
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump([asdict(r) for r in reports], f, indent=2)
+
+    if args.max_p95 is not None and any(r.p95_ms > args.max_p95 for r in reports):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,409 @@
+"""記録したセッションを使った閾値と保持時間の一括キャリブレーション。
+
+ページめくりの瞬間をラベル付けしたセッションに対して、
+閾値と保持時間の組み合わせを格子状に評価し、誤送信率・見逃し率・
+送信遅延を求めます。最も良い組み合わせはプロファイルとして保存します。
+
+ラベルファイルはCSV形式で、1行に「時刻（秒）,キー（down または up）」を記述します。
+動画ファイルを指定した場合は、最初に一度だけ推論して <動画>.gtlm に記録します。
+
+使い方:
+    python -m gesturner.calibration --session session.gtlm labels.csv -o profile.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from gesturner.filters import hysteresis_mask, smooth_series
+from gesturner.gestures import BUILTIN_RULES, GestureRule
+from gesturner.landmarks import NUM_REFINED_LANDMARKS, iris_ratio, mouth_open_ratio
+from gesturner.profile import Profile
+from gesturner.recording import MAGIC, LandmarkRecorder, LandmarkRecording
+
+# ラベルの直前に送信されても正解とみなす時間（秒）
+EARLY_TOLERANCE: float = 0.5
+
+# キーごとに評価するジェスチャーのルール（ヒステリシスと向きを使う）
+KEY_RULES: Dict[str, GestureRule] = {
+    "down": BUILTIN_RULES["mouth_open"],
+    "up": BUILTIN_RULES["look_up"],
+}
+
+
+@dataclass
+class Session:
+    """キャリブレーション用に特徴量を取り出したセッション。
+
+    Attributes:
+        timestamps: フレームの時刻（秒、全セッションを通して単調増加）
+        mouth_ratio: フレームごとの口の開きの比率（平滑化済み、顔が無い場合はNaN）
+        iris_ratio: フレームごとの虹彩の相対位置（平滑化済み、顔が無い場合はNaN）
+        labels: キー名ごとのページめくりの時刻（秒）
+        duration: セッションの長さ（秒）
+    """
+
+    timestamps: np.ndarray
+    mouth_ratio: np.ndarray
+    iris_ratio: np.ndarray
+    labels: Dict[str, np.ndarray]
+    duration: float
+
+
+@dataclass
+class SweepResult:
+    """1つのパラメータの組み合わせの評価結果。
+
+    Attributes:
+        key: 評価したキー名（"down" または "up"）
+        threshold: 閾値
+        duration: 保持時間（秒）
+        false_per_min: 1分あたりの誤送信数
+        missed_rate: 見逃したラベルの割合
+        latency_ms: ラベルからキー送信までの平均時間（ミリ秒）
+    """
+
+    key: str
+    threshold: float
+    duration: float
+    false_per_min: float
+    missed_rate: float
+    latency_ms: float
+
+
+def load_labels(path: str) -> Dict[str, np.ndarray]:
+    """ラベルファイルを読み込みます。
+
+    Args:
+        path: 「時刻,キー」形式のCSVファイル（ヘッダー行と # で始まる行は無視）
+
+    Returns:
+        キー名ごとの時刻の配列（昇順）
+    """
+    labels: Dict[str, List[float]] = {"down": [], "up": []}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            parts: List[str] = [p.strip() for p in line.split(",")]
+            if len(parts) < 2 or parts[0].startswith("#"):
+                continue
+            try:
+                timestamp: float = float(parts[0])
+            except ValueError:
+                continue  # ヘッダー行
+            if parts[1] in labels:
+                labels[parts[1]].append(timestamp)
+    return {k: np.sort(np.asarray(v, dtype=np.float64)) for k, v in labels.items()}
+
+
+def ensure_recording(path: str) -> LandmarkRecording:
+    """ランドマークの記録を開きます。動画の場合は推論して記録を作成します。
+
+    Args:
+        path: 記録ファイルまたは動画ファイル・画像ディレクトリのパス
+
+    Returns:
+        ランドマークの記録
+    """
+    if os.path.isfile(path):
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) == MAGIC:
+                return LandmarkRecording(path)
+
+    cached: str = path.rstrip("/\\") + ".gtlm"
+    if not os.path.exists(cached):
+        from gesturner.controller import GestureController
+        from gesturner.key_controller import send_no_key
+        from gesturner.replay import replay
+
+        recorder: LandmarkRecorder = LandmarkRecorder(cached, NUM_REFINED_LANDMARKS)
+        controller: GestureController = GestureController(
+            adaptive=False, key_sender=send_no_key, recorder=recorder
+        )
+        for _ in replay(path, controller):
+            pass
+        recorder.close()
+    return LandmarkRecording(cached)
+
+
+def load_sessions(pairs: Sequence[Tuple[str, str]]) -> Session:
+    """複数のセッションを読み込み、時刻をずらして1つに連結します。
+
+    セッションの境界には顔の無いフレームを挟み、保持時間が跨らないようにします。
+
+    Args:
+        pairs: (記録または動画のパス, ラベルファイルのパス) の列
+
+    Returns:
+        連結したセッション
+    """
+    timestamps: List[np.ndarray] = []
+    mouth: List[np.ndarray] = []
+    iris: List[np.ndarray] = []
+    labels: Dict[str, List[np.ndarray]] = {"down": [], "up": []}
+    offset: float = 0.0
+    gap: np.ndarray = np.array([np.nan])
+
+    for recording_path, labels_path in pairs:
+        recording: LandmarkRecording = ensure_recording(recording_path)
+        t: np.ndarray = recording.timestamps.astype(np.float64) + offset
+        # 全フレームのランドマークを「顔」の軸としてまとめて計算する
+        landmarks: np.ndarray = recording.landmarks
+        timestamps += [t, np.array([t[-1] + 1.0 if t.size else offset])]
+        # GestureController と同じく、フレーム順に平滑化してから判定する
+        mouth += [smooth_series(t, mouth_open_ratio(landmarks)), gap]
+        iris += [smooth_series(t, iris_ratio(landmarks)), gap]
+        for key, times in load_labels(labels_path).items():
+            labels[key].append(times + offset)
+        offset = float(timestamps[-1][0]) + 1.0
+
+    return Session(
+        timestamps=np.concatenate(timestamps),
+        mouth_ratio=np.concatenate(mouth),
+        iris_ratio=np.concatenate(iris),
+        labels={k: np.concatenate(v) for k, v in labels.items()},
+        duration=offset,
+    )
+
+
+def simulate_triggers(
+    timestamps: np.ndarray, active: np.ndarray, duration: float
+) -> np.ndarray:
+    """GestureControllerの保持時間の判定を再現し、キー送信時刻を求めます。
+
+    ジェスチャーが継続している区間ごとに、開始から duration を超えた
+    最初のフレームで送信し、次のフレームから保持をやり直します。
+    全区間をまとめて searchsorted で処理するため、ループ回数は
+    1区間あたりの最大送信回数で済みます。
+
+    Args:
+        timestamps: フレームの時刻（昇順）
+        active: フレームごとにジェスチャーが検知されているかどうか
+        duration: キー送信までの継続時間（秒）
+
+    Returns:
+        キー送信時刻（昇順）
+    """
+    edges: np.ndarray = np.diff(np.concatenate(([0], active.view(np.int8), [0])))
+    starts: np.ndarray = np.flatnonzero(edges == 1)
+    ends: np.ndarray = np.flatnonzero(edges == -1) - 1  # 区間の最後のフレーム
+
+    triggers: List[np.ndarray] = []
+    while starts.size:
+        # 開始から duration を超えた最初のフレーム
+        fire: np.ndarray = np.searchsorted(
+            timestamps, timestamps[starts] + duration, side="right"
+        )
+        fired: np.ndarray = fire <= ends
+        triggers.append(timestamps[fire[fired]])
+        starts, ends = fire[fired] + 1, ends[fired]
+        remaining: np.ndarray = starts <= ends
+        starts, ends = starts[remaining], ends[remaining]
+
+    if not triggers:
+        return np.empty(0, dtype=timestamps.dtype)
+    return np.sort(np.concatenate(triggers))
+
+
+def score_triggers(
+    triggers: np.ndarray, labels: np.ndarray, max_latency: float
+) -> Tuple[int, int, float]:
+    """キー送信時刻をラベルと照合します。
+
+    各ラベルに対し、ラベルの EARLY_TOLERANCE 秒前から max_latency 秒後までの
+    最初の未使用の送信を正解とみなします。
+
+    Args:
+        triggers: キー送信時刻（昇順）
+        labels: ページめくりの時刻（昇順）
+        max_latency: ラベルから送信までの最大許容時間（秒）
+
+    Returns:
+        (誤送信数, 見逃し数, 正解した送信の平均遅延（秒、無い場合はNaN）)
+    """
+    used: np.ndarray = np.zeros(triggers.size, dtype=bool)
+    latencies: List[float] = []
+    missed: int = 0
+    for label in labels:
+        i: int = int(np.searchsorted(triggers, label - EARLY_TOLERANCE))
+        while i < triggers.size and used[i]:
+            i += 1
+        if i < triggers.size and triggers[i] <= label + max_latency:
+            used[i] = True
+            latencies.append(float(triggers[i] - label))
+        else:
+            missed += 1
+    mean_latency: float = float(np.mean(latencies)) if latencies else float("nan")
+    return int(triggers.size - used.sum()), missed, mean_latency
+
+
+def _sweep_thresholds(
+    key: str,
+    session: Session,
+    thresholds: np.ndarray,
+    durations: np.ndarray,
+    max_latency: float,
+) -> List[SweepResult]:
+    """閾値の一部について全ての保持時間を評価します（ワーカープロセスで実行）。"""
+    ratios: np.ndarray = session.mouth_ratio if key == "down" else session.iris_ratio
+    rule: GestureRule = KEY_RULES[key]
+    # 全ての閾値の検知状態を (閾値数, フレーム数) の配列でまとめて求める
+    # GestureEngine と同じく「上回ったら検知」に符号をそろえ、ヒステリシスを適用する
+    sign: float = 1.0 if rule.direction == "above" else -1.0
+    enter: np.ndarray = sign * thresholds[:, None]
+    active: np.ndarray = hysteresis_mask(
+        sign * ratios[None, :], enter, enter - rule.hysteresis
+    )
+
+    labels: np.ndarray = session.labels[key]
+    minutes: float = max(session.duration / 60.0, 1e-9)
+    results: List[SweepResult] = []
+    for threshold, row in zip(thresholds, active):
+        for duration in durations:
+            triggers: np.ndarray = simulate_triggers(
+                session.timestamps, row, float(duration)
+            )
+            false, missed, latency = score_triggers(triggers, labels, max_latency)
+            results.append(
+                SweepResult(
+                    key=key,
+                    threshold=float(threshold),
+                    duration=float(duration),
+                    false_per_min=false / minutes,
+                    missed_rate=missed / labels.size if labels.size else 0.0,
+                    latency_ms=latency * 1000.0,
+                )
+            )
+    return results
+
+
+def sweep(
+    key: str,
+    session: Session,
+    thresholds: np.ndarray,
+    durations: np.ndarray,
+    max_latency: float = 3.0,
+    workers: int = 0,
+) -> List[SweepResult]:
+    """閾値と保持時間の全ての組み合わせを、CPUコア数分のプロセスで評価します。
+
+    Args:
+        key: 評価するキー名（"down" は口の開き、"up" は上向きの視線）
+        session: 評価するセッション
+        thresholds: 閾値の候補
+        durations: 保持時間の候補（秒）
+        max_latency: ラベルから送信までの最大許容時間（秒）
+        workers: ワーカープロセス数（0の場合はCPUコア数）
+
+    Returns:
+        組み合わせごとの評価結果
+    """
+    workers = workers or os.cpu_count() or 1
+    chunks: List[np.ndarray] = [
+        c for c in np.array_split(thresholds, workers) if c.size
+    ]
+    results: List[SweepResult] = []
+    with ProcessPoolExecutor(max_workers=len(chunks)) as executor:
+        futures = [
+            executor.submit(
+                _sweep_thresholds, key, session, chunk, durations, max_latency
+            )
+            for chunk in chunks
+        ]
+        for future in futures:
+            results.extend(future.result())
+    return results
+
+
+def rank_key(result: SweepResult) -> Tuple[float, float, float]:
+    """評価結果の並び順（見逃し率、誤送信率、遅延の順に小さい順）を返します。
+
+    見逃し率（割合）と誤送信率（1分あたり）は単位が異なり、足し合わせると
+    セッションの長さで重みが変わるため、辞書式に比較します。
+    演奏中にページがめくられないことを最も避けるため、見逃しを優先します。
+
+    Args:
+        result: 評価結果
+
+    Returns:
+        昇順に並べるためのキー
+    """
+    latency: float = result.latency_ms
+    return (
+        result.missed_rate,
+        result.false_per_min,
+        latency if not np.isnan(latency) else float("inf"),
+    )
+
+
+def _parse_range(text: str) -> np.ndarray:
+    """「開始:終了:刻み」形式（終了を含む）の文字列を配列に変換します。"""
+    start, stop, step = (float(v) for v in text.split(":"))
+    return np.round(np.arange(start, stop + step / 2.0, step), 6)
+
+
+def run() -> None:
+    """キャリブレーションを実行し、結果の上位とプロファイルを出力します。"""
+    parser = argparse.ArgumentParser(description="Calibrate thresholds and durations")
+    parser.add_argument(
+        "--session",
+        nargs=2,
+        action="append",
+        required=True,
+        metavar=("RECORDING", "LABELS"),
+        help="Landmark recording (or video) and its labels CSV (repeatable)",
+    )
+    parser.add_argument("--mouth-thresholds", default="0.02:0.10:0.005")
+    parser.add_argument("--up-thresholds", default="0.25:0.48:0.01")
+    parser.add_argument("--durations", default="0.2:1.5:0.05")
+    parser.add_argument("--max-latency", type=float, default=3.0)
+    parser.add_argument("--workers", type=int, default=0)
+    parser.add_argument("--top", type=int, default=5, help="Rows to print per key")
+    parser.add_argument("-o", "--output", help="Write the best profile to this path")
+    args = parser.parse_args()
+
+    session: Session = load_sessions([tuple(p) for p in args.session])
+    durations: np.ndarray = _parse_range(args.durations)
+    grids: Dict[str, np.ndarray] = {
+        "down": _parse_range(args.mouth_thresholds),
+        "up": _parse_range(args.up_thresholds),
+    }
+
+    profile: Profile = Profile()
+    for key, thresholds in grids.items():
+        if session.labels[key].size == 0:
+            continue
+        results: List[SweepResult] = sweep(
+            key, session, thresholds, durations, args.max_latency, args.workers
+        )
+        ranked: List[SweepResult] = sorted(results, key=rank_key)
+        print(
+            f"[{key}] {'threshold':>10}{'duration':>10}{'false/min':>11}"
+            f"{'missed':>8}{'latency':>10}"
+        )
+        for r in ranked[: args.top]:
+            print(
+                f"[{key}] {r.threshold:>10.3f}{r.duration:>10.2f}"
+                f"{r.false_per_min:>11.3f}{r.missed_rate:>8.2%}{r.latency_ms:>8.0f}ms"
+            )
+
+        best: SweepResult = ranked[0]
+        if key == "down":
+            profile.mouth_threshold = best.threshold
+            profile.look_down_duration = best.duration
+        else:
+            profile.gaze_up_threshold = best.threshold
+            profile.look_up_duration = best.duration
+
+    if args.output:
+        profile.save(args.output)
+        print(f"Profile written to {args.output}")
+
+
+if __name__ == "__main__":
+    run()
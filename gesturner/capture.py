@@ -0,0 +1,421 @@
+"""カメラ・動画からの映像入力。
+
+デバイス番号・キャプチャバックエンド・解像度・FPS・FOURCC・バッファサイズを指定して開き、
+デバイスが実際に受け入れた設定（ネゴシエーション結果）を報告します。
+多くのWebカメラは既定で高解像度の非圧縮（YUYV）ストリームを出力し、
+USB帯域とデコードのコストが大きくなるため、既定では 640x480 の MJPEG を要求します。
+
+使い方（対応するモードの一覧と読み出しコストを計測）:
+    python -m gesturner.capture [--source 0] [--capture-backend dshow]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import time
+from dataclasses import dataclass, replace
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+# OpenCVは読み込みに時間がかかるため、起動時にオーバーレイを先に表示できるよう
+# モジュールの読み込み時ではなく、映像入力を開く時点で読み込む（cv2 は各メソッドで参照）
+
+# 選択可能なキャプチャバックエンド（cv2 の定数名）
+CAPTURE_BACKENDS: Dict[str, str] = {
+    "auto": "CAP_ANY",
+    "dshow": "CAP_DSHOW",
+    "msmf": "CAP_MSMF",
+    "v4l2": "CAP_V4L2",
+    "avfoundation": "CAP_AVFOUNDATION",
+    "gstreamer": "CAP_GSTREAMER",
+    "ffmpeg": "CAP_FFMPEG",
+}
+
+# probe で試すモード（幅, 高さ, FOURCC）。FaceMeshの入力には 640x480 で十分
+PROBE_MODES: Tuple[Tuple[int, int, str], ...] = (
+    (320, 240, "MJPG"),
+    (640, 480, "MJPG"),
+    (640, 480, "YUYV"),
+    (1280, 720, "MJPG"),
+    (1280, 720, "YUYV"),
+)
+
+
+@dataclass
+class CaptureSettings:
+    """映像入力の設定。
+
+    Attributes:
+        source: カメラのデバイス番号、または動画ファイルのパス
+        backend: CAPTURE_BACKENDS のキー
+        width: 要求する幅（Noneの場合はドライバの既定値）
+        height: 要求する高さ（Noneの場合はドライバの既定値）
+        fps: 要求するフレームレート（Noneの場合はドライバの既定値）
+        fourcc: 要求するピクセル形式（"MJPG", "YUYV" など。Noneの場合はドライバの既定値）
+        buffer_size: ドライバ側のバッファ数（古いフレームの滞留を防ぐため既定は1）
+        max_width: この幅を超えるフレームは取得時に縮小する（Noneの場合は縮小しない）
+    """
+
+    source: str = "0"
+    backend: str = "auto"
+    width: Optional[int] = 640
+    height: Optional[int] = 480
+    fps: Optional[float] = 30.0
+    fourcc: Optional[str] = "MJPG"
+    buffer_size: int = 1
+    max_width: Optional[int] = None
+
+    @property
+    def is_device(self) -> bool:
+        """カメラデバイスを指定しているかどうか（Falseの場合は動画ファイル）。"""
+        return self.source.isdigit()
+
+
+@dataclass
+class CaptureMode:
+    """デバイスが実際に受け入れた設定。
+
+    Attributes:
+        backend: 使用されたバックエンド名
+        width: フレームの幅
+        height: フレームの高さ
+        fps: フレームレート（取得できない場合は0）
+        fourcc: ピクセル形式（取得できない場合は空文字列）
+        output_width: 縮小後にパイプラインへ渡す幅
+        output_height: 縮小後にパイプラインへ渡す高さ
+    """
+
+    backend: str
+    width: int
+    height: int
+    fps: float
+    fourcc: str
+    output_width: int
+    output_height: int
+
+    def describe(self) -> str:
+        """1行の説明文を返します。"""
+        text: str = (
+            f"{self.width}x{self.height}@{self.fps:.1f} "
+            f"{self.fourcc or '?'} ({self.backend})"
+        )
+        if (self.output_width, self.output_height) != (self.width, self.height):
+            text += f" -> {self.output_width}x{self.output_height}"
+        return text
+
+
+def _decode_fourcc(value: float) -> str:
+    """CAP_PROP_FOURCC の数値を文字列に変換します。"""
+    code: int = int(value)
+    if code <= 0:
+        return ""
+    return "".join(chr((code >> (8 * i)) & 0xFF) for i in range(4)).strip("\0")
+
+
+class Capture:
+    """設定に従って開いた映像入力。
+
+    cv2.VideoCapture と同じ isOpened() / read() / release() を持ち、
+    Pipeline のキャプチャステージから使えます。
+    read() は max_width を超えるフレームを縮小して返します
+    （後段のスレッドが保持している間に上書きしないよう、バッファは再利用しません）。
+    読み出したフレームを取得した時刻（デコード前、time.perf_counter）は captured_at に残ります。
+    動画ファイルは realtime=True の場合、元のフレームレートに合わせて読み出します
+    （直前の read() で待機した時間は paced に残ります）。
+    """
+
+    def __init__(self, settings: CaptureSettings, realtime: bool = True) -> None:
+        """映像入力を開き、設定を要求します。
+
+        Args:
+            settings: 映像入力の設定
+            realtime: 動画ファイルを元のフレームレートで読み出すかどうか
+        """
+        import cv2
+
+        self.settings: CaptureSettings = settings
+        self.realtime: bool = realtime and not settings.is_device
+        api: int = getattr(cv2, CAPTURE_BACKENDS[settings.backend])
+        source: Union[int, str] = (
+            int(settings.source) if settings.is_device else settings.source
+        )
+        self._cap: cv2.VideoCapture = cv2.VideoCapture(source, api)
+        if settings.is_device and self._cap.isOpened():
+            self._configure()
+
+        self.mode: Optional[CaptureMode] = (
+            self._negotiated() if self.isOpened() else None
+        )
+        self._next_frame_at: Optional[float] = None
+        # 最後に読み出したフレームを取得した時刻（time.perf_counter）
+        self.captured_at: float = 0.0
+        # 最後の read() でフレームレートに合わせるために待機した時間（秒）
+        self.paced: float = 0.0
+
+    def _configure(self) -> None:
+        """デバイスに設定を要求します。
+
+        多くのドライバは FOURCC を先に設定しないと解像度の変更を受け付けないため、
+        FOURCC → 解像度 → FPS → バッファサイズの順に設定します。
+        """
+        import cv2
+
+        settings: CaptureSettings = self.settings
+        cap: cv2.VideoCapture = self._cap
+        if settings.fourcc:
+            cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter.fourcc(*settings.fourcc))
+        if settings.width:
+            cap.set(cv2.CAP_PROP_FRAME_WIDTH, settings.width)
+        if settings.height:
+            cap.set(cv2.CAP_PROP_FRAME_HEIGHT, settings.height)
+        if settings.fps:
+            cap.set(cv2.CAP_PROP_FPS, settings.fps)
+        # ドライバ側のバッファを最小にして古いフレームの滞留を防ぐ
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, settings.buffer_size)
+
+    def _negotiated(self) -> CaptureMode:
+        """デバイスが実際に受け入れた設定を読み出します。"""
+        import cv2
+
+        cap: cv2.VideoCapture = self._cap
+        width: int = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        height: int = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        output_width, output_height = width, height
+        max_width: Optional[int] = self.settings.max_width
+        if max_width and width > max_width:
+            output_width = max_width
+            output_height = max(1, round(height * max_width / width))
+        return CaptureMode(
+            backend=cap.getBackendName(),
+            width=width,
+            height=height,
+            fps=float(cap.get(cv2.CAP_PROP_FPS)),
+            fourcc=_decode_fourcc(cap.get(cv2.CAP_PROP_FOURCC)),
+            output_width=output_width,
+            output_height=output_height,
+        )
+
+    def isOpened(self) -> bool:
+        """映像入力が開いているかどうか。"""
+        return bool(self._cap.isOpened())
+
+    def read(self) -> Tuple[bool, Optional[np.ndarray]]:
+        """1フレームを読み出します。
+
+        Returns:
+            (成功したかどうか, BGR画像) の組
+        """
+        if self.realtime:
+            self._wait_for_next_frame()
+        # デコードの所要時間を含めないよう、取得（grab）直後の時刻を記録する
+        if not self._cap.grab():
+            return False, None
+        self.captured_at = time.perf_counter()
+        success: bool
+        frame: Optional[np.ndarray]
+        success, frame = self._cap.retrieve()
+        if not success or frame is None:
+            return False, None
+
+        max_width: Optional[int] = self.settings.max_width
+        if max_width and frame.shape[1] > max_width:
+            import cv2
+
+            height: int = max(1, round(frame.shape[0] * max_width / frame.shape[1]))
+            frame = cv2.resize(frame, (max_width, height), interpolation=cv2.INTER_AREA)
+        return True, frame
+
+    def _wait_for_next_frame(self) -> None:
+        """動画ファイルを元のフレームレートで読み出すために待機します。"""
+        fps: float = self.mode.fps if self.mode and self.mode.fps > 0 else 30.0
+        now: float = time.perf_counter()
+        self.paced = 0.0
+        if self._next_frame_at is not None and self._next_frame_at > now:
+            self.paced = self._next_frame_at - now
+            time.sleep(self.paced)
+            now = self._next_frame_at
+        self._next_frame_at = now + 1.0 / fps
+
+    def release(self) -> None:
+        """映像入力を閉じます。"""
+        self._cap.release()
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """映像入力の設定をコマンドライン引数として追加します。
+
+    Args:
+        parser: 引数を追加するパーサー
+    """
+    defaults: CaptureSettings = CaptureSettings()
+    group = parser.add_argument_group("capture")
+    group.add_argument(
+        "--source",
+        default=defaults.source,
+        help="Camera device index or video file path (default: 0)",
+    )
+    group.add_argument(
+        "--capture-backend",
+        choices=sorted(CAPTURE_BACKENDS),
+        default=defaults.backend,
+        help="OpenCV capture backend (default: auto)",
+    )
+    group.add_argument(
+        "--resolution",
+        default=f"{defaults.width}x{defaults.height}",
+        help="Requested capture resolution WxH, or 'default' (default: 640x480)",
+    )
+    group.add_argument(
+        "--capture-fps",
+        type=float,
+        default=defaults.fps,
+        help="Requested capture frame rate; 0 keeps the driver default",
+    )
+    group.add_argument(
+        "--fourcc",
+        default=defaults.fourcc,
+        help="Requested pixel format such as MJPG or YUYV, or 'default'",
+    )
+    group.add_argument(
+        "--buffer-size",
+        type=int,
+        default=defaults.buffer_size,
+        help="Driver-side frame buffer count (default: 1)",
+    )
+    group.add_argument(
+        "--max-width",
+        type=int,
+        help="Downscale frames wider than this at capture time",
+    )
+
+
+def parse_resolution(text: Optional[str]) -> Optional[Tuple[int, int]]:
+    """「幅x高さ」形式の解像度を解析します。
+
+    Args:
+        text: 解像度の文字列（"default" または空の場合はドライバの既定値）
+
+    Returns:
+        (幅, 高さ) の組（ドライバの既定値の場合はNone）
+
+    Raises:
+        ValueError: 形式が不正、または幅・高さが正でない場合
+    """
+    if not text or text == "default":
+        return None
+    try:
+        width, height = (int(v) for v in text.lower().split("x"))
+    except ValueError:
+        raise ValueError(f"Invalid resolution: {text}") from None
+    if width < 1 or height < 1:
+        raise ValueError(f"Invalid resolution: {text}")
+    return width, height
+
+
+def parse_fourcc(text: Optional[str]) -> Optional[str]:
+    """ピクセル形式（FOURCC）を解析します。
+
+    Args:
+        text: FOURCC の文字列（"default" または空の場合はドライバの既定値）
+
+    Returns:
+        4文字の FOURCC（ドライバの既定値の場合はNone）
+
+    Raises:
+        ValueError: 4文字でない場合
+    """
+    if not text or text == "default":
+        return None
+    if len(text) != 4:
+        raise ValueError(f"FOURCC must be 4 characters: {text}")
+    return text
+
+
+def settings_from_args(args: argparse.Namespace) -> CaptureSettings:
+    """add_arguments() で追加した引数から設定を作ります。
+
+    Args:
+        args: 解析済みの引数
+
+    Returns:
+        映像入力の設定
+
+    Raises:
+        ValueError: 解像度またはピクセル形式の形式が不正な場合
+    """
+    resolution: Optional[Tuple[int, int]] = parse_resolution(args.resolution)
+    width: Optional[int] = None if resolution is None else resolution[0]
+    height: Optional[int] = None if resolution is None else resolution[1]
+    fourcc: Optional[str] = parse_fourcc(args.fourcc)
+    return CaptureSettings(
+        source=args.source,
+        backend=args.capture_backend,
+        width=width,
+        height=height,
+        fps=args.capture_fps or None,
+        fourcc=fourcc,
+        buffer_size=args.buffer_size,
+        max_width=args.max_width,
+    )
+
+
+def probe(
+    settings: CaptureSettings, frames: int = 30
+) -> List[Tuple[CaptureSettings, Optional[CaptureMode], float]]:
+    """PROBE_MODES を順に要求し、受け入れられたモードと読み出しコストを計測します。
+
+    Args:
+        settings: 基準にする設定（デバイス番号・バックエンドなど）
+        frames: 1モードあたりに読み出すフレーム数
+
+    Returns:
+        (要求した設定, 受け入れられたモード（開けない場合はNone),
+        1フレームあたりの平均読み出し時間（ミリ秒）) の組
+    """
+    results: List[Tuple[CaptureSettings, Optional[CaptureMode], float]] = []
+    for width, height, fourcc in PROBE_MODES:
+        requested: CaptureSettings = replace(
+            settings, width=width, height=height, fourcc=fourcc
+        )
+        capture: Capture = Capture(requested, realtime=False)
+        try:
+            if capture.mode is None:
+                results.append((requested, None, float("nan")))
+                continue
+            capture.read()  # 最初のフレームはストリームの開始待ちを含むため除外
+            start: float = time.perf_counter()
+            count: int = 0
+            for _ in range(frames):
+                if not capture.read()[0]:
+                    break
+                count += 1
+            elapsed_ms: float = (time.perf_counter() - start) * 1000.0
+            results.append(
+                (requested, capture.mode, elapsed_ms / count if count else float("nan"))
+            )
+        finally:
+            capture.release()
+    return results
+
+
+def run() -> None:
+    """デバイスが対応するモードと読み出しコストを一覧表示します。"""
+    parser = argparse.ArgumentParser(description="Probe camera capture modes")
+    add_arguments(parser)
+    parser.add_argument("--frames", type=int, default=30, help="Frames per mode")
+    args = parser.parse_args()
+    settings: CaptureSettings = settings_from_args(args)
+    if not settings.is_device and not os.path.exists(settings.source):
+        parser.error(f"No such video file: {settings.source}")
+
+    print(f"{'requested':>16} {'negotiated':<40} {'read':>9}")
+    for requested, mode, read_ms in probe(settings, args.frames):
+        label: str = f"{requested.width}x{requested.height} {requested.fourcc}"
+        negotiated: str = mode.describe() if mode else "(cannot open)"
+        print(f"{label:>16} {negotiated:<40} {read_ms:>7.2f}ms")
+
+
+if __name__ == "__main__":
+    run()
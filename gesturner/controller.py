@@ -1,13 +1,23 @@
 from __future__ import annotations
 
+import math
+import threading
 import time
-from typing import Optional, TypedDict
+from dataclasses import replace
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Tuple, TypedDict
 
 import numpy as np
 
-from gesturner.gaze_detector import GazeDetector
-from gesturner.mouth_detector import MouthDetector
-from gesturner.key_controller import send_down_key, send_up_key
+from gesturner.gestures import GestureEngine, GestureRegistry, GestureRule
+from gesturner.landmark_engine import LandmarkEngine
+from gesturner.key_controller import KeySender, press_key
+from gesturner.metrics import METRICS
+from gesturner.performer import DEFAULT_MAX_FACES, PerformerSelector
+from gesturner.recording import LandmarkRecorder
+from gesturner.scheduler import AdaptiveScheduler, TierScheduler
+
+if TYPE_CHECKING:
+    from gesturner.profile import Profile
 
 
 class ProcessResult(TypedDict):
@@ -16,75 +26,407 @@ class ProcessResult(TypedDict):
     Attributes:
         mouth_detected: 口が開いているかどうか
         gaze_direction: 視線方向（"DOWN", "UP", "NEUTRAL", None）
-        last_key_sent_time: 最後にキーを送信した時刻（Unix時間）
+        last_key_sent_time: 最後にキーを送信したフレームの時刻（未送信の場合は-inf）
+        inferred: このフレームで推論を実行したかどうか
+        gestures: ジェスチャー名ごとの検知状態
     """
 
     mouth_detected: bool
     gaze_direction: Optional[str]
     last_key_sent_time: float
+    inferred: bool
+    gestures: Dict[str, bool]
 
 
 class GestureController:
     """ジェスチャー検知とキー送信を制御するコントローラー。
 
-    口の開閉と視線方向を継続的に監視し、
+    登録されたジェスチャー（既定では口の開閉と上向きの視線）を継続的に監視し、
     一定時間ジェスチャーが持続した場合にキー入力を送信します。
     """
 
-    def __init__(self) -> None:
-        """GestureControllerを初期化します。"""
-        # 検知器の初期化
-        self.gaze_detector: GazeDetector = GazeDetector()
-        self.mouth_detector: MouthDetector = MouthDetector()
+    def __init__(
+        self,
+        adaptive: bool = True,
+        roi_tracking: bool = True,
+        key_sender: KeySender = press_key,
+        recorder: Optional[LandmarkRecorder] = None,
+        gestures: Optional[Sequence[GestureRule]] = None,
+        smoothing: bool = True,
+        max_faces: int = DEFAULT_MAX_FACES,
+        performer: str = "largest",
+        tier: str = "full",
+        tier_budget_ms: float = 50.0,
+    ) -> None:
+        """GestureControllerを初期化します。
+
+        Args:
+            adaptive: 安定している間は推論頻度を落とすかどうか
+            roi_tracking: 顔の周辺だけを切り出して推論するかどうか
+            key_sender: キー名を受け取ってキー入力を送信する関数
+            recorder: フレームごとのランドマークと判定結果の記録先
+            gestures: 判定するジェスチャールール（省略時は口の開閉と上向きの視線）
+            smoothing: 特徴量を平滑化してから判定するかどうか
+            max_faces: FaceMeshが検出する顔の最大数
+            performer: 複数の顔から判定対象の演者を選ぶ方法（"largest" または "central"）
+            tier: 検知の精度の段階（"auto", "full", "lite"）。lite では視線のジェスチャーが
+                起こりうる間だけ虹彩まで推論し、auto は処理時間から自動で選ぶ
+            tier_budget_ms: auto で lite に切り替える精密な推論の処理時間（ミリ秒）
+        """
+        self.key_sender: KeySender = key_sender
+        self.recorder: Optional[LandmarkRecorder] = recorder
+
+        # ランドマークエンジン（推論は1フレームにつき1回のみ）
+        # 記録の再生では推論を行わないため、最初のフレームで生成する
+        self.roi_tracking: bool = roi_tracking
+        self.max_faces: int = max_faces
+        self.performer: str = performer
+        self._landmark_engine: Optional[LandmarkEngine] = None
+
+        # ジェスチャーの判定ルール（全ジェスチャーを1回の配列演算で判定する）
+        self.gestures: GestureRegistry = GestureRegistry(gestures)
+        self._check_recorded_keys(list(self.gestures))
+        self.gesture_engine: GestureEngine = GestureEngine(
+            list(self.gestures), smoothing
+        )
+        # プロファイルを反映する基準のルール（起動時のルール）
+        self.base_rules: List[GestureRule] = list(self.gestures)
+        # 読み込み直したプロファイルと、構築済みの判定ルール・エンジン（次のフレームの前に反映）
+        self._pending_profile: Optional[
+            Tuple[Profile, Optional[Profile], GestureRegistry, GestureEngine]
+        ] = None
+        self._pending_lock: threading.Lock = threading.Lock()
+
+        # 表示用の視線方向（DOWN/NEUTRAL）の閾値（虹彩の相対位置。キーの送信には使わない）
+        self.gaze_down_threshold: float = 0.6
+
+        # 最後にキーを送信したフレームの時刻
+        self.last_key_sent_time: float = -math.inf
+
+        # 推論頻度の調整（Noneの場合は毎フレーム推論）
+        self.scheduler: Optional[AdaptiveScheduler] = (
+            AdaptiveScheduler() if adaptive else None
+        )
+
+        # 虹彩まで推論するかどうかの切り替え
+        self.tiers: TierScheduler = TierScheduler(tier, tier_budget_ms)
 
-        # 口開閉検知の状態管理
-        self.last_look_down_time: Optional[float] = None  # 口が開き始めた時刻
-        self.LOOK_DOWN_DURATION: float = 1.0  # キー送信までの継続時間（秒）
+    @property
+    def landmark_engine(self) -> LandmarkEngine:
+        """共有ランドマークエンジン（初回アクセス時にFaceMeshを生成）。"""
+        if self._landmark_engine is None:
+            self._landmark_engine = LandmarkEngine(
+                refine_landmarks=True,
+                roi_tracking=self.roi_tracking,
+                max_num_faces=self.max_faces,
+                performer=self.performer,
+            )
+        return self._landmark_engine
 
-        # 上視線検知の状態管理
-        self.last_look_up_time: Optional[float] = None  # 上を向き始めた時刻
-        self.LOOK_UP_DURATION: float = 1.0  # キー送信までの継続時間（秒）
+    def warm_up(self, frame_shape: Tuple[int, ...] = (480, 640, 3)) -> None:
+        """FaceMeshを生成して空のフレームで1回推論し、初回の推論の遅延を先に済ませます。
 
-        # 最後にキーを送信した時刻
-        self.last_key_sent_time: float = 0.0
+        ジェスチャーの判定状態は変更しません。
 
-    def process(self, frame: np.ndarray) -> ProcessResult:
+        Args:
+            frame_shape: 推論に使うフレームの形状 (高さ, 幅, 3)
+        """
+        engine: LandmarkEngine = self.landmark_engine
+        engine.process(np.zeros(frame_shape, dtype=np.uint8))
+        if self.tiers.lite:
+            engine.process(np.zeros(frame_shape, dtype=np.uint8), refine=False)
+        engine.reset()
+
+    def process(
+        self, frame: np.ndarray, timestamp: Optional[float] = None
+    ) -> ProcessResult:
         """
         フレームを処理してジェスチャーを検知し、条件を満たせばキーを送信する。
 
+        Args:
+            frame: 入力画像（BGR形式）
+            timestamp: フレームの取得時刻（秒、単調増加）。省略時は現在の time.perf_counter()。
+                リプレイ時は動画上の時刻を渡す
+
         Returns:
             ProcessResult: 検知状態やデバッグ情報を含む辞書
         """
-        # 検知
-        gaze_direction: Optional[str] = self.gaze_detector.detect_gaze(frame)
-        mouth_detected: bool = self.mouth_detector.detect_gesture(frame)
+        self.apply_pending_profile()
+        current_time: float = time.perf_counter() if timestamp is None else timestamp
+        if not self.should_infer(current_time):
+            return self._process_points(None, current_time)
 
-        current_time: float = time.time()
+        # ランドマーク検出（全ジェスチャーで共有）
+        refine: bool = self.should_refine(current_time)
+        start: float = time.perf_counter()
+        points: np.ndarray = self.landmark_engine.process(frame, refine)
+        self.record_inference(refine, (time.perf_counter() - start) * 1000.0)
+        return self._process_points(points, current_time, refine)
 
-        # 口パク（下スクロール）
-        if mouth_detected:
-            if self.last_look_down_time is None:
-                self.last_look_down_time = current_time
-            elif current_time - self.last_look_down_time > self.LOOK_DOWN_DURATION:
-                send_down_key()
-                self.last_key_sent_time = current_time
-                self.last_look_down_time = None  # アクション実行後はリセット
-        else:
-            self.last_look_down_time = None
-
-        # 上を見る（上スクロール）
-        if gaze_direction == "UP":
-            if self.last_look_up_time is None:
-                self.last_look_up_time = current_time
-            elif current_time - self.last_look_up_time > self.LOOK_UP_DURATION:
-                send_up_key()
+    def should_infer(self, current_time: float) -> bool:
+        """このフレームで推論を実行するかどうかを返します。
+
+        安定している間は推論を省略し、直前の特徴量を再利用します
+        （省略するのは保持タイマーが動いていない間のみ。ジェスチャーの検知の開始は
+        最大 AdaptiveScheduler.idle_interval 秒遅れる）。
+
+        Args:
+            current_time: フレームの時刻（秒）
+        """
+        return self.scheduler is None or self.scheduler.should_infer(current_time)
+
+    def should_refine(self, current_time: float) -> bool:
+        """このフレームで虹彩まで推論するかどうかを返します。
+
+        Args:
+            current_time: フレームの時刻（秒）
+        """
+        return self.tiers.should_refine(current_time)
+
+    def record_inference(self, refined: bool, elapsed_ms: float) -> None:
+        """推論の処理時間を記録し、必要なら検知の段階を切り替えます。
+
+        Args:
+            refined: 虹彩まで推論したかどうか
+            elapsed_ms: 推論の処理時間（ミリ秒）
+        """
+        if self.tiers.record(refined, elapsed_ms):
+            tier: str = "lite" if self.tiers.lite else "full"
+            print(
+                f"[tier] switched to {tier} detection "
+                f"(refined inference {self.tiers.refined_ms:.1f}ms, "
+                f"budget {self.tiers.budget_ms:.0f}ms)"
+            )
+
+    def process_landmarks(
+        self, points: Optional[np.ndarray], timestamp: float, refined: bool = True
+    ) -> ProcessResult:
+        """推論を行わず、記録済みのランドマークからジェスチャーを判定します。
+
+        Args:
+            points: 形状 (F, N, 3) のランドマーク配列（Noneの場合は直前の検知結果を再利用）
+            timestamp: フレームの時刻（秒）
+            refined: 虹彩まで推論した結果かどうか
+
+        Returns:
+            ProcessResult: 検知状態やデバッグ情報を含む辞書
+        """
+        self.apply_pending_profile()
+        return self._process_points(points, timestamp, refined)
+
+    def process_features(
+        self, values: Optional[np.ndarray], timestamp: float, refined: bool = True
+    ) -> ProcessResult:
+        """ワーカープロセスで計算済みの特徴量からジェスチャーを判定します。
+
+        Args:
+            values: gesture_engine.features の順に並んだ平滑化前の特徴量
+                （Noneの場合は直前の検知結果を再利用）
+            timestamp: フレームの時刻（秒）
+            refined: 虹彩まで推論した結果かどうか
+
+        Returns:
+            ProcessResult: 検知状態やデバッグ情報を含む辞書
+        """
+        return self._evaluate(values, None, timestamp, refined)
+
+    def _process_points(
+        self,
+        points: Optional[np.ndarray],
+        current_time: float,
+        refined: bool = True,
+    ) -> ProcessResult:
+        """ランドマークから検知と保持時間の判定を行い、条件を満たせばキーを送信します。
+
+        Args:
+            points: 形状 (F, N, 3) のランドマーク配列（Noneの場合は直前の検知結果を再利用）
+            current_time: フレームの時刻（秒）
+            refined: 虹彩まで推論した結果かどうか
+
+        Returns:
+            ProcessResult: 検知状態やデバッグ情報を含む辞書
+        """
+        # 全ジェスチャーが参照する特徴量を1回ずつ計算
+        raw_values: Optional[np.ndarray] = None
+        if points is not None:
+            with METRICS.span("features"):
+                raw_values = self.gesture_engine.compute_features(points)
+        return self._evaluate(raw_values, points, current_time, refined)
+
+    def _evaluate(
+        self,
+        raw_values: Optional[np.ndarray],
+        points: Optional[np.ndarray],
+        current_time: float,
+        refined: bool = True,
+    ) -> ProcessResult:
+        """特徴量からジェスチャーを判定し、条件を満たせばキーを送信します。
+
+        Args:
+            raw_values: 平滑化前の特徴量（Noneの場合は直前の検知結果を再利用）
+            points: 記録用のランドマーク配列（無い場合はNone）
+            current_time: フレームの時刻（秒）
+            refined: 虹彩まで推論した結果かどうか（Falseの場合、視線の特徴量はNaN）
+
+        Returns:
+            ProcessResult: 検知状態やデバッグ情報を含む辞書
+        """
+        inferred: bool = raw_values is not None
+        engine: GestureEngine = self.gesture_engine
+        with METRICS.span("gestures"):
+            if raw_values is not None:
+                # 単発の揺れを除く
+                values: np.ndarray = engine.smooth(raw_values, current_time)
+            else:
+                # 推論を省略したフレームは直前の特徴量を再利用する
+                values = engine.values
+
+            # 全ジェスチャーの検知・保持時間・クールダウンをまとめて判定
+            fired: np.ndarray = engine.update(values, current_time)
+            if raw_values is not None and self.scheduler is not None:
+                self.scheduler.update(current_time, engine.is_calm(raw_values))
+            if raw_values is not None:
+                self.tiers.update(
+                    current_time, refined, engine.is_calm(raw_values, engine.refined)
+                )
+
+        # 同じキーを割り当てたジェスチャーが同じフレームで揃った場合は1回だけ送信する
+        key_sent: Optional[str] = None
+        sent: List[str] = []
+        for index in np.flatnonzero(fired):
+            key: Optional[str] = engine.rules[index].key
+            if key is not None and key not in sent:
+                self.key_sender(key, current_time)
+                sent.append(key)
                 self.last_key_sent_time = current_time
-                self.last_look_up_time = None  # アクション実行後はリセット
-        else:
-            self.last_look_up_time = None
+                key_sent = key_sent or key
+
+        gestures: Dict[str, bool] = engine.state()
+        mouth_detected: bool = gestures.get("mouth_open", False)
+        gaze_direction: Optional[str] = self._gaze_direction(gestures)
+
+        if self.recorder is not None:
+            self.recorder.write(
+                current_time, points, mouth_detected, gaze_direction, key_sent, refined
+            )
 
         return ProcessResult(
             mouth_detected=mouth_detected,
             gaze_direction=gaze_direction,
             last_key_sent_time=self.last_key_sent_time,
+            inferred=inferred,
+            gestures=gestures,
+        )
+
+    def _gaze_direction(self, gestures: Dict[str, bool]) -> Optional[str]:
+        """表示用の視線方向を求めます。
+
+        Args:
+            gestures: ジェスチャー名ごとの検知状態
+
+        Returns:
+            視線方向（"DOWN", "UP", "NEUTRAL", またはNone）
+        """
+        if gestures.get("look_up", False):
+            return "UP"
+        ratio: float = self.gesture_engine.feature_value("iris_vertical")
+        if np.isnan(ratio):
+            return None
+        return "DOWN" if ratio > self.gaze_down_threshold else "NEUTRAL"
+
+    def update_rule(self, name: str, **changes: Any) -> None:
+        """ジェスチャールールの一部の項目を変更します。
+
+        FaceMeshは作り直さず、判定エンジンだけを再構築します（状態は引き継ぎます）。
+
+        Args:
+            name: ジェスチャー名
+            **changes: 変更する GestureRule の項目（threshold, hold など）
+
+        Raises:
+            ValueError: 記録中で、割り当てたキーを記録できない場合
+        """
+        rule: GestureRule = replace(self.gestures[name], **changes)
+        self._check_recorded_keys([rule])
+        self.gestures.register(rule)
+        self.gesture_engine = self.gesture_engine.rebuild(list(self.gestures))
+
+    def apply_rules(self, rules: Sequence[GestureRule]) -> None:
+        """判定ルールをまとめて差し替えます（判定エンジンの再構築は1回だけ）。
+
+        Args:
+            rules: 新しいルール
+
+        Raises:
+            ValueError: 記録中で、割り当てたキーを記録できない場合
+        """
+        self._check_recorded_keys(rules)
+        self.gestures = GestureRegistry(rules)
+        self.gesture_engine = self.gesture_engine.rebuild(list(self.gestures))
+
+    def _check_recorded_keys(self, rules: Sequence[GestureRule]) -> None:
+        """記録中の場合、ルールに割り当てたキーを記録できるか確認します。
+
+        推論スレッドでキーを記録できなくなることを防ぐため、ルールを差し替える前に呼び出します。
+
+        Args:
+            rules: 確認するルール
+
+        Raises:
+            ValueError: 記録できないキー名がある場合
+        """
+        if self.recorder is not None:
+            self.recorder.check_keys(r.key for r in rules if r.key is not None)
+
+    def schedule_profile(
+        self, profile: Profile, previous: Optional[Profile] = None
+    ) -> None:
+        """プロファイルを次のフレームの前に反映するよう予約します（任意のスレッドから呼べます）。
+
+        判定ルールと判定用の配列はここで構築し、フレームの合間には状態の引き継ぎと
+        差し替えだけを行います。FaceMeshは作り直しません。
+
+        Args:
+            profile: 反映するプロファイル
+            previous: 前回反映したプロファイル
+
+        Raises:
+            ValueError: 記録中で、割り当てたキーを記録できない場合（予約しない）
+        """
+        registry: GestureRegistry = GestureRegistry(profile.rules(self.base_rules))
+        self._check_recorded_keys(list(registry))
+        engine: GestureEngine = GestureEngine(
+            list(registry), self.gesture_engine.smoothing
         )
+        with self._pending_lock:
+            if self._pending_profile is not None:
+                # 未反映のプロファイルを置き換える場合は、実際に反映済みの設定と比べる
+                previous = self._pending_profile[1]
+            self._pending_profile = (profile, previous, registry, engine)
+
+    def apply_pending_profile(self) -> None:
+        """予約されたプロファイルがあれば反映します（フレームの合間に呼び出します）。"""
+        if self._pending_profile is None:
+            return
+        # 取り出しと消去の間に予約されたプロファイルを失わないよう、まとめて入れ替える
+        pending: Optional[
+            Tuple[Profile, Optional[Profile], GestureRegistry, GestureEngine]
+        ]
+        with self._pending_lock:
+            pending, self._pending_profile = self._pending_profile, None
+        if pending is None:
+            return
+        profile, previous, registry, engine = pending
+        self.gestures = registry
+        self.gesture_engine = engine.inherit(self.gesture_engine)
+        profile.apply_settings(self, previous)
+
+    def set_performer(self, strategy: str) -> None:
+        """演者の選び方を変更し、次の推論フレームで演者を選び直します。
+
+        Args:
+            strategy: 演者の選び方（"largest" または "central"）
+        """
+        self.performer = strategy
+        if self._landmark_engine is not None:
+            self._landmark_engine.performer = PerformerSelector(strategy)
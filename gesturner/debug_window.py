@@ -1,28 +1,78 @@
 from __future__ import annotations
 
 import cv2
+import sys
 import time
-import win32gui  # type: ignore
-import win32con  # type: ignore
 import numpy as np
-from typing import Optional
+from typing import Dict, Optional, Tuple
+
+# ウィンドウの配置はWindowsでのみ行う（pywin32はWindowsでのみ依存関係に含まれる）
+if sys.platform == "win32":
+    import win32gui  # type: ignore
+    import win32con  # type: ignore
 
 
 class DebugWindow:
     """デバッグ用のプライバシー保護ウィンドウ。
 
     カメラ映像を低解像度・二値化して表示し、
-    ジェスチャー検知状態とキー送信状況を視覚的に確認できます。
+    ジェスチャー検知状態とキー送信状況、ステージごとの処理時間とFPSを
+    視覚的に確認できます。描画は上限FPSで間引き、変換先のバッファは再利用します。
     """
 
-    def __init__(self, window_name: str = "Gesture Debug") -> None:
+    TEXT_COLOR: Tuple[int, int, int] = (0, 255, 0)
+    KEY_COLOR: Tuple[int, int, int] = (0, 0, 255)
+    TIMING_COLOR: Tuple[int, int, int] = (255, 255, 0)
+
+    def __init__(
+        self,
+        window_name: str = "Gesture Debug",
+        max_fps: float = 15.0,
+        position: Tuple[int, int] = (50, 110),
+    ) -> None:
         """デバッグウィンドウを初期化します。
 
         Args:
             window_name: ウィンドウのタイトル名
+            max_fps: 描画する最大フレームレート
+            position: ウィンドウの左上の画面座標（既定はオーバーレイの下: y=50+50+10）
         """
         self.window_name: str = window_name
+        self.position: Tuple[int, int] = position
         self.window_initialized: bool = False
+        self.enabled: bool = True  # Falseの間は描画を行わない
+        self.min_interval: float = 1.0 / max_fps if max_fps > 0 else 0.0
+
+        # FPSの計測（指数移動平均）
+        self.last_update_time: Optional[float] = None
+        self.last_render_time: float = 0.0
+        self.update_fps: float = 0.0
+        self.render_fps: float = 0.0
+
+        # 変換先バッファ（フレームサイズが変わった場合のみ再確保）
+        self._frame_size: Optional[Tuple[int, int]] = None
+        self._small: np.ndarray = np.empty(0, dtype=np.uint8)
+        self._gray: np.ndarray = np.empty(0, dtype=np.uint8)
+        self._binary: np.ndarray = np.empty(0, dtype=np.uint8)
+        self._display_gray: np.ndarray = np.empty(0, dtype=np.uint8)
+        self._display: np.ndarray = np.empty(0, dtype=np.uint8)
+
+    def _allocate(self, h: int, w: int) -> None:
+        """フレームサイズに合わせて変換先バッファを確保します。"""
+        self._small = np.empty((h // 8, w // 8, 3), dtype=np.uint8)
+        self._gray = np.empty((h // 8, w // 8), dtype=np.uint8)
+        self._binary = np.empty((h // 8, w // 8), dtype=np.uint8)
+        self._display_gray = np.empty((h // 2, w // 2), dtype=np.uint8)
+        self._display = np.empty((h // 2, w // 2, 3), dtype=np.uint8)
+        self._frame_size = (h, w)
+
+    @staticmethod
+    def _update_rate(previous: float, interval: float) -> float:
+        """呼び出し間隔からFPSの移動平均を更新します。"""
+        if interval <= 0.0:
+            return previous
+        rate: float = 1.0 / interval
+        return rate if previous == 0.0 else previous + 0.1 * (rate - previous)
 
     def update(
         self,
@@ -30,101 +80,147 @@ class DebugWindow:
         mouth_detected: bool,
         gaze_direction: Optional[str],
         last_key_sent_time: float,
-    ) -> None:
+        timings: Optional[Dict[str, float]] = None,
+        frame_time: Optional[float] = None,
+    ) -> bool:
         """デバッグ情報を表示更新します。
 
+        無効化されている場合や、前回の描画から最小間隔が経っていない場合は
+        何もせずに戻ります。
+
         Args:
             frame: 入力画像（BGR形式）
             mouth_detected: 口開閉検知の状態
             gaze_direction: 視線方向
-            last_key_sent_time: 最後にキーを送信した時刻
+            last_key_sent_time: 最後にキーを送信したフレームの時刻
+            timings: ステージ名をキーとする平均処理時間（ミリ秒）
+            frame_time: 表示するフレームの取得時刻（省略時は現在の time.perf_counter()）
+
+        Returns:
+            描画した場合True、省略した場合False
         """
+        now: float = time.perf_counter()
+        if self.last_update_time is not None:
+            self.update_fps = self._update_rate(
+                self.update_fps, now - self.last_update_time
+            )
+        self.last_update_time = now
+
+        if not self.enabled or now - self.last_render_time < self.min_interval:
+            return False
+        self.render_fps = self._update_rate(
+            self.render_fps, now - self.last_render_time
+        )
+        self.last_render_time = now
+
         # プライバシー保護処理: 解像度を落として二値化
         h, w = frame.shape[:2]
+        if self._frame_size != (h, w):
+            self._allocate(h, w)
         # 1/8に縮小
-        small: np.ndarray = cv2.resize(
-            frame, (w // 8, h // 8), interpolation=cv2.INTER_LINEAR
+        cv2.resize(
+            frame, (w // 8, h // 8), dst=self._small, interpolation=cv2.INTER_LINEAR
         )
         # グレースケール化
-        gray: np.ndarray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        cv2.cvtColor(self._small, cv2.COLOR_BGR2GRAY, dst=self._gray)
         # 二値化
-        _, binary = cv2.threshold(gray, 100, 255, cv2.THRESH_BINARY)
-
-        # 表示サイズを元の半分にする
-        display_h: int = h // 2
-        display_w: int = w // 2
-        # 最近傍補間で拡大（ドット感を出す）
-        display_frame: np.ndarray = cv2.resize(
-            binary, (display_w, display_h), interpolation=cv2.INTER_NEAREST
+        cv2.threshold(self._gray, 100, 255, cv2.THRESH_BINARY, dst=self._binary)
+
+        # 表示サイズを元の半分にし、最近傍補間で拡大（ドット感を出す）
+        cv2.resize(
+            self._binary,
+            (w // 2, h // 2),
+            dst=self._display_gray,
+            interpolation=cv2.INTER_NEAREST,
         )
         # カラー形式に戻す（テキスト描画のため）
-        display_frame = cv2.cvtColor(display_frame, cv2.COLOR_GRAY2BGR)
+        display_frame: np.ndarray = self._display
+        cv2.cvtColor(self._display_gray, cv2.COLOR_GRAY2BGR, dst=display_frame)
 
         # 口の検出状況を表示する
         status_text: str = "Mouth: Detected" if mouth_detected else "Mouth: Neutral"
-        cv2.putText(
-            display_frame,
-            status_text,
-            (10, 20),
-            cv2.FONT_HERSHEY_SIMPLEX,
-            0.6,
-            (0, 255, 0),
-            2,
-        )
+        self._put_text(display_frame, status_text, 20, self.TEXT_COLOR)
 
         # 目の検出状況を表示する
         gaze_text: str = f"Gaze: {gaze_direction}" if gaze_direction else "Gaze: --"
-        cv2.putText(
-            display_frame,
-            gaze_text,
-            (10, 50),
-            cv2.FONT_HERSHEY_SIMPLEX,
-            0.6,
-            (0, 255, 0),
-            2,
-        )
+        self._put_text(display_frame, gaze_text, 50, self.TEXT_COLOR)
 
         # キー送信直後の場合はキー押下を表示する
-        if time.time() - last_key_sent_time < 1.0:
-            cv2.putText(
+        if frame_time is None:
+            frame_time = now
+        if frame_time - last_key_sent_time < 1.0:
+            self._put_text(display_frame, "KEY SENT", 80, self.KEY_COLOR)
+
+        # FPSとステージごとの処理時間を表示する
+        y: int = 110
+        self._put_text(
+            display_frame,
+            f"FPS: {self.update_fps:.1f} (view {self.render_fps:.1f})",
+            y,
+            self.TIMING_COLOR,
+            scale=0.45,
+            thickness=1,
+        )
+        for stage, elapsed_ms in (timings or {}).items():
+            y += 20
+            self._put_text(
                 display_frame,
-                "KEY SENT",
-                (10, 80),
-                cv2.FONT_HERSHEY_SIMPLEX,
-                0.6,
-                (0, 0, 255),
-                2,
+                f"{stage}: {elapsed_ms:.1f} ms",
+                y,
+                self.TIMING_COLOR,
+                scale=0.45,
+                thickness=1,
             )
 
         # 撮影したフレームを表示
         cv2.imshow(self.window_name, display_frame)
 
         if not self.window_initialized:
-            hwnd: int = win32gui.FindWindow(None, self.window_name)
-            if hwnd:
-                # 最前面に表示し、アクティブ化しない設定を行う
-                # HWND_TOPMOST: 最前面
-                # SWP_NOACTIVATE: ウィンドウをアクティブにしない
-                # 位置を指定 (Overlayの下: x=50, y=50+50+10=110)
-                x: int = 50
-                y: int = 110
-                win32gui.SetWindowPos(
-                    hwnd,
-                    win32con.HWND_TOPMOST,
-                    x,
-                    y,
-                    0,
-                    0,
-                    win32con.SWP_NOSIZE | win32con.SWP_NOACTIVATE,
-                )
-
-                # 拡張スタイル WS_EX_NOACTIVATE を追加して、クリックしてもアクティブにならないようにする
-                ex_style: int = win32gui.GetWindowLong(hwnd, win32con.GWL_EXSTYLE)
-                win32gui.SetWindowLong(
-                    hwnd, win32con.GWL_EXSTYLE, ex_style | win32con.WS_EX_NOACTIVATE
-                )
-
+            if sys.platform != "win32":
+                # Windows以外では OpenCV の機能で位置だけを指定する
+                cv2.moveWindow(self.window_name, *self.position)
                 self.window_initialized = True
+            else:
+                hwnd: int = win32gui.FindWindow(None, self.window_name)
+                if hwnd:
+                    # 最前面に表示し、アクティブ化しない設定を行う
+                    # HWND_TOPMOST: 最前面
+                    # SWP_NOACTIVATE: ウィンドウをアクティブにしない
+                    # 位置を指定
+                    x, y = self.position
+                    win32gui.SetWindowPos(
+                        hwnd,
+                        win32con.HWND_TOPMOST,
+                        x,
+                        y,
+                        0,
+                        0,
+                        win32con.SWP_NOSIZE | win32con.SWP_NOACTIVATE,
+                    )
+
+                    # 拡張スタイル WS_EX_NOACTIVATE を追加して、クリックしてもアクティブにならないようにする
+                    ex_style: int = win32gui.GetWindowLong(hwnd, win32con.GWL_EXSTYLE)
+                    win32gui.SetWindowLong(
+                        hwnd, win32con.GWL_EXSTYLE, ex_style | win32con.WS_EX_NOACTIVATE
+                    )
+
+                    self.window_initialized = True
+
+        return True
+
+    @staticmethod
+    def _put_text(
+        image: np.ndarray,
+        text: str,
+        y: int,
+        color: Tuple[int, int, int],
+        scale: float = 0.6,
+        thickness: int = 2,
+    ) -> None:
+        """画像の左端にテキストを描画します。"""
+        cv2.putText(
+            image, text, (10, y), cv2.FONT_HERSHEY_SIMPLEX, scale, color, thickness
+        )
 
     def close(self) -> None:
         """デバッグウィンドウを閉じます。"""
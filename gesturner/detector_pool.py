@@ -0,0 +1,307 @@
+"""FaceMesh推論と特徴量の計算をワーカープロセスで実行するプール。
+
+フレームは pickle せずに multiprocessing.shared_memory 上のリングバッファへ
+コピーし、ワーカーにはスロット番号だけを渡します。
+ワーカーからは顔ごとの特徴量と外形の小さな配列だけが返るため、UIとキー送信を行う
+メインプロセスはGILを推論処理と取り合いません。
+顔の追跡領域と演者の選択はメインプロセスで1つだけ保持し、推論する領域を
+フレームごとにワーカーへ渡します（どのワーカーが処理しても同じ演者を追跡します）。
+"""
+
+from __future__ import annotations
+
+import multiprocessing as mp
+import queue
+import time
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from multiprocessing.process import BaseProcess
+from typing import Any, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from gesturner.landmarks import FACE_OUTLINE_INDICES, empty_landmarks
+from gesturner.metrics import METRICS
+from gesturner.performer import DEFAULT_MAX_FACES, PerformerSelector
+from gesturner.roi_tracker import Box, RoiTracker
+
+
+@dataclass
+class DetectorResult:
+    """ワーカーから返る1フレーム分の結果。
+
+    Attributes:
+        frame_id: フレームの通し番号
+        slot: 使用したリングバッファのスロット
+        features: 計算した特徴量の名前
+        values: 形状 (顔の数, 特徴量数) の平滑化前の特徴量
+        outlines: 形状 (顔の数, 外形の点数, 3) の顔の外形（フレーム全体の正規化座標）
+        bounds: 形状 (顔の数, 4) の顔の外接矩形（RoiTracker.bounds）
+        inference_ms: ワーカーでの処理時間（ミリ秒）
+        refined: 虹彩まで推論したかどうか
+    """
+
+    frame_id: int
+    slot: int
+    features: Tuple[str, ...]
+    values: np.ndarray
+    outlines: np.ndarray
+    bounds: np.ndarray
+    inference_ms: float
+    refined: bool = True
+
+    @property
+    def num_faces(self) -> int:
+        """検出した顔の数。"""
+        return self.values.shape[0]
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """既存の共有メモリに接続します（作成元が解放するため追跡しない）。"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)  # type: ignore[call-arg]
+    except TypeError:  # Python 3.12 には track 引数が無い
+        return shared_memory.SharedMemory(name=name)
+
+
+def _worker_main(
+    shm_name: str,
+    shape: Tuple[int, ...],
+    roi_tracking: bool,
+    max_num_faces: int,
+    tasks: Any,
+    results: Any,
+) -> None:
+    """ワーカープロセスの本体。
+
+    ワーカーは追跡や演者の状態を持たず、渡された領域で推論した全ての顔の
+    特徴量と外形を返します。
+
+    Args:
+        shm_name: リングバッファの共有メモリ名
+        shape: リングバッファの形状 (スロット数, 高さ, 幅, 3)
+        roi_tracking: 顔の周辺だけを切り出して推論するかどうか
+        max_num_faces: FaceMeshが検出する顔の最大数
+        tasks: (frame_id, slot, 特徴量名, 虹彩まで推論するか, 推論する領域) を
+            受け取るキュー（None で終了）
+        results: DetectorResult を返すキュー
+    """
+    from gesturner.gestures import face_features
+    from gesturner.landmark_engine import LandmarkEngine
+
+    shm: shared_memory.SharedMemory = _attach(shm_name)
+    ring: np.ndarray = np.ndarray(shape, dtype=np.uint8, buffer=shm.buf)
+    engine: LandmarkEngine = LandmarkEngine(
+        refine_landmarks=True,
+        roi_tracking=roi_tracking,
+        max_num_faces=max_num_faces,
+    )
+    # 最初のフレームが初回推論の遅延を受けないよう、空のフレームで1回推論しておく
+    engine.detect(np.zeros(shape[1:], dtype=np.uint8))
+    try:
+        while True:
+            task: Optional[Tuple[int, int, Tuple[str, ...], bool, Optional[Box]]] = (
+                tasks.get()
+            )
+            if task is None:
+                break
+            frame_id, slot, features, refine, box = task
+            start: float = time.perf_counter()
+            points: np.ndarray = empty_landmarks(engine.num_landmarks)
+            try:
+                points = engine.detect_faces(ring[slot], refine, box)
+            except Exception as e:  # 1フレームの失敗でワーカーは止めない
+                print(f"[detector] frame {frame_id} failed: {e}")
+            results.put(
+                DetectorResult(
+                    frame_id,
+                    slot,
+                    features,
+                    face_features(points, features),
+                    points[:, FACE_OUTLINE_INDICES],
+                    RoiTracker.bounds(points),
+                    (time.perf_counter() - start) * 1000.0,
+                    refine,
+                )
+            )
+    finally:
+        engine.close()
+        del ring
+        shm.close()
+
+
+class DetectorPool:
+    """推論ワーカープロセスと、フレームを渡す共有メモリのリングバッファ。
+
+    リングバッファとワーカーは start() を呼んだ時点、または最初のフレームを
+    受け取った時点で、フレームの形状に合わせて作成します。
+    空きスロットが無い場合（全ワーカーが処理中）はフレームを破棄します。
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        roi_tracking: bool = True,
+        slots: Optional[int] = None,
+        max_num_faces: int = DEFAULT_MAX_FACES,
+        performer: str = "largest",
+    ) -> None:
+        """DetectorPoolを初期化します。
+
+        Args:
+            workers: ワーカープロセス数
+            roi_tracking: 顔の周辺だけを切り出して推論するかどうか
+            slots: リングバッファのスロット数（省略時はワーカー数の2倍）
+            max_num_faces: FaceMeshが検出する顔の最大数
+            performer: 演者の選び方（"largest" または "central"）
+        """
+        self.workers: int = workers
+        self.roi_tracking: bool = roi_tracking
+        self.max_num_faces: int = max_num_faces
+        # 追跡領域と演者はメインプロセスで1つだけ保持し、結果を反映した順に更新する
+        self.roi_tracker: Optional[RoiTracker] = RoiTracker() if roi_tracking else None
+        self.performer: PerformerSelector = PerformerSelector(performer)
+        self.slots: int = slots or workers * 2
+        self.dropped: int = 0  # 空きスロットが無く破棄したフレーム数
+
+        # MediaPipe は fork 後に使えないため spawn で起動する
+        self._context = mp.get_context("spawn")
+        self._tasks: Any = self._context.Queue()
+        self._results: Any = self._context.Queue()
+        self._free: List[int] = list(range(self.slots))
+        self._processes: List[BaseProcess] = []
+        self._shm: Optional[shared_memory.SharedMemory] = None
+        self._ring: Optional[np.ndarray] = None
+
+    @property
+    def alive(self) -> bool:
+        """全てのワーカーが動作しているかどうか（起動前はTrue）。"""
+        return all(p.is_alive() for p in self._processes)
+
+    def start(self, frame_shape: Tuple[int, ...]) -> None:
+        """リングバッファを作成し、ワーカーを起動します（起動済みの場合は何もしません）。
+
+        ワーカーはモデルの生成と空フレームでの推論を済ませてから処理を始めます。
+
+        Args:
+            frame_shape: フレームの形状 (高さ, 幅, 3)
+        """
+        if self._ring is not None:
+            return
+        shape: Tuple[int, ...] = (self.slots,) + frame_shape
+        self._shm = shared_memory.SharedMemory(create=True, size=int(np.prod(shape)))
+        self._ring = np.ndarray(shape, dtype=np.uint8, buffer=self._shm.buf)
+        for _ in range(self.workers):
+            process: BaseProcess = self._context.Process(
+                target=_worker_main,
+                args=(
+                    self._shm.name,
+                    shape,
+                    self.roi_tracking,
+                    self.max_num_faces,
+                    self._tasks,
+                    self._results,
+                ),
+                daemon=True,
+            )
+            process.start()
+            self._processes.append(process)
+
+    def submit(
+        self,
+        frame_id: int,
+        frame: np.ndarray,
+        features: Sequence[str],
+        refine: bool = True,
+    ) -> bool:
+        """フレームをリングバッファにコピーし、ワーカーに処理を依頼します。
+
+        Args:
+            frame_id: フレームの通し番号
+            frame: 入力画像（BGR形式）
+            features: 計算する特徴量名
+            refine: 虹彩まで推論するかどうか
+
+        Returns:
+            依頼できた場合True（空きスロットが無く破棄した場合False）
+
+        Raises:
+            ValueError: 最初のフレームと形状が異なる場合
+        """
+        if self._ring is None:
+            self.start(frame.shape)
+        assert self._ring is not None
+        if frame.shape != self._ring.shape[1:]:
+            raise ValueError(
+                f"Frame shape changed: {frame.shape} != {self._ring.shape[1:]}"
+            )
+        if not self._free:
+            self.dropped += 1
+            METRICS.increment("dropped.pool")
+            return False
+        slot: int = self._free.pop()
+        np.copyto(self._ring[slot], frame)
+        box: Optional[Box] = None if self.roi_tracker is None else self.roi_tracker.box
+        self._tasks.put((frame_id, slot, tuple(features), refine, box))
+        return True
+
+    def select(self, result: DetectorResult) -> np.ndarray:
+        """結果から演者の顔を選び、次に推論する領域を更新します。
+
+        フレームの順に反映した結果に対してだけ呼び出します（追い越された古い結果には使わない）。
+
+        Args:
+            result: ワーカーの結果
+
+        Returns:
+            形状 (特徴量数,) の演者の特徴量（演者がいない場合はNaN）
+        """
+        index: int = self.performer.select(result.outlines)
+        if result.num_faces > 1:
+            METRICS.increment("faces.ignored", result.num_faces - (index >= 0))
+        if self.roi_tracker is not None and self._ring is not None:
+            self.roi_tracker.update_bounds(
+                result.bounds[index] if index >= 0 else None, self._ring.shape[1:]
+            )
+        if index < 0:
+            return np.full(len(result.features), np.nan)
+        return result.values[index]
+
+    def collect(self, timeout: float = 0.0) -> List[DetectorResult]:
+        """完了した結果を全て取り出し、使用済みのスロットを解放します。
+
+        Args:
+            timeout: 結果が1つも無い場合に待つ最大秒数
+
+        Returns:
+            完了した結果（完了順）
+        """
+        collected: List[DetectorResult] = []
+        try:
+            result: DetectorResult = (
+                self._results.get(timeout=timeout)
+                if timeout > 0
+                else self._results.get_nowait()
+            )
+            while True:
+                self._free.append(result.slot)
+                collected.append(result)
+                result = self._results.get_nowait()
+        except queue.Empty:
+            pass
+        return collected
+
+    def close(self) -> None:
+        """ワーカーを終了し、共有メモリを解放します。"""
+        for _ in self._processes:
+            self._tasks.put(None)
+        for process in self._processes:
+            process.join(timeout=2.0)
+            if process.is_alive():
+                process.terminate()
+        self._processes = []
+        if self._shm is not None:
+            self._ring = None
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
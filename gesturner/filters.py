@@ -0,0 +1,194 @@
+"""特徴量の時系列を平滑化するストリーミングフィルター。
+
+ランドマークから求めた比率は1フレームだけ大きく揺れることがあり、
+そのまま閾値と比較すると保持時間のタイマーが途中でリセットされます。
+OneEuroFilter は直近数フレームのリングバッファの中央値で単発の外れ値を除き、
+One Euro Filter（動きが速いほどカットオフ周波数を上げるローパスフィルター）で
+平滑化します。状態は特徴量ごとに固定サイズで、フレームごとに配列を確保しません。
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Optional
+
+import numpy as np
+
+# 外れ値除去に使うリングバッファの長さ（中央値は3点の最小・最大の組み合わせで求める）
+SPIKE_WINDOW: int = 3
+# これより間隔の空いたフレームでは、古い値との中央値を取らずにその値をそのまま使う（秒）
+SPIKE_MAX_GAP: float = 0.1
+# 時刻が進まなかったフレームの経過時間として使う最小値（秒）
+MIN_DT: float = 1e-3
+
+
+class OneEuroFilter:
+    """複数の特徴量をまとめて平滑化する One Euro Filter。
+
+    値が NaN（顔や虹彩が無い）のフレームは NaN を返し、
+    再び値が得られた時点でその特徴量の状態を初期化します。
+    前のフレームから max_gap 秒を超えて空いた場合（推論頻度を落としている間など）は、
+    古い値との中央値で変化を捨てないよう、そのフレームの値で外れ値除去を初期化します。
+    """
+
+    def __init__(
+        self,
+        count: int,
+        min_cutoff: float = 2.0,
+        beta: float = 1.0,
+        d_cutoff: float = 1.0,
+        max_gap: float = SPIKE_MAX_GAP,
+    ) -> None:
+        """OneEuroFilterを初期化します。
+
+        Args:
+            count: 特徴量の数
+            min_cutoff: 静止時のカットオフ周波数（Hz）。小さいほど滑らかになる
+            beta: 変化の速さに応じてカットオフ周波数を上げる係数。大きいほど遅延が減る
+            d_cutoff: 変化の速さの推定に使うカットオフ周波数（Hz）
+            max_gap: 外れ値除去に前のフレームの値を使う最大の間隔（秒）
+        """
+        self.min_cutoff: float = min_cutoff
+        self.beta: float = beta
+        self.d_cutoff: float = d_cutoff
+        self.max_gap: float = max_gap
+
+        # 状態（特徴量ごとに固定サイズ）
+        self._ring: np.ndarray = np.full((SPIKE_WINDOW, count), np.nan)
+        self._head: int = 0
+        self._x: np.ndarray = np.full(count, np.nan)  # 平滑化した値
+        self._dx: np.ndarray = np.zeros(count)  # 平滑化した変化の速さ
+        self._was_missing: np.ndarray = np.ones(count, dtype=bool)
+        self._last_time: Optional[float] = None
+
+        # 作業用のバッファ
+        self._median: np.ndarray = np.empty(count)
+        self._low: np.ndarray = np.empty(count)
+        self._high: np.ndarray = np.empty(count)
+        self._alpha: np.ndarray = np.empty(count)
+        self._missing: np.ndarray = np.empty(count, dtype=bool)
+        self._reset: np.ndarray = np.empty(count, dtype=bool)
+
+    def reset(self) -> None:
+        """全ての特徴量の状態を初期化します。"""
+        self._ring.fill(np.nan)
+        self._x.fill(np.nan)
+        self._dx.fill(0.0)
+        self._was_missing.fill(True)
+        self._last_time = None
+
+    def __call__(self, values: np.ndarray, current_time: float) -> np.ndarray:
+        """1フレーム分の値を平滑化します。
+
+        Args:
+            values: 形状 (特徴量数,) の値
+            current_time: フレームの時刻（秒）
+
+        Returns:
+            平滑化した値（内部のバッファ。次の呼び出しで上書きされる）
+        """
+        dt: float = (
+            1.0
+            if self._last_time is None
+            else max(current_time - self._last_time, MIN_DT)
+        )
+        self._last_time = current_time
+
+        # 欠損から復帰した特徴量は、その値でリングバッファを埋めて初期化する
+        np.isnan(values, out=self._missing)
+        np.logical_not(self._missing, out=self._reset)
+        if dt > self.max_gap:
+            # 間隔が空いた後の値は古い値と比べず、その値で外れ値除去だけを初期化する
+            np.copyto(self._ring, values, where=self._reset)
+        self._reset &= self._was_missing
+        np.copyto(self._ring, values, where=self._reset)
+        self._ring[self._head] = values
+        self._head = (self._head + 1) % SPIKE_WINDOW
+
+        # 3点の中央値 = max(min(a, b), min(max(a, b), c))
+        a, b, c = self._ring
+        np.minimum(a, b, out=self._low)
+        np.maximum(a, b, out=self._high)
+        np.minimum(self._high, c, out=self._high)
+        np.maximum(self._low, self._high, out=self._median)
+
+        # 変化の速さを平滑化: dx += a_d * ((median - x) / dt - dx)
+        scratch: np.ndarray = self._low
+        np.subtract(self._median, self._x, out=scratch)
+        scratch /= dt
+        scratch -= self._dx
+        scratch *= _smoothing_factor(self.d_cutoff, dt)
+        self._dx += scratch
+
+        # 速さに応じたカットオフ周波数から係数を求める: r / (1 + r), r = 2π f dt
+        np.abs(self._dx, out=self._alpha)
+        self._alpha *= self.beta
+        self._alpha += self.min_cutoff
+        self._alpha *= 2.0 * math.pi * dt
+        np.add(self._alpha, 1.0, out=self._high)
+        self._alpha /= self._high
+
+        # x += alpha * (median - x)
+        np.subtract(self._median, self._x, out=scratch)
+        scratch *= self._alpha
+        self._x += scratch
+
+        # 初期化した特徴量は中央値（= 入力値）をそのまま使う
+        np.copyto(self._x, self._median, where=self._reset)
+        np.copyto(self._dx, 0.0, where=self._reset)
+        self._was_missing[...] = self._missing
+        return self._x
+
+
+def _smoothing_factor(cutoff: float, dt: float) -> float:
+    """カットオフ周波数と経過時間から指数平滑化の係数を求めます。"""
+    r: float = 2.0 * math.pi * cutoff * dt
+    return r / (1.0 + r)
+
+
+def smooth_series(
+    timestamps: np.ndarray, values: np.ndarray, **params: float
+) -> np.ndarray:
+    """時系列全体に OneEuroFilter を適用します（キャリブレーション用）。
+
+    Args:
+        timestamps: フレームの時刻（昇順）
+        values: フレームごとの値
+        **params: OneEuroFilter のパラメータ
+
+    Returns:
+        平滑化した値
+    """
+    smoother: OneEuroFilter = OneEuroFilter(1, **params)
+    result: np.ndarray = np.empty(values.shape[0])
+    sample: np.ndarray = np.empty(1)
+    for i in range(values.shape[0]):
+        sample[0] = values[i]
+        result[i] = smoother(sample, float(timestamps[i]))[0]
+    return result
+
+
+def hysteresis_mask(
+    signed: np.ndarray, enter: np.ndarray, exit: np.ndarray
+) -> np.ndarray:
+    """GestureEngine と同じ enter/exit の判定を時系列にまとめて適用します。
+
+    各時刻で、最後に enter を上回った時刻が最後に exit 以下になった時刻より
+    新しければ検知中とみなします（NaN は exit 以下として扱う）。
+
+    Args:
+        signed: 「上回ったら検知」に符号をそろえた値。最後の軸が時刻
+        enter: 検知を開始する閾値（signed とブロードキャスト可能）
+        exit: 検知を終了する閾値（signed とブロードキャスト可能）
+
+    Returns:
+        signed と同じ形状の検知状態
+    """
+    entered: np.ndarray = signed > enter
+    exited: np.ndarray = ~(signed > exit)
+    index: np.ndarray = np.arange(signed.shape[-1])
+    last_enter: np.ndarray = np.maximum.accumulate(
+        np.where(entered, index, -1), axis=-1
+    )
+    last_exit: np.ndarray = np.maximum.accumulate(np.where(exited, index, -1), axis=-1)
+    return last_enter > last_exit
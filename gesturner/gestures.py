@@ -0,0 +1,430 @@
+"""宣言的なルールで定義するジェスチャーのレジストリと判定エンジン。
+
+ジェスチャーは「共有ランドマーク配列に対する特徴量関数」と
+「閾値・ヒステリシス・保持時間・クールダウン・送信キー」のルールの組で定義します。
+GestureEngine は登録された全てのルールを配列として保持し、
+特徴量を OneEuroFilter で平滑化した上で、1フレームにつき1回のNumPy演算でまとめて判定します。
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import (
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Literal,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
+
+import numpy as np
+
+from gesturner.filters import OneEuroFilter
+from gesturner.landmarks import (
+    eye_openness,
+    head_roll,
+    iris_horizontal_ratio,
+    iris_ratio,
+    mouth_open_ratio,
+)
+
+# 形状 (F, N, 3) のランドマーク配列から顔ごとの値 (F,) を求める関数
+FeatureFunction = Callable[[np.ndarray], np.ndarray]
+
+# 登録済みの特徴量関数
+FEATURES: Dict[str, FeatureFunction] = {
+    "mouth_open": mouth_open_ratio,
+    "iris_vertical": iris_ratio,
+    "iris_horizontal": iris_horizontal_ratio,
+    "eye_openness": eye_openness,
+    "head_roll": head_roll,
+}
+
+# 虹彩ランドマーク（refine_landmarks=True の推論）が必要な特徴量
+REFINED_FEATURES: Set[str] = {"iris_vertical", "iris_horizontal"}
+
+
+def extract_features(
+    points: np.ndarray, names: Sequence[str], out: np.ndarray
+) -> np.ndarray:
+    """指定した特徴量を計算します。
+
+    複数の顔がある場合は、値が得られた最初の顔の値を使います
+    （LandmarkEngine は演者の顔だけを返すため、通常は1顔です）。
+
+    Args:
+        points: 形状 (F, N, 3) のランドマーク配列
+        names: 特徴量名（FEATURES のキー）
+        out: 結果を書き込む形状 (len(names),) の配列
+
+    Returns:
+        out（顔が無い・値が得られない特徴量はNaN）
+    """
+    out.fill(np.nan)
+    if points.shape[0] > 0:
+        for i, name in enumerate(names):
+            per_face: np.ndarray = FEATURES[name](points)
+            valid: np.ndarray = ~np.isnan(per_face)
+            if valid.any():
+                out[i] = per_face[int(np.argmax(valid))]
+    return out
+
+
+def face_features(points: np.ndarray, names: Sequence[str]) -> np.ndarray:
+    """顔ごとに指定した特徴量を計算します（演者を後から選ぶワーカープロセス用）。
+
+    Args:
+        points: 形状 (F, N, 3) のランドマーク配列
+        names: 特徴量名（FEATURES のキー）
+
+    Returns:
+        形状 (F, len(names)) の配列（値が得られない特徴量はNaN）
+    """
+    values: np.ndarray = np.empty((points.shape[0], len(names)))
+    if points.shape[0] > 0:
+        for i, name in enumerate(names):
+            values[:, i] = FEATURES[name](points)
+    return values
+
+
+def register_feature(
+    name: str, function: FeatureFunction, refined: bool = False
+) -> None:
+    """特徴量関数を登録します。
+
+    Args:
+        name: ルールから参照する特徴量名
+        function: ランドマーク配列 (F, N, 3) から顔ごとの値 (F,) を求める関数
+        refined: 虹彩ランドマークが必要かどうか（軽量な推論ではNaNになる）
+    """
+    FEATURES[name] = function
+    if refined:
+        REFINED_FEATURES.add(name)
+    else:
+        REFINED_FEATURES.discard(name)
+
+
+@dataclass(frozen=True)
+class GestureRule:
+    """ジェスチャーの判定ルール。
+
+    Attributes:
+        name: ジェスチャー名
+        feature: 判定に使う特徴量名（FEATURES のキー）
+        threshold: 検知を開始する閾値
+        direction: "above" は閾値を上回ったら、"below" は下回ったら検知
+        hysteresis: 検知を終了するまでに閾値から戻る必要がある幅
+        hold: キー送信までの継続時間（秒）
+        cooldown: キー送信後、次に送信できるまでの時間（秒）
+        key: 送信するキー名（Noneの場合は検知のみ）
+        approach: 閾値のこの幅まで近づいたら推論頻度を上げる
+    """
+
+    name: str
+    feature: str
+    threshold: float
+    direction: Literal["above", "below"] = "above"
+    hysteresis: float = 0.0
+    hold: float = 1.0
+    cooldown: float = 0.0
+    key: Optional[str] = None
+    approach: float = 0.0
+
+
+# 組み込みのジェスチャー（既定で有効なのは DEFAULT_GESTURES のみ）
+BUILTIN_RULES: Dict[str, GestureRule] = {
+    rule.name: rule
+    for rule in (
+        GestureRule(
+            "mouth_open",
+            "mouth_open",
+            0.05,
+            hysteresis=0.01,
+            hold=1.0,
+            key="down",
+            approach=0.02,
+        ),
+        GestureRule(
+            "look_up",
+            "iris_vertical",
+            0.4,
+            "below",
+            hysteresis=0.03,
+            hold=1.0,
+            key="up",
+            approach=0.05,
+        ),
+        GestureRule(
+            "look_left",
+            "iris_horizontal",
+            0.35,
+            "below",
+            hysteresis=0.03,
+            hold=1.0,
+            key="left",
+            approach=0.05,
+        ),
+        GestureRule(
+            "look_right",
+            "iris_horizontal",
+            0.65,
+            hysteresis=0.03,
+            hold=1.0,
+            key="right",
+            approach=0.05,
+        ),
+        GestureRule(
+            "blink",
+            "eye_openness",
+            0.01,
+            "below",
+            hysteresis=0.003,
+            hold=0.3,
+            cooldown=1.0,
+        ),
+        GestureRule(
+            "head_tilt_left", "head_roll", -12.0, "below", hysteresis=3.0, hold=0.5
+        ),
+        GestureRule("head_tilt_right", "head_roll", 12.0, hysteresis=3.0, hold=0.5),
+    )
+}
+DEFAULT_GESTURES: Tuple[str, ...] = ("mouth_open", "look_up")
+
+
+class GestureRegistry:
+    """有効なジェスチャールールの一覧。"""
+
+    def __init__(self, rules: Optional[Sequence[GestureRule]] = None) -> None:
+        """GestureRegistryを初期化します。
+
+        Args:
+            rules: 登録するルール（省略時は DEFAULT_GESTURES）
+        """
+        if rules is None:
+            rules = [BUILTIN_RULES[name] for name in DEFAULT_GESTURES]
+        self._rules: Dict[str, GestureRule] = {}
+        for rule in rules:
+            self.register(rule)
+
+    def register(self, rule: GestureRule) -> None:
+        """ルールを登録します（同名のルールは置き換えます）。
+
+        Args:
+            rule: 登録するルール
+
+        Raises:
+            KeyError: 未登録の特徴量を参照している場合
+        """
+        if rule.feature not in FEATURES:
+            raise KeyError(f"Unknown feature: {rule.feature}")
+        self._rules[rule.name] = rule
+
+    def unregister(self, name: str) -> None:
+        """ルールを削除します。
+
+        Args:
+            name: ジェスチャー名
+        """
+        self._rules.pop(name, None)
+
+    def __iter__(self) -> Iterator[GestureRule]:
+        """登録順にルールを返します。"""
+        return iter(self._rules.values())
+
+    def __len__(self) -> int:
+        """登録されているルールの数を返します。"""
+        return len(self._rules)
+
+    def __getitem__(self, name: str) -> GestureRule:
+        """名前でルールを取得します。"""
+        return self._rules[name]
+
+    def __contains__(self, name: object) -> bool:
+        """指定した名前のルールが登録されているかどうかを返します。"""
+        return name in self._rules
+
+
+class GestureEngine:
+    """登録された全てのジェスチャーを配列演算でまとめて判定するエンジン。
+
+    ルールは「閾値を上回る」向きに符号をそろえた配列として保持し、
+    検知・ヒステリシス・保持時間・クールダウンをジェスチャー数に依存しない
+    回数のNumPy演算で評価します。
+    """
+
+    def __init__(self, rules: Sequence[GestureRule], smoothing: bool = True) -> None:
+        """ルールから判定用の配列を構築します。
+
+        Args:
+            rules: 判定するルール
+            smoothing: 特徴量を OneEuroFilter で平滑化するかどうか
+        """
+        self.rules: List[GestureRule] = list(rules)
+        self.names: List[str] = [rule.name for rule in self.rules]
+
+        # 特徴量は複数のルールで共有し、1フレームにつき1回だけ計算する
+        self.features: List[str] = list(dict.fromkeys(r.feature for r in self.rules))
+        self.feature_index: np.ndarray = np.array(
+            [self.features.index(r.feature) for r in self.rules], dtype=np.intp
+        )
+
+        # "below" のルールは符号を反転し、全て「上回ったら検知」として扱う
+        self.signs: np.ndarray = np.array(
+            [1.0 if r.direction == "above" else -1.0 for r in self.rules]
+        )
+        thresholds: np.ndarray = np.array([r.threshold for r in self.rules])
+        self.enter: np.ndarray = self.signs * thresholds
+        self.exit: np.ndarray = self.enter - np.array(
+            [r.hysteresis for r in self.rules]
+        )
+        self.near: np.ndarray = self.enter - np.array([r.approach for r in self.rules])
+        self.hold: np.ndarray = np.array([r.hold for r in self.rules])
+        self.cooldown: np.ndarray = np.array([r.cooldown for r in self.rules])
+        # 虹彩ランドマークが必要なジェスチャー（視線など）
+        self.refined: np.ndarray = np.array(
+            [r.feature in REFINED_FEATURES for r in self.rules], dtype=bool
+        )
+
+        # ジェスチャーごとの状態
+        count: int = len(self.rules)
+        self.active: np.ndarray = np.zeros(count, dtype=bool)
+        self.hold_start: np.ndarray = np.full(count, np.nan)  # NaN は保持していない
+        self.last_fire: np.ndarray = np.full(count, -np.inf)
+        self.raw_values: np.ndarray = np.full(len(self.features), np.nan)
+        self.values: np.ndarray = np.full(len(self.features), np.nan)
+
+        # 特徴量ごとの平滑化（Noneの場合は生の値で判定）
+        self.smoothing: bool = smoothing
+        self.filter: Optional[OneEuroFilter] = (
+            OneEuroFilter(len(self.features)) if smoothing else None
+        )
+
+    def compute_features(self, points: np.ndarray) -> np.ndarray:
+        """ルールが参照する特徴量を計算します。
+
+        Args:
+            points: 形状 (F, N, 3) のランドマーク配列
+
+        Returns:
+            形状 (特徴量数,) の平滑化前の値（顔が無い場合はNaN）
+        """
+        return extract_features(points, self.features, self.raw_values)
+
+    def smooth(self, values: np.ndarray, current_time: float) -> np.ndarray:
+        """特徴量を平滑化し、判定に使う値として保持します。
+
+        Args:
+            values: compute_features() で求めた特徴量
+            current_time: フレームの時刻（秒）
+
+        Returns:
+            形状 (特徴量数,) の平滑化した値
+        """
+        if self.filter is None:
+            np.copyto(self.values, values)
+        else:
+            np.copyto(self.values, self.filter(values, current_time))
+        return self.values
+
+    def update(self, values: np.ndarray, current_time: float) -> np.ndarray:
+        """全てのジェスチャーの状態を1ステップ更新します。
+
+        Args:
+            values: smooth() で平滑化した特徴量
+            current_time: フレームの時刻（秒）
+
+        Returns:
+            このフレームでキーを送信すべきジェスチャーのマスク
+        """
+        signed: np.ndarray = self.signs * values[self.feature_index]
+        # 検知中は exit、未検知は enter を基準にする（NaN はどちらも False）
+        self.active = np.where(self.active, signed > self.exit, signed > self.enter)
+
+        starting: np.ndarray = self.active & np.isnan(self.hold_start)
+        self.hold_start[starting] = current_time
+        self.hold_start[~self.active] = np.nan
+
+        with np.errstate(invalid="ignore"):
+            fired: np.ndarray = (
+                self.active
+                & (current_time - self.hold_start > self.hold)
+                & (current_time - self.last_fire >= self.cooldown)
+            )
+        self.last_fire[fired] = current_time
+        # 送信後は次のフレームから保持をやり直す
+        self.hold_start[fired] = np.nan
+        return fired
+
+    def is_calm(self, values: np.ndarray, mask: Optional[np.ndarray] = None) -> bool:
+        """全てのジェスチャーが閾値から十分離れていて、保持中でもないかどうか。
+
+        閾値への接近は平滑化の遅延なく検知できるよう、平滑化前の値で判定します
+        （中央値による外れ値除去は、推論頻度を落とした直後の1回目の接近を捨てるため）。
+
+        Args:
+            values: compute_features() で求めた平滑化前の特徴量
+            mask: 対象にするジェスチャーのマスク（省略時は全て。例: self.refined）
+
+        Returns:
+            推論頻度（または精度）を落としてよい場合True
+        """
+        signed: np.ndarray = self.signs * values[self.feature_index]
+        busy: np.ndarray = (
+            self.active | ~np.isnan(self.hold_start) | (signed > self.near)
+        )
+        if mask is not None:
+            busy &= mask
+        return not bool(busy.any())
+
+    def state(self) -> Dict[str, bool]:
+        """ジェスチャー名ごとの検知状態を返します。"""
+        return dict(zip(self.names, self.active.tolist()))
+
+    def feature_value(self, name: str) -> float:
+        """直前に平滑化した特徴量の値を返します（参照されていない場合はNaN）。
+
+        Args:
+            name: 特徴量名
+        """
+        if name not in self.features:
+            return float("nan")
+        return float(self.values[self.features.index(name)])
+
+    def rebuild(self, rules: Sequence[GestureRule]) -> GestureEngine:
+        """ルールを差し替えた新しいエンジンを作り、同名のジェスチャーの状態を引き継ぎます。
+
+        Args:
+            rules: 新しいルール
+
+        Returns:
+            新しいエンジン
+        """
+        return GestureEngine(rules, self.smoothing).inherit(self)
+
+    def inherit(self, previous: GestureEngine) -> GestureEngine:
+        """以前のエンジンから同名のジェスチャーの状態を引き継ぎます。
+
+        判定用の配列は生成時に構築済みのため、別のスレッドで生成しておいた
+        エンジンをフレームの合間に差し替える場合も、ここでは状態のコピーだけを行います。
+
+        Args:
+            previous: 状態を引き継ぐエンジン
+
+        Returns:
+            このエンジン
+        """
+        if self.features == previous.features:
+            # 特徴量が同じなら平滑化の状態も引き継ぐ
+            self.filter = previous.filter
+            np.copyto(self.values, previous.values)
+        for i, name in enumerate(self.names):
+            if name in previous.names:
+                j: int = previous.names.index(name)
+                self.active[i] = previous.active[j]
+                self.hold_start[i] = previous.hold_start[j]
+                self.last_fire[i] = previous.last_fire[j]
+        return self
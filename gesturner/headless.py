@@ -0,0 +1,90 @@
+"""オーバーレイやデバッグウィンドウを使わないヘッドレス実行のエントリーポイント。
+
+tkinter・pywin32 を読み込まないため、デスクトップの無い Linux 環境でも
+カメラや動画ファイルに対して検知処理を実行し、送信したキーと処理時間を表示できます。
+キー送信の既定は記録のみ（recorder）です。
+
+使い方:
+    python -m gesturner.headless --source recording.mp4 --metrics metrics.jsonl
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Optional
+
+# 起動時間の内訳の基準（モジュールを読み込む前の時刻）
+STARTED_AT: float = time.perf_counter()
+
+from gesturner.actuation import KeyEvent
+from gesturner.metrics import StartupTimer
+from gesturner.pipeline import Pipeline, ResultPacket
+from gesturner.runner import Runner, add_arguments, parse_args
+
+
+def _print_key(event: KeyEvent) -> None:
+    """送信したキーを表示します。"""
+    print(f"[key] {event.key} latency={event.latency_ms or 0.0:.1f}ms")
+
+
+def run() -> None:
+    """ヘッドレスで検知処理を実行します。"""
+    parser = argparse.ArgumentParser(description="Run gesture detection headless")
+    add_arguments(parser, key_backend="recorder")
+    parser.add_argument(
+        "--duration",
+        type=float,
+        default=0.0,
+        help="Stop after this many seconds (default: until the source ends)",
+    )
+    parser.add_argument(
+        "--report-interval",
+        type=float,
+        default=5.0,
+        help="Seconds between stage timing reports (default: 5)",
+    )
+    args, profile = parse_args(parser)
+
+    startup: StartupTimer = StartupTimer(STARTED_AT)
+    startup.mark("imports")
+    runner: Runner = Runner(parser, args, startup, on_key=_print_key, profile=profile)
+    pipeline: Pipeline = runner.start()
+
+    started: float = time.perf_counter()
+    last_report_time: float = started
+    frames: int = 0
+    try:
+        while pipeline.running:
+            now: float = time.perf_counter()
+            if args.duration and now - started >= args.duration:
+                break
+            packet: Optional[ResultPacket] = pipeline.get_result(timeout=0.1)
+            if packet is None:
+                continue
+            if frames == 0:
+                startup.mark("ready")
+                print(f"[startup] {startup.summary()}")
+            frames += 1
+            pipeline.record_consumer(packet, 0.0)
+
+            if now - last_report_time >= args.report_interval:
+                print(
+                    f"[pipeline] {pipeline.timings.summary()} "
+                    f"dropped={pipeline.frames.dropped}"
+                )
+                last_report_time = now
+    except KeyboardInterrupt:
+        pass
+    finally:
+        runner.close()
+
+    elapsed: float = time.perf_counter() - started
+    print(
+        f"[headless] frames={frames} fps={frames / max(elapsed, 1e-9):.1f} "
+        f"{pipeline.timings.summary()}"
+    )
+
+
+if __name__ == "__main__":
+    run()
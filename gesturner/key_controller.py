@@ -1,51 +1,106 @@
 """キーボード入力を送信するユーティリティモジュール。
 
 PyAutoGUIを使用して各種キー入力をシミュレートします。
+PyAutoGUIはディスプレイの無い環境では読み込めないため、
+最初にキーを送信する時点で読み込みます。
 """
 
-import pyautogui
+from typing import Callable, Optional
+
+# キー名と、キーを送信すべきと判定したフレームの取得時刻（秒）を受け取って
+# キー入力を送信する関数の型
+KeySender = Callable[[str, float], None]
+
+
+def press_key(key: str, timestamp: Optional[float] = None) -> None:
+    """PyAutoGUIで指定したキーを送信します。
+
+    Args:
+        key: PyAutoGUIのキー名（"up", "down" など）
+        timestamp: フレームの取得時刻（使用しない）
+    """
+    import pyautogui
+
+    pyautogui.press(key)
+
+
+def send_no_key(key: str, timestamp: Optional[float] = None) -> None:
+    """キー入力を送信しません（ヘッドレス実行用）。
+
+    Args:
+        key: 送信されるはずだったキー名
+        timestamp: フレームの取得時刻（使用しない）
+    """
+
+
+class KeyRecorder:
+    """キー入力を送信せずに記録するキー送信先（リプレイ・テスト用）。
+
+    press() を持つため、KeyActuator のバックエンド（"recorder"）としても使えます。
+    """
+
+    def __init__(self) -> None:
+        """KeyRecorderを初期化します。"""
+        self.keys: list[str] = []
+
+    def __call__(self, key: str, timestamp: Optional[float] = None) -> None:
+        """キー名を記録します。
+
+        Args:
+            key: 送信されるはずだったキー名
+            timestamp: フレームの取得時刻（使用しない）
+        """
+        self.press(key)
+
+    def press(self, key: str) -> None:
+        """キー名を記録します（KeyBackendとしての呼び出し）。
+
+        Args:
+            key: 送信されるはずだったキー名
+        """
+        self.keys.append(key)
 
 
 def send_left_key() -> None:
     """左矢印キーを送信します。"""
-    pyautogui.press("left")
+    press_key("left")
 
 
 def send_right_key() -> None:
     """右矢印キーを送信します。"""
-    pyautogui.press("right")
+    press_key("right")
 
 
 def send_up_key() -> None:
     """上矢印キーを送信します。"""
-    pyautogui.press("up")
+    press_key("up")
 
 
 def send_down_key() -> None:
     """下矢印キーを送信します。"""
-    pyautogui.press("down")
+    press_key("down")
 
 
 def send_enter_key() -> None:
     """Enterキーを送信します。"""
-    pyautogui.press("enter")
+    press_key("enter")
 
 
 def send_escape_key() -> None:
     """Escapeキーを送信します。"""
-    pyautogui.press("escape")
+    press_key("escape")
 
 
 def send_space_key() -> None:
     """スペースキーを送信します。"""
-    pyautogui.press("space")
+    press_key("space")
 
 
 def send_tab_key() -> None:
     """Tabキーを送信します。"""
-    pyautogui.press("tab")
+    press_key("tab")
 
 
 def send_backspace_key() -> None:
     """Backspaceキーを送信します。"""
-    pyautogui.press("backspace")
+    press_key("backspace")
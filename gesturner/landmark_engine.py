@@ -0,0 +1,211 @@
+from __future__ import annotations
+
+from typing import Any, Optional, Sequence, Tuple
+
+import numpy as np
+
+from gesturner.landmarks import (
+    NUM_LANDMARKS,
+    NUM_REFINED_LANDMARKS,
+    empty_landmarks,
+    outline_array,
+    to_array,
+)
+from gesturner.metrics import METRICS
+from gesturner.performer import DEFAULT_MAX_FACES, PerformerSelector
+from gesturner.roi_tracker import Box, RoiTracker
+
+
+class LandmarkEngine:
+    """1フレームにつき1回だけFaceMesh推論を行う共有ランドマークエンジン。
+
+    色変換と推論をここに集約し、結果を複数の検知器で共有することで、
+    ジェスチャーを追加しても推論回数が増えないようにします。
+    複数の顔が検出された場合は演者の顔だけを配列に変換して返すため、
+    他の顔は外形の数点を読むだけで、特徴量も計算されません。
+    process(frame, refine=False) では虹彩を推論しない軽量なFaceMeshを使います
+    （初回の呼び出しで生成し、虹彩の座標はNaNになります）。
+    ワーカープロセスでは detect_faces() で全ての顔を返し、追跡と演者の選択は
+    呼び出し元（メインプロセス）が行います。
+    """
+
+    def __init__(
+        self,
+        refine_landmarks: bool = True,
+        roi_tracking: bool = True,
+        max_num_faces: int = DEFAULT_MAX_FACES,
+        performer: str = "largest",
+    ) -> None:
+        """LandmarkEngineを初期化します。
+
+        Args:
+            refine_landmarks: 虹彩ランドマークを含む精密モデルを使用するかどうか
+            roi_tracking: 前フレームの顔の周辺だけを切り出して推論するかどうか
+            max_num_faces: FaceMeshが検出する顔の最大数（多いほど推論が重くなる）
+            performer: 演者の選び方（"largest" または "central"）
+        """
+        # MediaPipeは読み込みに時間がかかるため、エンジンを生成する時点で読み込む
+        import mediapipe as mp  # type: ignore
+
+        self._face_mesh_class: Any = mp.solutions.face_mesh.FaceMesh
+        self.max_num_faces: int = max_num_faces
+        self.face_mesh: Any = self._face_mesh_class(
+            max_num_faces=max_num_faces, refine_landmarks=refine_landmarks
+        )
+        # 虹彩を推論しない軽量なFaceMesh（refine=False で初めて使う時に生成）
+        self.lite_mesh: Any = None if refine_landmarks else self.face_mesh
+        self.num_landmarks: int = (
+            NUM_REFINED_LANDMARKS if refine_landmarks else NUM_LANDMARKS
+        )
+        self.roi_tracker: Optional[RoiTracker] = RoiTracker() if roi_tracking else None
+        self.performer: PerformerSelector = PerformerSelector(performer)
+
+    def process(self, frame: np.ndarray, refine: bool = True) -> np.ndarray:
+        """フレームからランドマークを検出します。
+
+        Args:
+            frame: 入力画像（BGR形式のnumpy配列）
+            refine: 虹彩まで推論するかどうか（Falseの場合は軽量なFaceMeshを使う）
+
+        Returns:
+            演者の顔だけを含む形状 (0 または 1, ランドマーク数, 3) の
+            float32 配列（正規化座標）
+        """
+        # 前フレームの演者の顔の周辺だけを推論する
+        faces: Sequence[Any]
+        box: Optional[Box]
+        faces, box = self.detect(
+            frame, refine, None if self.roi_tracker is None else self.roi_tracker.box
+        )
+        points: np.ndarray = self._select_performer(faces, box, frame.shape)
+        if self.roi_tracker is not None:
+            self.roi_tracker.update(points, frame.shape)
+        return points
+
+    def detect(
+        self, frame: np.ndarray, refine: bool = True, box: Optional[Box] = None
+    ) -> Tuple[Sequence[Any], Optional[Box]]:
+        """指定した領域でFaceMesh推論を行います（追跡と演者の状態は変更しません）。
+
+        Args:
+            frame: 入力画像（BGR形式のnumpy配列）
+            refine: 虹彩まで推論するかどうか（Falseの場合は軽量なFaceMeshを使う）
+            box: 推論する切り出し領域（Noneの場合、または roi_tracking=False の場合は
+                フレーム全体）
+
+        Returns:
+            FaceMeshの multi_face_landmarks と、実際に推論した切り出し領域の組
+            （領域に顔が無くフレーム全体で探索し直した場合、領域はNone）
+        """
+        mesh: Any = self.face_mesh
+        if not refine and self.lite_mesh is None:
+            self.lite_mesh = self._face_mesh_class(
+                max_num_faces=self.max_num_faces, refine_landmarks=False
+            )
+        if not refine:
+            mesh = self.lite_mesh
+
+        if self.roi_tracker is None or box is None:
+            return self._infer(mesh, frame), None
+
+        roi: np.ndarray
+        roi, box = self.roi_tracker.crop_to(frame, box)
+        faces: Sequence[Any] = self._infer(mesh, roi)
+        if not faces:
+            # 追跡を見失ったらフレーム全体で探索し直す
+            return self._infer(mesh, frame), None
+        return faces, box
+
+    def detect_faces(
+        self, frame: np.ndarray, refine: bool = True, box: Optional[Box] = None
+    ) -> np.ndarray:
+        """指定した領域で推論し、全ての顔をランドマーク配列に変換します。
+
+        Args:
+            frame: 入力画像（BGR形式のnumpy配列）
+            refine: 虹彩まで推論するかどうか
+            box: 推論する切り出し領域（Noneの場合はフレーム全体）
+
+        Returns:
+            形状 (顔の数, ランドマーク数, 3) の float32 配列（フレーム全体の正規化座標。
+            軽量な推論では虹彩の座標はNaN）
+        """
+        faces: Sequence[Any]
+        faces, box = self.detect(frame, refine, box)
+        if not faces:
+            return empty_landmarks(self.num_landmarks)
+        points: np.ndarray = self._pad(to_array(faces, len(faces[0].landmark)))
+        if box is not None:
+            RoiTracker.to_full_frame(points, box, frame.shape)
+        return points
+
+    def _pad(self, points: np.ndarray) -> np.ndarray:
+        """軽量なFaceMeshの結果を、虹彩の座標をNaNとして同じ形状にそろえます。"""
+        count: int = points.shape[1]
+        if count >= self.num_landmarks:
+            return points
+        padded: np.ndarray = np.full(
+            (points.shape[0], self.num_landmarks, 3), np.nan, dtype=np.float32
+        )
+        padded[:, :count] = points
+        return padded
+
+    def _infer(self, mesh: Any, image: np.ndarray) -> Sequence[Any]:
+        """画像に対してFaceMesh推論を1回実行します。
+
+        Args:
+            mesh: 推論に使うFaceMesh
+            image: 入力画像（BGR形式）
+
+        Returns:
+            FaceMeshの multi_face_landmarks（顔が無い場合は空）
+        """
+        # OpenCVは起動を遅らせないよう、初めて推論する時点で読み込む
+        import cv2
+
+        with METRICS.span("cvtColor"):
+            rgb_image: np.ndarray = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+        with METRICS.span("face_mesh" if mesh is self.face_mesh else "face_mesh_lite"):
+            results = mesh.process(rgb_image)
+        return results.multi_face_landmarks or []
+
+    def _select_performer(
+        self, faces: Sequence[Any], box: Optional[Box], frame_shape: Tuple[int, ...]
+    ) -> np.ndarray:
+        """検出した顔から演者を選び、その顔だけをランドマーク配列に変換します。
+
+        Args:
+            faces: FaceMeshの multi_face_landmarks
+            box: 推論に使った切り出し領域（フレーム全体の場合はNone）
+            frame_shape: 元フレームの shape
+
+        Returns:
+            形状 (0 または 1, ランドマーク数, 3) の float32 配列（フレーム全体の正規化座標）
+        """
+        # 演者の選択には顔の外形の数点だけを使う
+        outline: np.ndarray = outline_array(faces)
+        if box is not None:
+            RoiTracker.to_full_frame(outline, box, frame_shape)
+        index: int = self.performer.select(outline)
+        if len(faces) > 1:
+            METRICS.increment("faces.ignored", len(faces) - (index >= 0))
+        if index < 0:
+            return empty_landmarks(self.num_landmarks)
+
+        face: Any = faces[index]
+        points: np.ndarray = self._pad(to_array([face], len(face.landmark)))
+        if box is not None:
+            RoiTracker.to_full_frame(points, box, frame_shape)
+        return points
+
+    def reset(self) -> None:
+        """顔の追跡と演者の選択を解除し、次のフレームで全体探索から始めます。"""
+        if self.roi_tracker is not None:
+            self.roi_tracker.reset()
+        self.performer.reset()
+
+    def close(self) -> None:
+        """FaceMeshのリソースを解放します。"""
+        self.face_mesh.close()
+        if self.lite_mesh is not None and self.lite_mesh is not self.face_mesh:
+            self.lite_mesh.close()
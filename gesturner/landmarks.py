@@ -0,0 +1,208 @@
+"""FaceMeshのランドマークをNumPy配列として扱うための特徴量抽出モジュール。
+
+FaceMeshの結果を顔ごとに連続した (N, 3) の float32 配列へ変換し、
+口・まぶた・虹彩のインデックス配列を使って、
+全ての顔の特徴量をまとめてNumPy演算で計算します。
+"""
+
+from __future__ import annotations
+
+from typing import Any, Optional, Sequence
+
+import numpy as np
+
+# ランドマーク数（refine_landmarks=True の場合は虹彩の10点を含む）
+NUM_LANDMARKS: int = 468
+NUM_REFINED_LANDMARKS: int = 478
+
+# 口のランドマーク: 上唇(13), 下唇(14), 眉間(10), 顎(152)
+MOUTH_INDICES: np.ndarray = np.array([13, 14, 10, 152], dtype=np.intp)
+
+# まぶたのランドマーク: 左目の上下(159, 145), 右目の上下(386, 374)
+EYELID_INDICES: np.ndarray = np.array([159, 145, 386, 374], dtype=np.intp)
+
+# 虹彩のランドマーク: 左目(468), 右目(473)
+IRIS_INDICES: np.ndarray = np.array([468, 473], dtype=np.intp)
+
+# 目尻・目頭のランドマーク（画像上の左から右の順）: 左目(33, 133), 右目(362, 263)
+EYE_CORNER_INDICES: np.ndarray = np.array([33, 133, 362, 263], dtype=np.intp)
+
+# 顔の高さ基準: 眉間(10), 顎(152)
+FACE_HEIGHT_INDICES: np.ndarray = np.array([10, 152], dtype=np.intp)
+
+# 顔の外形（位置と大きさの推定用）: 眉間(10), 顎(152), 左頬(234), 右頬(454)
+FACE_OUTLINE_INDICES: np.ndarray = np.array([10, 152, 234, 454], dtype=np.intp)
+
+# 目が閉じている、または検出が不安定と判断する目の高さ
+MIN_EYE_HEIGHT: float = 0.005
+
+
+def empty_landmarks(num_landmarks: int = NUM_REFINED_LANDMARKS) -> np.ndarray:
+    """顔が検出されなかった場合のランドマーク配列を返します。
+
+    Args:
+        num_landmarks: 1顔あたりのランドマーク数
+
+    Returns:
+        形状 (0, num_landmarks, 3) の float32 配列
+    """
+    return np.empty((0, num_landmarks, 3), dtype=np.float32)
+
+
+def to_array(
+    multi_face_landmarks: Optional[Sequence[Any]],
+    num_landmarks: int = NUM_REFINED_LANDMARKS,
+) -> np.ndarray:
+    """FaceMeshの結果を (F, N, 3) の float32 配列に変換します。
+
+    Args:
+        multi_face_landmarks: FaceMeshの multi_face_landmarks
+        num_landmarks: 1顔あたりのランドマーク数
+
+    Returns:
+        形状 (顔の数, ランドマーク数, 3) の連続した float32 配列（x, y, z）
+    """
+    if not multi_face_landmarks:
+        return empty_landmarks(num_landmarks)
+
+    points: np.ndarray = np.empty(
+        (len(multi_face_landmarks), num_landmarks, 3), dtype=np.float32
+    )
+    for i, face_landmarks in enumerate(multi_face_landmarks):
+        points[i] = np.fromiter(
+            (v for lm in face_landmarks.landmark for v in (lm.x, lm.y, lm.z)),
+            dtype=np.float32,
+            count=num_landmarks * 3,
+        ).reshape(num_landmarks, 3)
+    return points
+
+
+def outline_array(multi_face_landmarks: Sequence[Any]) -> np.ndarray:
+    """FaceMeshの結果から、全ての顔の外形のランドマークだけを取り出します。
+
+    全ランドマークを変換する to_array() より軽く、演者の選択に使います。
+
+    Args:
+        multi_face_landmarks: FaceMeshの multi_face_landmarks
+
+    Returns:
+        形状 (顔の数, len(FACE_OUTLINE_INDICES), 3) の float32 配列（x, y, z）
+    """
+    outline: np.ndarray = np.empty(
+        (len(multi_face_landmarks), FACE_OUTLINE_INDICES.shape[0], 3),
+        dtype=np.float32,
+    )
+    for i, face_landmarks in enumerate(multi_face_landmarks):
+        landmark: Any = face_landmarks.landmark
+        for j, index in enumerate(FACE_OUTLINE_INDICES):
+            lm: Any = landmark[index]
+            outline[i, j] = (lm.x, lm.y, lm.z)
+    return outline
+
+
+def mouth_open_ratio(points: np.ndarray) -> np.ndarray:
+    """全ての顔について、顔の高さに対する口の開きの比率を計算します。
+
+    Args:
+        points: 形状 (F, N, 3) のランドマーク配列
+
+    Returns:
+        形状 (F,) の比率。顔の高さが0以下の顔はNaN
+    """
+    y: np.ndarray = points[:, MOUTH_INDICES, 1]
+    upper_lip, lower_lip, forehead, chin = y[:, 0], y[:, 1], y[:, 2], y[:, 3]
+    face_height: np.ndarray = chin - forehead
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(
+            face_height > 0.0, (lower_lip - upper_lip) / face_height, np.nan
+        ).astype(np.float32, copy=False)
+
+
+def iris_ratio(points: np.ndarray) -> np.ndarray:
+    """全ての顔について、まぶたの間での虹彩の相対位置（左右平均）を計算します。
+
+    0.0が上端、1.0が下端を表します。
+
+    Args:
+        points: 形状 (F, N, 3) のランドマーク配列（虹彩を含む）
+
+    Returns:
+        形状 (F,) の比率。目が閉じている顔、虹彩が無い場合はNaN
+    """
+    if points.shape[1] < NUM_REFINED_LANDMARKS:
+        return np.full(points.shape[0], np.nan, dtype=np.float32)
+
+    lids: np.ndarray = points[:, EYELID_INDICES, 1].reshape(-1, 2, 2)
+    top: np.ndarray = lids[:, :, 0]
+    eye_height: np.ndarray = lids[:, :, 1] - top
+    iris: np.ndarray = points[:, IRIS_INDICES, 1]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratios: np.ndarray = ((iris - top) / eye_height).mean(axis=1)
+    open_eyes: np.ndarray = (eye_height >= MIN_EYE_HEIGHT).all(axis=1)
+    return np.where(open_eyes, ratios, np.nan).astype(np.float32, copy=False)
+
+
+def iris_horizontal_ratio(points: np.ndarray) -> np.ndarray:
+    """全ての顔について、目頭と目尻の間での虹彩の水平位置（左右平均）を計算します。
+
+    0.0が画像上の左端、1.0が右端を表します。
+
+    Args:
+        points: 形状 (F, N, 3) のランドマーク配列（虹彩を含む）
+
+    Returns:
+        形状 (F,) の比率。目の幅が0の顔、虹彩が無い場合はNaN
+    """
+    if points.shape[1] < NUM_REFINED_LANDMARKS:
+        return np.full(points.shape[0], np.nan, dtype=np.float32)
+
+    corners: np.ndarray = points[:, EYE_CORNER_INDICES, 0].reshape(-1, 2, 2)
+    left: np.ndarray = corners[:, :, 0]
+    eye_width: np.ndarray = corners[:, :, 1] - left
+    iris: np.ndarray = points[:, IRIS_INDICES, 0]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratios: np.ndarray = ((iris - left) / eye_width).mean(axis=1)
+    return np.where((eye_width > 0.0).all(axis=1), ratios, np.nan).astype(
+        np.float32, copy=False
+    )
+
+
+def eye_openness(points: np.ndarray) -> np.ndarray:
+    """全ての顔について、顔の高さに対する目の開き（左右平均）を計算します。
+
+    まばたきの検知に使います。
+
+    Args:
+        points: 形状 (F, N, 3) のランドマーク配列
+
+    Returns:
+        形状 (F,) の比率。顔の高さが0以下の顔はNaN
+    """
+    lids: np.ndarray = points[:, EYELID_INDICES, 1].reshape(-1, 2, 2)
+    eye_height: np.ndarray = (lids[:, :, 1] - lids[:, :, 0]).mean(axis=1)
+    y: np.ndarray = points[:, FACE_HEIGHT_INDICES, 1]
+    face_height: np.ndarray = y[:, 1] - y[:, 0]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(face_height > 0.0, eye_height / face_height, np.nan).astype(
+            np.float32, copy=False
+        )
+
+
+def head_roll(points: np.ndarray) -> np.ndarray:
+    """全ての顔について、両目の目尻を結ぶ線の正規化座標上での傾き（度）を計算します。
+
+    正の値は画像上で右側が下がっている（時計回りに傾いている）ことを表します。
+
+    Args:
+        points: 形状 (F, N, 3) のランドマーク配列
+
+    Returns:
+        形状 (F,) の角度（度）
+    """
+    outer: np.ndarray = points[:, EYE_CORNER_INDICES[[0, 3]], :2]
+    delta: np.ndarray = outer[:, 1] - outer[:, 0]
+    return np.degrees(np.arctan2(delta[:, 1], delta[:, 0])).astype(
+        np.float32, copy=False
+    )
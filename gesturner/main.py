@@ -2,23 +2,33 @@
 
 カメラからの映像をリアルタイムで解析し、
 ジェスチャー（口の開閉・視線方向）を検知してキー入力を送信します。
+検知処理は gesturner.runner にまとめ、このモジュールはオーバーレイと
+デバッグウィンドウ（UIプラグイン）の表示だけを担当します。
 """
 
 import os
+import time
 import argparse
 from threading import Thread
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
-import cv2
-import numpy as np
+# 起動時間の内訳の基準（モジュールを読み込む前の時刻）
+STARTED_AT: float = time.perf_counter()
 
 # TensorFlow/MediaPipeのログレベル設定
 # 0 = 全て表示, 1 = INFOを非表示, 2 = WARNINGを非表示, 3 = ERRORを非表示
 os.environ["TF_CPP_MIN_LOG_LEVEL"] = "0"
 
 from gesturner.overlay import Overlay
-from gesturner.debug_window import DebugWindow
-from gesturner.controller import GestureController, ProcessResult
+from gesturner.controller import ProcessResult
+from gesturner.pipeline import Pipeline, ResultPacket
+from gesturner.metrics import METRICS, StartupTimer
+from gesturner.runner import Runner, add_arguments, parse_args
+
+# OpenCV（デバッグウィンドウを含む）はオーバーレイを表示した後、
+# カメラを開く時点で読み込む（読み込み時間は起動時間の内訳の camera に含まれる）
+if TYPE_CHECKING:
+    from gesturner.debug_window import DebugWindow
 
 
 def run() -> None:
@@ -29,36 +39,50 @@ def run() -> None:
     """
     parser = argparse.ArgumentParser(description="Gesturner application")
     parser.add_argument("--debug", action="store_true", help="Enable debug window")
-    args = parser.parse_args()
+    add_arguments(parser)
+    args, profile = parse_args(parser)
+
+    startup: StartupTimer = StartupTimer(STARTED_AT)
+    startup.mark("imports")
+    runner: Runner = Runner(parser, args, startup, profile=profile)
 
-    controller: GestureController = GestureController()
-    overlay: Overlay = Overlay()
-    debug_window: Optional[DebugWindow] = DebugWindow() if args.debug else None
+    # オーバーレイは重い初期化を待たずにすぐ表示する
+    with startup.phase("overlay"):
+        overlay: Overlay = Overlay(profile.overlay.geometry())
+    overlay.show_message("Loading")
 
     def camera_loop() -> None:
-        """カメラからフレームを取得し、ジェスチャー検知を実行するループ。
+        """起動処理の後、パイプラインの処理結果を受け取り、UIを更新するループ。
 
-        バックグラウンドスレッドで実行され、継続的にジェスチャーを監視します。
-        ESCキー（キーコード27）で終了できます。
-        """
-        """カメラからフレームを取得し、ジェスチャー検知を実行するループ。
-        
-        バックグラウンドスレッドで実行され、継続的にジェスチャーを監視します。
+        バックグラウンドスレッドで実行され、キャプチャと推論は
+        パイプラインの別スレッドで行われます。
         ESCキー（キーコード27）で終了できます。
         """
-        # カメラデバイスを開く（デバイスID: 0）
-        cap: cv2.VideoCapture = cv2.VideoCapture(0)
-
-        while cap.isOpened():
-            success: bool
-            frame: np.ndarray
-            success, frame = cap.read()
-            if not success:
-                break
-
-            # ジェスチャー処理と判定
-            result: ProcessResult = controller.process(frame)
-
+        pipeline: Pipeline = runner.start()
+        import cv2
+
+        debug_window: Optional[DebugWindow] = None
+        if args.debug:
+            from gesturner.debug_window import DebugWindow
+
+            debug_window = DebugWindow(
+                position=(profile.debug_window.x, profile.debug_window.y)
+            )
+        last_report_time: float = time.perf_counter()
+        first_result: bool = True
+
+        while pipeline.running:
+            packet: Optional[ResultPacket] = pipeline.get_result(timeout=0.1)
+            if packet is None:
+                continue
+            start: float = time.perf_counter()
+
+            if first_result:
+                startup.mark("ready")
+                print(f"[startup] {startup.summary()}")
+                first_result = False
+
+            result: ProcessResult = packet.result
             mouth_detected: bool = result["mouth_detected"]
             gaze_direction: Optional[str] = result["gaze_direction"]
             last_key_sent_time: float = result["last_key_sent_time"]
@@ -68,16 +92,36 @@ def run() -> None:
             overlay.update_status(is_any_detected)
 
             if debug_window:
-                debug_window.update(
-                    frame, mouth_detected, gaze_direction, last_key_sent_time
-                )
-
+                with METRICS.span("debug_window"):
+                    debug_window.update(
+                        packet.frame.frame,
+                        mouth_detected,
+                        gaze_direction,
+                        last_key_sent_time,
+                        pipeline.timings.snapshot(),
+                        frame_time=packet.frame.captured_at,
+                    )
+
+            key: int = cv2.waitKey(5) & 0xFF
             # ESCキーが押されたら終了
-            if cv2.waitKey(5) & 0xFF == 27:
+            if key == 27:
                 break
+            # Dキーでデバッグ表示の描画を一時停止・再開
+            if debug_window and key == ord("d"):
+                debug_window.enabled = not debug_window.enabled
+
+            pipeline.record_consumer(packet, (time.perf_counter() - start) * 1000.0)
+
+            # デバッグ時はステージごとの処理時間を定期的に表示
+            if args.debug and start - last_report_time >= 5.0:
+                print(
+                    f"[pipeline] {pipeline.timings.summary()} "
+                    f"dropped={pipeline.frames.dropped}"
+                )
+                last_report_time = start
 
         # リソースの解放
-        cap.release()
+        runner.close()
         if debug_window:
             debug_window.close()
         cv2.destroyAllWindows()
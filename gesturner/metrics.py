@@ -0,0 +1,321 @@
+"""ホットパスの計測と、JSON Lines・HTTPでの出力。
+
+各ステージの処理時間を単調時計（time.perf_counter）で計測し、
+固定サイズのリングバッファに保持した直近のサンプルからパーセンタイルを求めます。
+計測は既定で無効で、無効な間の span() / record() / increment() は
+何もせずに戻るだけなので、計測箇所をホットパスに残したままにできます。
+
+使い方:
+    from gesturner.metrics import METRICS
+
+    with METRICS.span("face_mesh"):
+        results = face_mesh.process(image)
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import TracebackType
+from typing import Any, Dict, Iterator, Optional, TextIO, Type
+
+import numpy as np
+
+# 1つのヒストグラムが保持するサンプル数
+HISTOGRAM_CAPACITY: int = 1024
+
+
+class RollingHistogram:
+    """直近のサンプルを固定サイズのリングバッファに保持するヒストグラム。
+
+    書き込みはロックを取らないため、集計中に書き込まれたサンプルが
+    含まれるかどうかは保証されません（診断用途には十分な精度です）。
+    """
+
+    def __init__(self, capacity: int = HISTOGRAM_CAPACITY) -> None:
+        """RollingHistogramを初期化します。
+
+        Args:
+            capacity: 保持するサンプル数
+        """
+        self._samples: np.ndarray = np.zeros(capacity)
+        self.count: int = 0  # これまでに追加したサンプルの総数
+
+    def add(self, value: float) -> None:
+        """サンプルを追加します（最も古いサンプルを上書き）。
+
+        Args:
+            value: サンプルの値
+        """
+        self._samples[self.count % self._samples.shape[0]] = value
+        self.count += 1
+
+    def summary(self) -> Dict[str, float]:
+        """直近のサンプルの統計量を返します。
+
+        Returns:
+            count（総数）, mean, p50, p95, p99, max を含む辞書
+        """
+        window: np.ndarray = self._samples[: min(self.count, self._samples.shape[0])]
+        if window.size == 0:
+            return {"count": 0}
+        p50, p95, p99 = np.percentile(window, (50, 95, 99))
+        return {
+            "count": self.count,
+            "mean": round(float(window.mean()), 3),
+            "p50": round(float(p50), 3),
+            "p95": round(float(p95), 3),
+            "p99": round(float(p99), 3),
+            "max": round(float(window.max()), 3),
+        }
+
+
+class _NullSpan:
+    """計測が無効な場合に返す何もしないコンテキストマネージャー。"""
+
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        return None
+
+
+_NULL_SPAN: _NullSpan = _NullSpan()
+
+
+class _Span:
+    """with ブロックの処理時間を記録するコンテキストマネージャー。"""
+
+    __slots__ = ("_metrics", "_name", "_start")
+
+    def __init__(self, metrics: Metrics, name: str) -> None:
+        self._metrics: Metrics = metrics
+        self._name: str = name
+        self._start: float = 0.0
+
+    def __enter__(self) -> None:
+        self._start = time.perf_counter()
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        self._metrics.record(self._name, (time.perf_counter() - self._start) * 1000.0)
+
+
+class Metrics:
+    """処理時間のヒストグラムとカウンターの集合。"""
+
+    def __init__(self) -> None:
+        """Metricsを初期化します（計測は無効な状態で始まります）。"""
+        self.enabled: bool = False
+        self.started_at: float = time.perf_counter()
+        self._histograms: Dict[str, RollingHistogram] = {}
+        self._counters: Dict[str, int] = {}
+        self._lock: threading.Lock = threading.Lock()
+
+    def span(self, name: str) -> Any:
+        """with ブロックの処理時間をミリ秒で記録するコンテキストマネージャーを返します。
+
+        Args:
+            name: 計測名
+        """
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name)
+
+    def record(self, name: str, elapsed_ms: float) -> None:
+        """処理時間のサンプルを記録します。
+
+        Args:
+            name: 計測名
+            elapsed_ms: 処理時間（ミリ秒）
+        """
+        if not self.enabled:
+            return
+        histogram: Optional[RollingHistogram] = self._histograms.get(name)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(name, RollingHistogram())
+        histogram.add(elapsed_ms)
+
+    def increment(self, name: str, amount: int = 1) -> None:
+        """カウンターを増やします。
+
+        Args:
+            name: カウンター名
+            amount: 増分
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def snapshot(self) -> Dict[str, Any]:
+        """現在の統計量をJSONに変換できる辞書として返します。
+
+        Returns:
+            time（Unix時間）, uptime（秒）, spans（計測名ごとの統計量）,
+            counters（カウンター）を含む辞書
+        """
+        with self._lock:
+            histograms: Dict[str, RollingHistogram] = dict(self._histograms)
+            counters: Dict[str, int] = dict(self._counters)
+        return {
+            "time": time.time(),
+            "uptime": round(time.perf_counter() - self.started_at, 3),
+            "spans": {name: h.summary() for name, h in sorted(histograms.items())},
+            "counters": counters,
+        }
+
+
+# プロセス全体で共有する計測（--metrics を指定した場合のみ有効になる）
+METRICS: Metrics = Metrics()
+
+
+class StartupTimer:
+    """起動処理の段階ごとの所要時間を記録するクラス。
+
+    段階は複数のスレッドで並行して記録できます。
+    """
+
+    def __init__(self, started_at: Optional[float] = None) -> None:
+        """StartupTimerを初期化します。
+
+        Args:
+            started_at: 起動の基準時刻（time.perf_counter。省略時は現在時刻）
+        """
+        self.started_at: float = (
+            time.perf_counter() if started_at is None else started_at
+        )
+        self._phases: Dict[str, float] = {}
+        self._lock: threading.Lock = threading.Lock()
+
+    def record(self, name: str, elapsed_ms: float) -> None:
+        """段階の所要時間を記録します。
+
+        Args:
+            name: 段階名
+            elapsed_ms: 所要時間（ミリ秒）
+        """
+        with self._lock:
+            self._phases[name] = elapsed_ms
+        METRICS.record(f"startup.{name}", elapsed_ms)
+
+    def mark(self, name: str) -> None:
+        """基準時刻からの経過時間を段階として記録します。
+
+        Args:
+            name: 段階名
+        """
+        self.record(name, (time.perf_counter() - self.started_at) * 1000.0)
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """with ブロックの所要時間を段階として記録します。
+
+        Args:
+            name: 段階名
+        """
+        start: float = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, (time.perf_counter() - start) * 1000.0)
+
+    def summary(self) -> str:
+        """記録した段階を1行の文字列にまとめます。
+
+        Returns:
+            "imports=120ms camera=850ms ..." 形式の文字列（記録順）
+        """
+        with self._lock:
+            return " ".join(f"{k}={v:.0f}ms" for k, v in self._phases.items())
+
+
+class MetricsExporter:
+    """統計量を定期的にJSON Lines形式で書き出し、必要ならHTTPでも公開するスレッド。"""
+
+    def __init__(
+        self,
+        metrics: Metrics,
+        path: Optional[str] = None,
+        interval: float = 5.0,
+        port: Optional[int] = None,
+    ) -> None:
+        """MetricsExporterを初期化します。
+
+        Args:
+            metrics: 出力する計測
+            path: JSON Lines の出力先（Noneの場合はファイルに書き出さない）
+            interval: 書き出す間隔（秒）
+            port: 統計量を公開するローカルHTTPポート（Noneの場合は公開しない）
+        """
+        self.metrics: Metrics = metrics
+        self.interval: float = interval
+        self._file: Optional[TextIO] = (
+            open(path, "a", encoding="utf-8") if path else None
+        )
+        self._stop_event: threading.Event = threading.Event()
+        self._thread: threading.Thread = threading.Thread(
+            target=self._export_loop, daemon=True
+        )
+        self._server: Optional[ThreadingHTTPServer] = (
+            self._create_server(port) if port is not None else None
+        )
+
+    def _create_server(self, port: int) -> ThreadingHTTPServer:
+        """GET で最新の統計量を返すHTTPサーバーを作ります（127.0.0.1のみで待ち受け）。"""
+        metrics: Metrics = self.metrics
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                body: bytes = json.dumps(metrics.snapshot()).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass  # アクセスログは出力しない
+
+        return ThreadingHTTPServer(("127.0.0.1", port), Handler)
+
+    def start(self) -> None:
+        """書き出しスレッドとHTTPサーバーを起動します。"""
+        self._thread.start()
+        if self._server is not None:
+            threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    def stop(self) -> None:
+        """最後の統計量を書き出し、スレッドとHTTPサーバーを停止します。"""
+        self._stop_event.set()
+        self._thread.join(timeout=1.0)
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+        if self._file is not None:
+            self._file.close()
+
+    def _export_loop(self) -> None:
+        """interval ごとに統計量を書き出すループ。"""
+        while not self._stop_event.wait(self.interval):
+            self._write()
+        self._write()
+
+    def _write(self) -> None:
+        """統計量を1行書き出します。"""
+        if self._file is not None:
+            self._file.write(json.dumps(self.metrics.snapshot()) + "\n")
+            self._file.flush()
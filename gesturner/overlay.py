@@ -1,7 +1,12 @@
+import sys
+import threading
 import tkinter as tk
-import win32gui  # type: ignore
-import win32con  # type: ignore
-from typing import Final
+from typing import Final, Optional
+
+# クリックスルーの設定はWindowsでのみ行う（pywin32はWindowsでのみ依存関係に含まれる）
+if sys.platform == "win32":
+    import win32gui  # type: ignore
+    import win32con  # type: ignore
 
 
 class Overlay:
@@ -9,19 +14,26 @@ class Overlay:
 
     常に最前面に表示され、クリックスルー可能な半透明ウィンドウで、
     ジェスチャーの検知状態（Neutral/Detected）を視覚的に通知します。
+
+    検知状態は任意のスレッドから update_status() で渡し、
+    Tkのメインループ側で一定間隔でまとめて反映します。
     """
 
     WINDOW_TITLE: Final[str] = "Gesturner Status"
+    POLL_INTERVAL_MS: Final[int] = 50  # 表示を更新する間隔（ミリ秒）
 
-    def __init__(self) -> None:
+    def __init__(self, geometry: str = "200x50+50+50") -> None:
         """オーバーレイウィンドウを初期化します。
 
-        tkinterでウィンドウを作成し、Win32 APIを使用して
+        tkinterでウィンドウを作成し、Windowsでは Win32 APIを使用して
         クリックスルー可能な最前面ウィンドウに設定します。
+
+        Args:
+            geometry: ウィンドウの大きさと位置（"幅x高さ+X+Y"）
         """
         self.root: tk.Tk = tk.Tk()
         self.root.title(self.WINDOW_TITLE)
-        self.root.geometry("200x50+50+50")
+        self.root.geometry(geometry)
         self.root.attributes("-topmost", True)
         self.root.attributes("-alpha", 0.7)
         self.root.overrideredirect(True)
@@ -33,27 +45,71 @@ class Overlay:
 
         # ウィンドウハンドルを取得する前に描画を確定させる
         self.root.update()
+        self._make_click_through()
 
-        hwnd: int = win32gui.FindWindow(None, self.WINDOW_TITLE)
-        style: int = win32gui.GetWindowLong(hwnd, win32con.GWL_EXSTYLE)
-        win32gui.SetWindowLong(
-            hwnd,
-            win32con.GWL_EXSTYLE,
-            style | win32con.WS_EX_LAYERED | win32con.WS_EX_TRANSPARENT,
-        )
-        win32gui.SetLayeredWindowAttributes(hwnd, 0, 180, win32con.LWA_ALPHA)
+        # 他スレッドから受け取った最新の検知状態と、表示中の状態
+        self._lock: threading.Lock = threading.Lock()
+        self._pending: Optional[bool] = None
+        self._pending_message: Optional[str] = None
+        self._displayed: Optional[bool] = False  # メッセージ表示中はNone
+
+    def _make_click_through(self) -> None:
+        """Win32 APIでウィンドウをクリックスルー可能な半透明ウィンドウにします（Windowsのみ）。"""
+        if sys.platform == "win32":
+            hwnd: int = win32gui.FindWindow(None, self.WINDOW_TITLE)
+            style: int = win32gui.GetWindowLong(hwnd, win32con.GWL_EXSTYLE)
+            win32gui.SetWindowLong(
+                hwnd,
+                win32con.GWL_EXSTYLE,
+                style | win32con.WS_EX_LAYERED | win32con.WS_EX_TRANSPARENT,
+            )
+            win32gui.SetLayeredWindowAttributes(hwnd, 0, 180, win32con.LWA_ALPHA)
 
     def update_status(self, is_detected: bool) -> None:
-        """検知状態に応じて表示を更新します。
+        """検知状態を通知します（任意のスレッドから呼び出し可能）。
+
+        ウィジェットには触れず最新の状態だけを保持し、
+        実際の表示更新はメインループの定期処理で行います。
 
         Args:
             is_detected: ジェスチャーが検知された場合True、未検知の場合False
         """
-        if is_detected:
-            self.label.config(text="Detected", bg="red")
-        else:
-            self.label.config(text="Neutral", bg="green")
+        with self._lock:
+            self._pending = is_detected
+
+    def show_message(self, text: str) -> None:
+        """検知状態の代わりにメッセージを表示します（任意のスレッドから呼び出し可能）。
+
+        次に update_status() で検知状態が通知されるまで表示されます。
+
+        Args:
+            text: 表示するメッセージ（起動中の "Loading" など）
+        """
+        with self._lock:
+            self._pending_message = text
+
+    def _poll(self) -> None:
+        """保持している最新の状態を、変化があった場合のみ表示に反映します。"""
+        with self._lock:
+            is_detected: Optional[bool] = self._pending
+            message: Optional[str] = self._pending_message
+            self._pending = None
+            self._pending_message = None
+
+        if message is not None:
+            self.label.config(text=message, bg="gray")
+            self._displayed = None
+
+        if is_detected is not None and is_detected != self._displayed:
+            if is_detected:
+                self.label.config(text="Detected", bg="red")
+            else:
+                self.label.config(text="Neutral", bg="green")
+            self._displayed = is_detected
+
+        self.root.after(self.POLL_INTERVAL_MS, self._poll)
 
     def start(self) -> None:
         """ウィンドウのメインループを開始します（ブロッキング動作）。"""
+        self.root.after(self.POLL_INTERVAL_MS, self._poll)
         self.root.mainloop()
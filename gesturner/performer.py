@@ -0,0 +1,112 @@
+"""フレーム内の複数の顔から、ジェスチャーを判定する演者（performer）を選ぶモジュール。
+
+アンサンブルのリハーサルなどで演者以外の顔が映り込んでも、
+その顔のジェスチャーでキーが送信されないよう、演者を1人に絞って判定します。
+一度選んだ演者は、顔の位置が大きく飛ばない限りフレームをまたいで維持します。
+"""
+
+from __future__ import annotations
+
+from typing import Final, Optional, Tuple
+
+import numpy as np
+
+# 演者の選び方: 最も大きい顔（カメラに最も近い人）、または最も画面中央に近い顔
+PERFORMER_STRATEGIES: Final[Tuple[str, ...]] = ("largest", "central")
+
+# FaceMeshが検出する顔の最大数の既定値（1では映り込んだ顔と演者を区別できない）
+DEFAULT_MAX_FACES: Final[int] = 2
+
+
+class PerformerSelector:
+    """フレームをまたいで同じ演者を選び続けるセレクター。
+
+    前フレームの演者の中心から、顔の大きさ × max_jump 以内にある最も近い顔を
+    同じ演者とみなします。該当する顔が無い場合は patience フレームの間は
+    他の顔に乗り換えずに「演者なし」を返し、それでも見つからなければ
+    strategy に従って選び直します。
+    """
+
+    def __init__(
+        self, strategy: str = "largest", max_jump: float = 0.5, patience: int = 10
+    ) -> None:
+        """PerformerSelectorを初期化します。
+
+        Args:
+            strategy: 演者の選び方（PERFORMER_STRATEGIES のいずれか）
+            max_jump: 同じ演者とみなす中心の移動量（演者の顔の大きさに対する割合）
+            patience: 演者を見失ってから選び直すまでに待つ推論フレーム数
+
+        Raises:
+            ValueError: strategy が未知の値の場合
+        """
+        if strategy not in PERFORMER_STRATEGIES:
+            raise ValueError(
+                f"Unknown performer strategy {strategy!r} "
+                f"(expected one of {', '.join(PERFORMER_STRATEGIES)})"
+            )
+        self.strategy: str = strategy
+        self.max_jump: float = max_jump
+        self.patience: int = patience
+        self.center: Optional[np.ndarray] = None  # 演者の顔の中心（正規化座標）
+        self.size: float = 0.0  # 演者の顔の大きさ（正規化座標での一辺）
+        self.missed: int = 0  # 演者を見失っている推論フレーム数
+
+    def select(self, points: np.ndarray) -> int:
+        """演者の顔のインデックスを返します。
+
+        Args:
+            points: フレーム全体の正規化座標で表した形状 (F, N, 3) のランドマーク配列
+                （顔の外形の数点だけでよい）
+
+        Returns:
+            演者の顔のインデックス（演者がいない場合は-1）
+        """
+        if points.shape[0] == 0:
+            self._miss()
+            return -1
+
+        # 顔ごとの外接矩形から中心と大きさを求める
+        xy: np.ndarray = points[:, :, :2]
+        low: np.ndarray = xy.min(axis=1)
+        high: np.ndarray = xy.max(axis=1)
+        centers: np.ndarray = (low + high) / 2.0
+        extents: np.ndarray = high - low
+
+        index: int
+        if self.center is not None:
+            distances: np.ndarray = np.linalg.norm(centers - self.center, axis=1)
+            index = int(np.argmin(distances))
+            if distances[index] > self.size * self.max_jump:
+                # 他の顔には乗り換えず、しばらく演者が戻るのを待つ
+                self._miss()
+                if self.center is not None:
+                    return -1
+                index = self._choose(centers, extents)
+        else:
+            index = self._choose(centers, extents)
+
+        self.center = centers[index]
+        self.size = float(extents[index].max())
+        self.missed = 0
+        return index
+
+    def _choose(self, centers: np.ndarray, extents: np.ndarray) -> int:
+        """strategy に従って新しい演者を選びます。"""
+        if self.strategy == "central":
+            return int(np.argmin(np.linalg.norm(centers - 0.5, axis=1)))
+        return int(np.argmax(extents[:, 0] * extents[:, 1]))
+
+    def _miss(self) -> None:
+        """演者を見失ったフレームを数え、patience を超えたら演者を解除します。"""
+        if self.center is None:
+            return
+        self.missed += 1
+        if self.missed > self.patience:
+            self.reset()
+
+    def reset(self) -> None:
+        """演者を解除し、次の推論フレームで選び直します。"""
+        self.center = None
+        self.size = 0.0
+        self.missed = 0
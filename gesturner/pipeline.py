@@ -0,0 +1,384 @@
+"""キャプチャ・推論・UI/アクチュエーションを分離したパイプライン。
+
+各ステージを別スレッドで実行し、最新フレームのみを保持する
+キューで接続することで、推論が遅い場合でも古いフレームが
+滞留せず、ジェスチャーからキー送信までの遅延を一定に保ちます。
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import (
+    Callable,
+    Deque,
+    Dict,
+    Generic,
+    List,
+    Optional,
+    Protocol,
+    Tuple,
+    TypeVar,
+)
+
+import numpy as np
+
+from gesturner.controller import GestureController, ProcessResult
+from gesturner.detector_pool import DetectorPool, DetectorResult
+from gesturner.metrics import METRICS
+from gesturner.performer import PerformerSelector
+
+T = TypeVar("T")
+
+
+class FrameSource(Protocol):
+    """キャプチャステージが読み出す映像入力（cv2.VideoCapture や capture.Capture）。"""
+
+    def isOpened(self) -> bool:
+        """映像入力が開いているかどうか。"""
+        ...
+
+    def read(self) -> Tuple[bool, Optional[np.ndarray]]:
+        """1フレームを読み出します。"""
+        ...
+
+    def release(self) -> None:
+        """映像入力を閉じます。"""
+        ...
+
+
+class LatestQueue(Generic[T]):
+    """容量を超えると古い要素を破棄する有界キュー。
+
+    生産者はブロックせず、消費者は常に最新の要素を受け取ります。
+    """
+
+    def __init__(self, maxsize: int = 1, name: str = "queue") -> None:
+        """LatestQueueを初期化します。
+
+        Args:
+            maxsize: 保持する要素数の上限
+            name: 計測で使う名前（破棄数は "dropped.<name>" として記録）
+        """
+        self._items: Deque[T] = deque(maxlen=maxsize)
+        self._dropped_counter: str = f"dropped.{name}"
+        self._cond: threading.Condition = threading.Condition()
+        self.dropped: int = 0  # 破棄された要素数
+
+    def put(self, item: T) -> None:
+        """要素を追加します。満杯の場合は最も古い要素を破棄します。
+
+        Args:
+            item: 追加する要素
+        """
+        with self._cond:
+            if len(self._items) == self._items.maxlen:
+                self.dropped += 1
+                METRICS.increment(self._dropped_counter)
+            self._items.append(item)
+            self._cond.notify()
+
+    def get(self, timeout: Optional[float] = None) -> Optional[T]:
+        """最も古い要素を取り出します。
+
+        Args:
+            timeout: 要素を待つ最大秒数（Noneの場合は無期限）
+
+        Returns:
+            取り出した要素。タイムアウトした場合はNone
+        """
+        with self._cond:
+            if not self._items:
+                self._cond.wait(timeout)
+            if not self._items:
+                return None
+            return self._items.popleft()
+
+
+@dataclass
+class FramePacket:
+    """キャプチャステージが生成するフレーム。
+
+    Attributes:
+        frame_id: フレームの通し番号
+        frame: 入力画像（BGR形式）
+        captured_at: 取得時刻（time.perf_counter）。保持時間・クールダウン・遅延は
+            全てこの時刻を基準に計算する
+    """
+
+    frame_id: int
+    frame: np.ndarray
+    captured_at: float
+
+
+@dataclass
+class ResultPacket:
+    """推論ステージが生成する処理結果。
+
+    Attributes:
+        frame: 処理したフレーム
+        result: ジェスチャー処理結果
+    """
+
+    frame: FramePacket
+    result: ProcessResult
+
+
+class StageTimings:
+    """各ステージの処理時間（ミリ秒）を指数移動平均で集計するクラス。
+
+    計測（METRICS）が有効な場合は、同じ値をヒストグラムにも記録します。
+    """
+
+    def __init__(self, alpha: float = 0.1) -> None:
+        """StageTimingsを初期化します。
+
+        Args:
+            alpha: 指数移動平均の平滑化係数
+        """
+        self.alpha: float = alpha
+        self._values: Dict[str, float] = {}
+        self._lock: threading.Lock = threading.Lock()
+
+    def record(self, stage: str, elapsed_ms: float) -> None:
+        """ステージの処理時間を記録します。
+
+        Args:
+            stage: ステージ名
+            elapsed_ms: 処理時間（ミリ秒）
+        """
+        METRICS.record(stage, elapsed_ms)
+        with self._lock:
+            previous: Optional[float] = self._values.get(stage)
+            if previous is None:
+                self._values[stage] = elapsed_ms
+            else:
+                self._values[stage] = previous + self.alpha * (elapsed_ms - previous)
+
+    def snapshot(self) -> Dict[str, float]:
+        """現在の平均処理時間を返します。
+
+        Returns:
+            ステージ名をキーとする平均処理時間（ミリ秒）
+        """
+        with self._lock:
+            return dict(self._values)
+
+    def summary(self) -> str:
+        """平均処理時間を1行の文字列にまとめます。
+
+        Returns:
+            "capture=1.2ms inference=30.5ms ..." 形式の文字列
+        """
+        return " ".join(f"{k}={v:.1f}ms" for k, v in self.snapshot().items())
+
+
+class Pipeline:
+    """キャプチャスレッドと推論スレッドを管理するパイプライン。
+
+    UI/アクチュエーションの消費者は get_result() で最新の処理結果を受け取ります。
+    """
+
+    def __init__(
+        self,
+        capture_factory: Callable[[], FrameSource],
+        controller: GestureController,
+        timings: Optional[StageTimings] = None,
+    ) -> None:
+        """Pipelineを初期化します。
+
+        Args:
+            capture_factory: キャプチャスレッド内で映像入力を開く関数
+            controller: ジェスチャー処理を行うコントローラー
+            timings: 処理時間の集計先（他のステージと共有する場合に指定）
+        """
+        self.capture_factory: Callable[[], FrameSource] = capture_factory
+        self.controller: GestureController = controller
+        self.frames: LatestQueue[FramePacket] = LatestQueue(maxsize=1, name="frames")
+        self.results: LatestQueue[ResultPacket] = LatestQueue(maxsize=1, name="results")
+        self.timings: StageTimings = timings or StageTimings()
+        self._stop_event: threading.Event = threading.Event()
+        self._threads: list[threading.Thread] = []
+
+    @property
+    def running(self) -> bool:
+        """パイプラインが動作中かどうか。"""
+        return not self._stop_event.is_set()
+
+    def start(self) -> None:
+        """キャプチャスレッドと推論スレッドを起動します。"""
+        self._threads = [
+            threading.Thread(target=self._capture_loop, daemon=True),
+            threading.Thread(target=self._inference_loop, daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self) -> None:
+        """全ステージに停止を通知し、スレッドの終了を待ちます。"""
+        self._stop_event.set()
+        for thread in self._threads:
+            thread.join(timeout=1.0)
+
+    def get_result(self, timeout: Optional[float] = None) -> Optional[ResultPacket]:
+        """最新の処理結果を取り出します。
+
+        Args:
+            timeout: 結果を待つ最大秒数
+
+        Returns:
+            処理結果。タイムアウトした場合はNone
+        """
+        return self.results.get(timeout)
+
+    def record_consumer(self, packet: ResultPacket, elapsed_ms: float) -> None:
+        """消費者ステージの処理時間と、取得から消費完了までの遅延を記録します。
+
+        Args:
+            packet: 消費した処理結果
+            elapsed_ms: 消費者ステージの処理時間（ミリ秒）
+        """
+        self.timings.record("ui", elapsed_ms)
+        latency_ms: float = (time.perf_counter() - packet.frame.captured_at) * 1000.0
+        self.timings.record("latency", latency_ms)
+
+    def _capture_loop(self) -> None:
+        """カメラからフレームを取得し続けるループ。
+
+        ドライバのバッファにフレームが溜まらないよう、
+        推論の進捗に関係なく常に読み出します。
+        """
+        cap: FrameSource = self.capture_factory()
+        frame_id: int = 0
+        try:
+            while self.running and cap.isOpened():
+                start: float = time.perf_counter()
+                success: bool
+                frame: Optional[np.ndarray]
+                success, frame = cap.read()
+                if not success or frame is None:
+                    break
+                read_at: float = time.perf_counter()
+                # 動画ファイルのフレームレートに合わせた待機は取得時間に含めない
+                paced: float = getattr(cap, "paced", 0.0)
+                if paced > 0.0:
+                    self.timings.record("pacing", paced * 1000.0)
+                self.timings.record("capture", (read_at - start - paced) * 1000.0)
+                # capture.Capture はデコード前の取得時刻を持つ（cv2.VideoCapture は読み出し完了時刻）
+                captured_at: float = getattr(cap, "captured_at", read_at)
+                self.frames.put(FramePacket(frame_id, frame, captured_at))
+                frame_id += 1
+        finally:
+            cap.release()
+            self._stop_event.set()
+
+    def _inference_loop(self) -> None:
+        """最新フレームに対してジェスチャー処理を行うループ。"""
+        while self.running:
+            packet: Optional[FramePacket] = self.frames.get(timeout=0.1)
+            if packet is None:
+                continue
+            start: float = time.perf_counter()
+            self.timings.record("queue", (start - packet.captured_at) * 1000.0)
+            result: ProcessResult = self.controller.process(
+                packet.frame, packet.captured_at
+            )
+            self.timings.record("inference", (time.perf_counter() - start) * 1000.0)
+            self.results.put(ResultPacket(packet, result))
+
+
+class ProcessPipeline(Pipeline):
+    """推論をワーカープロセスのプールで実行するパイプライン。
+
+    推論スレッドの代わりにディスパッチャースレッドがフレームをプールに渡し、
+    返ってきた特徴量でジェスチャーの状態を更新します。
+    複数のワーカーが並行して処理するため結果の順序は前後することがあり、
+    既に反映したフレームより古い結果は破棄します。
+    """
+
+    def __init__(
+        self,
+        capture_factory: Callable[[], FrameSource],
+        controller: GestureController,
+        workers: int,
+        timings: Optional[StageTimings] = None,
+    ) -> None:
+        """ProcessPipelineを初期化します。
+
+        Args:
+            capture_factory: キャプチャスレッド内で映像入力を開く関数
+            controller: ジェスチャー処理を行うコントローラー
+            workers: 推論ワーカープロセス数
+            timings: 処理時間の集計先（他のステージと共有する場合に指定）
+        """
+        super().__init__(capture_factory, controller, timings)
+        self.pool: DetectorPool = DetectorPool(
+            workers,
+            controller.roi_tracking,
+            max_num_faces=controller.max_faces,
+            performer=controller.performer,
+        )
+        self._in_flight: Dict[int, FramePacket] = {}
+        self._last_frame_id: int = -1
+
+    def stop(self) -> None:
+        """全ステージを停止し、ワーカープロセスを終了します。"""
+        super().stop()
+        self.pool.close()
+
+    def _inference_loop(self) -> None:
+        """フレームをプールに渡し、完了した結果を反映するループ。"""
+        while self.running:
+            # 読み込み直したプロファイルは、フレームを渡す前にまとめて反映する
+            self.controller.apply_pending_profile()
+            packet: Optional[FramePacket] = self.frames.get(timeout=0.002)
+            if packet is not None:
+                self._dispatch(packet)
+            for result in self.pool.collect():
+                self._complete(result)
+            if not self.pool.alive:
+                print("[pipeline] a detector worker exited unexpectedly")
+                self._stop_event.set()
+
+    def _dispatch(self, packet: FramePacket) -> None:
+        """フレームをプールに渡します（推論を省略するフレームはその場で判定）。"""
+        start: float = time.perf_counter()
+        self.timings.record("queue", (start - packet.captured_at) * 1000.0)
+        if not self.controller.should_infer(packet.captured_at):
+            result: ProcessResult = self.controller.process_features(
+                None, packet.captured_at
+            )
+            # 判定の時刻が戻らないよう、処理中の古いフレームの結果は使わない
+            self._last_frame_id = packet.frame_id
+            self.results.put(ResultPacket(packet, result))
+            return
+        features: List[str] = self.controller.gesture_engine.features
+        refine: bool = self.controller.should_refine(packet.captured_at)
+        if self.pool.submit(packet.frame_id, packet.frame, features, refine):
+            self._in_flight[packet.frame_id] = packet
+            self.timings.record("dispatch", (time.perf_counter() - start) * 1000.0)
+
+    def _complete(self, result: DetectorResult) -> None:
+        """ワーカーの結果でジェスチャーの状態を更新します。"""
+        packet: Optional[FramePacket] = self._in_flight.pop(result.frame_id, None)
+        self.timings.record("inference", result.inference_ms)
+        self.controller.record_inference(result.refined, result.inference_ms)
+        if packet is None or result.frame_id < self._last_frame_id:
+            return
+        self._last_frame_id = result.frame_id
+        # 追い越された古いフレームは結果を待たない
+        for frame_id in [i for i in self._in_flight if i < result.frame_id]:
+            del self._in_flight[frame_id]
+        # 演者の選び方が変更された場合（プロファイルの読み込み直し）は選び直す
+        if self.pool.performer.strategy != self.controller.performer:
+            self.pool.performer = PerformerSelector(self.controller.performer)
+        values: np.ndarray = self.pool.select(result)
+        # 判定ルールの変更で特徴量が変わった場合は、その結果を使わない
+        if list(result.features) != self.controller.gesture_engine.features:
+            return
+        processed: ProcessResult = self.controller.process_features(
+            values, packet.captured_at, result.refined
+        )
+        self.results.put(ResultPacket(packet, processed))
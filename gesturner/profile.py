@@ -0,0 +1,546 @@
+"""ユーザーごとの検知パラメータ・キー割り当て・映像入力・ウィンドウ配置を保存するプロファイル。
+
+キャリブレーションの結果や手動で編集した設定をJSONファイルとして保存し、起動時に読み込みます。
+読み込み時に全ての項目を検証し、誤りがあれば項目名を含む ValueError を送出します。
+ProfileWatcher はファイルの変更を検知して読み込み直し、フレームの合間に
+判定ルールだけを差し替えます（FaceMeshは作り直しません）。
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import os
+import threading
+from dataclasses import asdict, dataclass, field, fields, replace
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence
+
+from gesturner.actuation import supported_keys
+from gesturner.capture import CAPTURE_BACKENDS, parse_fourcc, parse_resolution
+from gesturner.gestures import BUILTIN_RULES, FEATURES, GestureRule
+from gesturner.performer import DEFAULT_MAX_FACES, PERFORMER_STRATEGIES
+from gesturner.scheduler import TIER_MODES
+
+if TYPE_CHECKING:
+    from gesturner.controller import GestureController
+
+# プロファイルの capture の項目と、対応するコマンドライン引数（argparse の dest）
+CAPTURE_ARGUMENTS: Dict[str, str] = {
+    "source": "source",
+    "backend": "capture_backend",
+    "resolution": "resolution",
+    "fps": "capture_fps",
+    "fourcc": "fourcc",
+    "buffer_size": "buffer_size",
+    "max_width": "max_width",
+}
+
+# gestures で変更できる GestureRule の項目
+RULE_FIELDS: Dict[str, type] = {
+    "feature": str,
+    "threshold": float,
+    "direction": str,
+    "hysteresis": float,
+    "hold": float,
+    "cooldown": float,
+    "key": str,
+    "approach": float,
+}
+
+
+def _is_number(value: Any) -> bool:
+    """bool を除く有限の数値かどうか（NaN や無限大は不可）。"""
+    return (
+        isinstance(value, (int, float))
+        and not isinstance(value, bool)
+        and math.isfinite(value)
+    )
+
+
+def _is_integer(value: Any) -> bool:
+    """bool を除く整数かどうか（JSON の true/false は整数として扱わない）。"""
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+@dataclass
+class WindowPlacement:
+    """ウィンドウの位置と大きさ（画面のピクセル座標）。
+
+    Attributes:
+        x: 左端の座標
+        y: 上端の座標
+        width: 幅（Noneの場合はウィンドウの既定の大きさ）
+        height: 高さ（Noneの場合はウィンドウの既定の大きさ）
+    """
+
+    x: int
+    y: int
+    width: Optional[int] = None
+    height: Optional[int] = None
+
+    def geometry(self) -> str:
+        """tkinter の geometry() に渡す文字列（"200x50+50+50" など）を返します。"""
+        position: str = f"+{self.x}+{self.y}"
+        if self.width is None or self.height is None:
+            return position
+        return f"{self.width}x{self.height}{position}"
+
+
+@dataclass
+class Profile:
+    """ユーザーごとの検知パラメータ。
+
+    Attributes:
+        mouth_threshold: 口の開き判定の閾値（顔の高さに対する比率）
+        gaze_down_threshold: 視線の表示を下向きにする閾値（虹彩の相対位置。表示のみ）
+        gaze_up_threshold: 上向き判定（look_up）の閾値（虹彩の相対位置）
+        look_down_duration: 口を開けてから下キーを送信するまでの継続時間（秒）
+        look_up_duration: 上を向いてから上キーを送信するまでの継続時間（秒）
+        gestures: ジェスチャー名ごとに変更する GestureRule の項目（キー割り当てを含む）。
+            組み込み以外の名前は feature と threshold を指定して追加し、null で無効化する
+        tier: 検知の精度の段階（"auto", "full", "lite"）
+        tier_budget_ms: auto で lite に切り替える精密な推論の処理時間（ミリ秒）
+        performer: 複数の顔から演者を選ぶ方法（"largest" または "central"）
+        max_faces: FaceMeshが検出する顔の最大数
+        capture: 映像入力の設定（CAPTURE_ARGUMENTS のキー。指定した項目のみ）
+        overlay: オーバーレイの位置と大きさ
+        debug_window: デバッグウィンドウの位置
+    """
+
+    mouth_threshold: float = 0.05
+    gaze_down_threshold: float = 0.6
+    gaze_up_threshold: float = 0.4
+    look_down_duration: float = 1.0
+    look_up_duration: float = 1.0
+    gestures: Dict[str, Optional[Dict[str, Any]]] = field(default_factory=dict)
+    tier: str = "auto"
+    tier_budget_ms: float = 50.0
+    performer: str = "largest"
+    max_faces: int = DEFAULT_MAX_FACES
+    capture: Dict[str, Any] = field(default_factory=dict)
+    overlay: WindowPlacement = field(
+        default_factory=lambda: WindowPlacement(50, 50, 200, 50)
+    )
+    debug_window: WindowPlacement = field(
+        default_factory=lambda: WindowPlacement(50, 110)
+    )
+
+    @classmethod
+    def load(cls, path: str, key_backend: Optional[str] = None) -> Profile:
+        """JSONファイルからプロファイルを読み込みます。
+
+        ファイルに無い項目は既定値になります。
+
+        Args:
+            path: プロファイルのパス
+            key_backend: 割り当てたキーを送信できるか確認するキー送信の方式
+                （actuation.BACKENDS のキー。Noneの場合は確認しない）
+
+        Returns:
+            読み込んだプロファイル
+
+        Raises:
+            OSError: ファイルを読み込めない場合
+            ValueError: JSONの形式が不正、または値が不正な場合
+        """
+        with open(path, encoding="utf-8") as f:
+            data: Any = json.load(f)
+        if not isinstance(data, dict):
+            raise ValueError("profile must be a JSON object")
+        profile: Profile = cls.from_dict(data)
+        if key_backend is not None:
+            profile.check_keys(key_backend)
+        return profile
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> Profile:
+        """辞書からプロファイルを作り、全ての項目を検証します。
+
+        Args:
+            data: プロファイルの内容
+
+        Returns:
+            検証済みのプロファイル
+
+        Raises:
+            ValueError: 未知の項目や不正な値がある場合（全ての誤りをまとめて報告）
+        """
+        errors: List[str] = []
+        names: List[str] = [f.name for f in fields(cls)]
+        for key in data:
+            if key not in names:
+                errors.append(f"unknown setting {key!r}")
+
+        values: Dict[str, Any] = {}
+        for name in (
+            "mouth_threshold",
+            "gaze_down_threshold",
+            "gaze_up_threshold",
+            "look_down_duration",
+            "look_up_duration",
+            "tier_budget_ms",
+        ):
+            if name in data:
+                if not _is_number(data[name]) or data[name] < 0:
+                    errors.append(f"{name} must be a non-negative number")
+                else:
+                    values[name] = float(data[name])
+        up: float = values.get("gaze_up_threshold", cls.gaze_up_threshold)
+        down: float = values.get("gaze_down_threshold", cls.gaze_down_threshold)
+        if up >= down:
+            errors.append(
+                "gaze_up_threshold must be below gaze_down_threshold "
+                f"({up} >= {down})"
+            )
+        if "max_faces" in data:
+            if not _is_integer(data["max_faces"]) or data["max_faces"] < 1:
+                errors.append("max_faces must be a positive integer")
+            else:
+                values["max_faces"] = data["max_faces"]
+        for name, choices in (
+            ("tier", TIER_MODES),
+            ("performer", PERFORMER_STRATEGIES),
+        ):
+            if name in data:
+                if data[name] not in choices:
+                    errors.append(f"{name} must be one of {', '.join(choices)}")
+                else:
+                    values[name] = data[name]
+
+        values["gestures"] = _validate_gestures(data.get("gestures", {}), errors)
+        values["capture"] = _validate_capture(data.get("capture", {}), errors)
+        for name in ("overlay", "debug_window"):
+            if name in data:
+                placement: Optional[WindowPlacement] = _validate_placement(
+                    name, data[name], errors
+                )
+                if placement is not None:
+                    values[name] = placement
+
+        if errors:
+            raise ValueError("; ".join(errors))
+        return cls(**values)
+
+    def check_keys(self, backend_name: str) -> None:
+        """gestures で割り当てたキーを、キー送信の方式で送信できるか確認します。
+
+        Args:
+            backend_name: キー送信の方式（actuation.BACKENDS のキー）
+
+        Raises:
+            ValueError: 送信できないキーがある場合
+        """
+        keys: Dict[str, str] = {
+            name: changes["key"]
+            for name, changes in self.gestures.items()
+            if changes is not None and changes.get("key") is not None
+        }
+        if not keys:
+            return
+        supported: Optional[frozenset[str]] = supported_keys(backend_name)
+        if supported is None:
+            return
+        errors: List[str] = [
+            f"gestures.{name}.key {key!r} is not supported by the "
+            f"{backend_name} key backend"
+            for name, key in keys.items()
+            if key not in supported
+        ]
+        if errors:
+            raise ValueError("; ".join(errors))
+
+    def save(self, path: str) -> None:
+        """プロファイルをJSONファイルに保存します。
+
+        Args:
+            path: 保存先のパス
+        """
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(asdict(self), f, indent=2)
+
+    def argument_defaults(self) -> Dict[str, Any]:
+        """起動時にだけ反映する設定を、コマンドライン引数の既定値として返します。
+
+        コマンドラインで明示した引数はプロファイルより優先されます。
+
+        Returns:
+            argparse の dest をキーとする既定値
+        """
+        defaults: Dict[str, Any] = {
+            "tier": self.tier,
+            "tier_budget": self.tier_budget_ms,
+            "performer": self.performer,
+            "max_faces": self.max_faces,
+        }
+        for key, value in self.capture.items():
+            defaults[CAPTURE_ARGUMENTS[key]] = value
+        return defaults
+
+    def rules(self, base: Sequence[GestureRule]) -> List[GestureRule]:
+        """基準のルールにプロファイルの値を反映した判定ルールを作ります。
+
+        Args:
+            base: 基準にするルール（起動時のルール）
+
+        Returns:
+            反映後のルール（登録順）
+        """
+        rules: Dict[str, GestureRule] = {rule.name: rule for rule in base}
+        if "mouth_open" in rules:
+            rules["mouth_open"] = replace(
+                rules["mouth_open"],
+                threshold=self.mouth_threshold,
+                hold=self.look_down_duration,
+            )
+        if "look_up" in rules:
+            rules["look_up"] = replace(
+                rules["look_up"],
+                threshold=self.gaze_up_threshold,
+                hold=self.look_up_duration,
+            )
+        for name, changes in self.gestures.items():
+            if changes is None:
+                rules.pop(name, None)
+            elif name in rules:
+                rules[name] = replace(rules[name], **changes)
+            elif name in BUILTIN_RULES:
+                rules[name] = replace(BUILTIN_RULES[name], **changes)
+            else:
+                rules[name] = GestureRule(name=name, **changes)
+        return list(rules.values())
+
+    def apply(
+        self, controller: GestureController, previous: Optional[Profile] = None
+    ) -> None:
+        """プロファイルの値をコントローラーに反映します。
+
+        判定ルールは1回の再構築でまとめて差し替えます。
+        previous を指定した場合（読み込み直し）は、検知の段階と演者の選び方も
+        前回のプロファイルから変更された時に限り反映します。
+
+        Args:
+            controller: 反映先のコントローラー
+            previous: 前回反映したプロファイル（起動時はNone）
+        """
+        controller.apply_rules(self.rules(controller.base_rules))
+        self.apply_settings(controller, previous)
+
+    def apply_settings(
+        self, controller: GestureController, previous: Optional[Profile] = None
+    ) -> None:
+        """判定ルール以外の値（視線の表示用の閾値・検知の段階・演者）を反映します。
+
+        Args:
+            controller: 反映先のコントローラー
+            previous: 前回反映したプロファイル（起動時はNone）
+        """
+        controller.gaze_down_threshold = self.gaze_down_threshold
+        if previous is None:
+            return
+        if (self.tier, self.tier_budget_ms) != (
+            previous.tier,
+            previous.tier_budget_ms,
+        ):
+            controller.tiers.configure(self.tier, self.tier_budget_ms)
+        if self.performer != previous.performer:
+            controller.set_performer(self.performer)
+
+    def restart_required(self, previous: Profile) -> List[str]:
+        """読み込み直しでは反映されない（再起動が必要な）変更された項目を返します。
+
+        Args:
+            previous: 前回反映したプロファイル
+        """
+        return [
+            name
+            for name in ("max_faces", "capture", "overlay", "debug_window")
+            if getattr(self, name) != getattr(previous, name)
+        ]
+
+
+def _validate_gestures(
+    data: Any, errors: List[str]
+) -> Dict[str, Optional[Dict[str, Any]]]:
+    """gestures の項目を検証します。"""
+    if not isinstance(data, dict):
+        errors.append("gestures must be an object")
+        return {}
+    gestures: Dict[str, Optional[Dict[str, Any]]] = {}
+    for name, changes in data.items():
+        if changes is None:
+            gestures[name] = None
+            continue
+        if not isinstance(changes, dict):
+            errors.append(f"gestures.{name} must be an object or null")
+            continue
+        valid: bool = True
+        for key, value in changes.items():
+            expected: Optional[type] = RULE_FIELDS.get(key)
+            if expected is None:
+                errors.append(f"gestures.{name}: unknown setting {key!r}")
+                valid = False
+            elif expected is float and not _is_number(value):
+                errors.append(f"gestures.{name}.{key} must be a finite number")
+                valid = False
+            elif expected is float and key != "threshold" and value < 0:
+                errors.append(f"gestures.{name}.{key} must not be negative")
+                valid = False
+            elif expected is str and not (
+                isinstance(value, str) or (key == "key" and value is None)
+            ):
+                errors.append(f"gestures.{name}.{key} must be a string")
+                valid = False
+        if "feature" in changes and changes["feature"] not in FEATURES:
+            errors.append(f"gestures.{name}: unknown feature {changes['feature']!r}")
+            valid = False
+        if changes.get("direction", "above") not in ("above", "below"):
+            errors.append(f"gestures.{name}.direction must be 'above' or 'below'")
+            valid = False
+        if name not in BUILTIN_RULES and not {"feature", "threshold"} <= set(changes):
+            errors.append(f"gestures.{name}: new gestures need feature and threshold")
+            valid = False
+        if valid:
+            gestures[name] = {
+                k: float(v) if RULE_FIELDS[k] is float else v
+                for k, v in changes.items()
+            }
+    return gestures
+
+
+def _validate_capture(data: Any, errors: List[str]) -> Dict[str, Any]:
+    """capture の項目を検証します。"""
+    if not isinstance(data, dict):
+        errors.append("capture must be an object")
+        return {}
+    capture: Dict[str, Any] = {}
+    for key, value in data.items():
+        if key not in CAPTURE_ARGUMENTS:
+            errors.append(f"capture: unknown setting {key!r}")
+        elif key == "source" and (_is_integer(value) or isinstance(value, str)):
+            capture[key] = str(value)
+        elif key == "backend" and value in CAPTURE_BACKENDS:
+            capture[key] = value
+        elif key in ("resolution", "fourcc") and isinstance(value, str):
+            try:
+                if key == "resolution":
+                    parse_resolution(value)
+                else:
+                    parse_fourcc(value)
+            except ValueError as e:
+                errors.append(f"capture.{key}: {e}")
+                continue
+            capture[key] = value
+        elif key == "fps" and _is_number(value) and value >= 0:
+            capture[key] = float(value)
+        elif key == "buffer_size" and _is_integer(value) and value >= 1:
+            capture[key] = value
+        elif key == "max_width" and (
+            value is None or (_is_integer(value) and value >= 1)
+        ):
+            capture[key] = value
+        else:
+            errors.append(f"capture.{key} has an invalid value {value!r}")
+    return capture
+
+
+def _validate_placement(
+    name: str, data: Any, errors: List[str]
+) -> Optional[WindowPlacement]:
+    """ウィンドウの位置と大きさを検証します。"""
+    if not isinstance(data, dict) or not {"x", "y"} <= set(data):
+        errors.append(f"{name} must be an object with x and y")
+        return None
+    for key, value in data.items():
+        if key not in ("x", "y", "width", "height"):
+            errors.append(f"{name}: unknown setting {key!r}")
+            return None
+        if key in ("width", "height") and value is None:
+            continue
+        if not _is_integer(value):
+            errors.append(f"{name}.{key} must be an integer")
+            return None
+        if key in ("width", "height") and value < 1:
+            errors.append(f"{name}.{key} must be positive")
+            return None
+    return WindowPlacement(**data)
+
+
+class ProfileWatcher:
+    """プロファイルのファイルを監視し、変更されたら読み込み直すスレッド。
+
+    読み込みと検証はこのスレッドで行い、コントローラーには検証済みの
+    プロファイルを渡すだけなので、判定ルールの差し替えはフレームの合間に行われます。
+    不正な内容に変更された場合は、それまでのプロファイルを使い続けます。
+    """
+
+    def __init__(
+        self,
+        path: str,
+        controller: GestureController,
+        profile: Profile,
+        interval: float = 1.0,
+        key_backend: Optional[str] = None,
+    ) -> None:
+        """ProfileWatcherを初期化します。
+
+        Args:
+            path: 監視するプロファイルのパス
+            controller: 反映先のコントローラー
+            profile: 起動時に反映したプロファイル
+            interval: ファイルの更新を確認する間隔（秒）
+            key_backend: 割り当てたキーを送信できるか確認するキー送信の方式
+        """
+        self.path: str = path
+        self.controller: GestureController = controller
+        self.profile: Profile = profile
+        self.interval: float = interval
+        self.key_backend: Optional[str] = key_backend
+        self._mtime: Optional[float] = self._modified()
+        self._stop_event: threading.Event = threading.Event()
+        self._thread: threading.Thread = threading.Thread(
+            target=self._watch_loop, daemon=True
+        )
+
+    def _modified(self) -> Optional[float]:
+        """ファイルの更新時刻（ファイルが無い場合はNone）。"""
+        try:
+            return os.stat(self.path).st_mtime
+        except OSError:
+            return None
+
+    def start(self) -> None:
+        """監視を開始します。"""
+        self._thread.start()
+
+    def stop(self) -> None:
+        """監視を終了します。"""
+        self._stop_event.set()
+        self._thread.join(timeout=1.0)
+
+    def _watch_loop(self) -> None:
+        """interval ごとに更新時刻を確認するループ。"""
+        while not self._stop_event.wait(self.interval):
+            mtime: Optional[float] = self._modified()
+            if mtime is None or mtime == self._mtime:
+                continue
+            self._mtime = mtime
+            self.reload()
+
+    def reload(self) -> bool:
+        """プロファイルを読み込み直し、次のフレームで反映するよう予約します。
+
+        Returns:
+            読み込めた場合True（不正な場合は現在のプロファイルを使い続ける）
+        """
+        try:
+            profile: Profile = Profile.load(self.path, self.key_backend)
+            self.controller.schedule_profile(profile, self.profile)
+        except (OSError, ValueError) as e:
+            print(f"[profile] keeping the current profile, {self.path}: {e}")
+            return False
+        print(f"[profile] reloaded {self.path}")
+        restart: List[str] = profile.restart_required(self.profile)
+        if restart:
+            print(f"[profile] restart to apply: {', '.join(restart)}")
+        self.profile = profile
+        return True
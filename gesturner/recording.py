@@ -0,0 +1,392 @@
+"""ランドマークの記録ファイルと、メモリマップによる再生。
+
+フレームごとのランドマーク・時刻・ジェスチャー判定結果を、
+固定長の float32 レコードとして小さなヘッダーの後に書き出します。
+再生時はファイルをメモリマップし、推論を行わずに
+ランドマークから直接ジェスチャーの判定を再現します。
+
+ファイル形式（リトルエンディアン）:
+    ヘッダー (16 byte): magic "GTLM", version (uint16), ランドマーク数 (uint16),
+                        1レコードの要素数 (uint32), キー名の数 (uint32)
+    キー名の表 (KEY_SLOTS × KEY_NAME_SIZE byte): 送信キー名（UTF-8、NUL埋め）。
+        送信キーの列には表の位置 + 1 を保存する（version 1 には表が無く、LEGACY_KEY_NAMES）
+    レコード: float32 × (META_FIELDS + ランドマーク数 × 3)
+        [時刻, 推論の種類, 口の開閉, 視線方向, 送信キー, x0, y0, z0, x1, ...]
+        推論の種類は 0 が省略、1 が虹彩までの推論、2 が虹彩なしの軽量な推論
+        （--tier lite/auto。虹彩のランドマークは NaN）
+        顔が無いフレーム・推論を省略したフレームのランドマークは NaN
+
+使い方:
+    python -m gesturner.recording <記録ファイル> [--mouth-threshold 0.05 ...]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import struct
+from typing import (
+    TYPE_CHECKING,
+    BinaryIO,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from gesturner.controller import GestureController, ProcessResult
+
+MAGIC: bytes = b"GTLM"
+VERSION: int = 2
+HEADER_FORMAT: str = "<4sHHII"
+HEADER_SIZE: int = struct.calcsize(HEADER_FORMAT)
+
+# 送信キー名の表（記録できるキーの種類と、キー名の最大バイト数）
+KEY_SLOTS: int = 32
+KEY_NAME_SIZE: int = 16
+KEY_TABLE_SIZE: int = KEY_SLOTS * KEY_NAME_SIZE
+# version 1 の送信キーの列が表すキー名（version 2 でも表の先頭に置く）
+LEGACY_KEY_NAMES: Tuple[str, ...] = ("down", "up", "left", "right")
+
+# レコード先頭のメタデータ列
+COL_TIMESTAMP: int = 0
+COL_INFERRED: int = 1
+COL_MOUTH: int = 2
+COL_GAZE: int = 3
+COL_KEY: int = 4
+META_FIELDS: int = 5
+
+# 推論の種類の列の値（version 1 には INFERENCE_LITE が無い）
+INFERENCE_SKIPPED: float = 0.0
+INFERENCE_REFINED: float = 1.0
+INFERENCE_LITE: float = 2.0
+
+# 視線方向の数値表現（NaN は None）
+GAZE_CODES: Dict[str, float] = {"NEUTRAL": 0.0, "UP": 1.0, "DOWN": 2.0}
+
+
+def _encode(codes: Dict[str, float], value: Optional[str]) -> float:
+    """文字列を記録用の数値に変換します（未定義・Noneの場合は NaN）。"""
+    return codes.get(value, np.nan) if value is not None else np.nan
+
+
+class LandmarkRecorder:
+    """フレームごとのランドマークと判定結果をファイルに書き出すクラス。"""
+
+    def __init__(self, path: str, num_landmarks: int, keys: Iterable[str] = ()) -> None:
+        """LandmarkRecorderを初期化し、ヘッダーを書き込みます。
+
+        Args:
+            path: 出力ファイルのパス
+            num_landmarks: 1顔あたりのランドマーク数
+            keys: 送信しうるキー名（ファイルを作る前に、記録できるか確認して表に載せる）
+
+        Raises:
+            ValueError: 記録できないキー名がある場合
+        """
+        self.num_landmarks: int = num_landmarks
+        self.record_fields: int = META_FIELDS + num_landmarks * 3
+        self.key_names: List[str] = list(LEGACY_KEY_NAMES)
+        self.key_names += self.check_keys(keys)
+        self._record: np.ndarray = np.empty(self.record_fields, dtype="<f4")
+        self._start_time: Optional[float] = None
+        self._file: BinaryIO = open(path, "wb")
+        self._write_header()
+        self._file.seek(0, os.SEEK_END)
+
+    def _write_header(self) -> None:
+        """ファイルの先頭にヘッダーとキー名の表を書き込みます。"""
+        self._file.seek(0)
+        self._file.write(
+            struct.pack(
+                HEADER_FORMAT,
+                MAGIC,
+                VERSION,
+                self.num_landmarks,
+                self.record_fields,
+                len(self.key_names),
+            )
+        )
+        table: bytes = b"".join(
+            name.encode("utf-8").ljust(KEY_NAME_SIZE, b"\0") for name in self.key_names
+        )
+        self._file.write(table.ljust(KEY_TABLE_SIZE, b"\0"))
+
+    def check_keys(self, keys: Iterable[str]) -> List[str]:
+        """キー名を表に追加して記録できるか確認します（表は変更しません）。
+
+        判定ルールを差し替える前に呼び出し、記録中に送信されたキーを
+        記録できなくなることを防ぎます（任意のスレッドから呼べます）。
+
+        Args:
+            keys: 送信しうるキー名
+
+        Returns:
+            表に無いキー名（重複を除いた順）
+
+        Raises:
+            ValueError: キー名が長すぎる、またはキーの種類が KEY_SLOTS を超える場合
+        """
+        known: List[str] = list(self.key_names)
+        added: List[str] = []
+        for key in keys:
+            if key in known or key in added:
+                continue
+            if len(key.encode("utf-8")) > KEY_NAME_SIZE:
+                raise ValueError(
+                    f"key name {key!r} is too long to record "
+                    f"(max {KEY_NAME_SIZE} bytes)"
+                )
+            added.append(key)
+        if len(known) + len(added) > KEY_SLOTS:
+            raise ValueError(f"too many distinct keys to record (max {KEY_SLOTS})")
+        return added
+
+    def _key_code(self, key: Optional[str]) -> float:
+        """送信キー名を記録用の数値に変換します（初めてのキーは表に追加します）。
+
+        キーは check_keys() で確認済みのため、通常は失敗しません。
+        記録できないキーは推論スレッドを止めないよう、警告して送信なしとして記録します。
+        """
+        if key is None:
+            return np.nan
+        if key not in self.key_names:
+            try:
+                self.key_names += self.check_keys([key])
+            except ValueError as e:
+                print(f"[record] cannot record key: {e}")
+                return np.nan
+            self._write_header()
+            self._file.seek(0, os.SEEK_END)
+        return float(self.key_names.index(key) + 1)
+
+    def write(
+        self,
+        timestamp: float,
+        points: Optional[np.ndarray],
+        mouth_detected: bool,
+        gaze_direction: Optional[str],
+        key: Optional[str],
+        refined: bool = True,
+    ) -> None:
+        """1フレーム分のレコードを書き込みます。
+
+        Args:
+            timestamp: フレームの時刻（秒）。記録開始からの相対時刻で保存する
+            points: 形状 (F, N, 3) のランドマーク配列（推論を省略した場合はNone）
+            mouth_detected: 口が開いているかどうか
+            gaze_direction: 視線方向
+            key: このフレームで送信したキー名（送信なしの場合はNone）
+            refined: 虹彩まで推論したかどうか
+        """
+        if self._start_time is None:
+            self._start_time = timestamp
+
+        record: np.ndarray = self._record
+        record[COL_TIMESTAMP] = timestamp - self._start_time
+        if points is None:
+            record[COL_INFERRED] = INFERENCE_SKIPPED
+        else:
+            record[COL_INFERRED] = INFERENCE_REFINED if refined else INFERENCE_LITE
+        record[COL_MOUTH] = 1.0 if mouth_detected else 0.0
+        record[COL_GAZE] = _encode(GAZE_CODES, gaze_direction)
+        record[COL_KEY] = self._key_code(key)
+        if points is not None and points.shape[0] > 0:
+            record[META_FIELDS:] = points[0].reshape(-1)
+        else:
+            record[META_FIELDS:] = np.nan
+        self._file.write(record.tobytes())
+
+    def close(self) -> None:
+        """ファイルを閉じます。"""
+        self._file.close()
+
+
+class LandmarkRecording:
+    """記録ファイルをメモリマップで読み込むクラス。
+
+    各列はファイル上のビューとして参照でき、全体を読み込む必要はありません。
+    """
+
+    def __init__(self, path: str) -> None:
+        """記録ファイルを開きます。
+
+        Args:
+            path: 記録ファイルのパス
+
+        Raises:
+            ValueError: 記録ファイルの形式ではない、または途中で切れている場合
+        """
+        with open(path, "rb") as f:
+            header: bytes = f.read(HEADER_SIZE)
+            if len(header) < HEADER_SIZE:
+                raise ValueError(f"Not a landmark recording: {path}")
+            magic, version, num_landmarks, record_fields, key_count = struct.unpack(
+                HEADER_FORMAT, header
+            )
+            if magic != MAGIC or version not in (1, VERSION):
+                raise ValueError(f"Not a landmark recording: {path}")
+            if record_fields != META_FIELDS + num_landmarks * 3:
+                raise ValueError(
+                    f"Corrupt landmark recording header: {path} "
+                    f"({record_fields} fields for {num_landmarks} landmarks)"
+                )
+
+            offset: int = HEADER_SIZE
+            self.key_names: List[str] = list(LEGACY_KEY_NAMES)
+            if version >= 2:
+                table: bytes = f.read(KEY_TABLE_SIZE)
+                if len(table) < KEY_TABLE_SIZE or key_count > KEY_SLOTS:
+                    raise ValueError(f"Corrupt landmark recording header: {path}")
+                self.key_names = [
+                    table[i * KEY_NAME_SIZE : (i + 1) * KEY_NAME_SIZE]
+                    .rstrip(b"\0")
+                    .decode("utf-8")
+                    for i in range(key_count)
+                ]
+                offset += KEY_TABLE_SIZE
+
+        self.num_landmarks: int = num_landmarks
+        record_size: int = record_fields * 4
+        data_size: int = os.path.getsize(path) - offset
+        if data_size % record_size != 0:
+            raise ValueError(
+                f"Truncated landmark recording: {path} "
+                f"({data_size} bytes of records is not a multiple of the "
+                f"{record_size}-byte record size)"
+            )
+        self.records: np.ndarray = (
+            np.memmap(path, dtype="<f4", mode="r", offset=offset).reshape(
+                -1, record_fields
+            )
+            if data_size > 0
+            else np.empty((0, record_fields), dtype="<f4")
+        )
+
+    def __len__(self) -> int:
+        """記録されているフレーム数を返します。"""
+        return self.records.shape[0]
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        """記録開始からの時刻（秒）の列。"""
+        return self.records[:, COL_TIMESTAMP]
+
+    @property
+    def inferred(self) -> np.ndarray:
+        """推論を実行したフレームかどうかの列。"""
+        return self.records[:, COL_INFERRED] > 0.5
+
+    @property
+    def refined(self) -> np.ndarray:
+        """虹彩まで推論したフレームかどうかの列（推論を省略したフレームはFalse）。"""
+        return np.abs(self.records[:, COL_INFERRED] - INFERENCE_REFINED) < 0.5
+
+    @property
+    def keys(self) -> np.ndarray:
+        """送信キーの列（key_names の位置 + 1、送信なしは NaN）。"""
+        return self.records[:, COL_KEY]
+
+    def key_name(self, index: int) -> Optional[str]:
+        """フレームで送信したキー名を返します。
+
+        Args:
+            index: フレーム番号
+
+        Returns:
+            送信キー名（送信なしの場合はNone）
+        """
+        code: float = float(self.records[index, COL_KEY])
+        if np.isnan(code):
+            return None
+        return self.key_names[int(code) - 1]
+
+    @property
+    def landmarks(self) -> np.ndarray:
+        """形状 (フレーム数, ランドマーク数, 3) のランドマーク（顔が無いフレームは NaN）。"""
+        return self.records[:, META_FIELDS:].reshape(-1, self.num_landmarks, 3)
+
+    def frame_points(self, index: int) -> Optional[np.ndarray]:
+        """1フレーム分のランドマークを検知器に渡せる形で返します。
+
+        Args:
+            index: フレーム番号
+
+        Returns:
+            形状 (F, N, 3) のランドマーク配列（顔が無い場合は F=0）。
+            推論を省略したフレームはNone
+        """
+        if self.records[index, COL_INFERRED] < 0.5:
+            return None
+        points: np.ndarray = self.landmarks[index : index + 1]
+        if np.isnan(points[0, 0, 0]):
+            return points[:0]
+        return points
+
+
+def playback(
+    recording: LandmarkRecording, controller: GestureController
+) -> Iterator[Tuple[int, ProcessResult]]:
+    """記録したランドマークでGestureControllerの判定を再現します。
+
+    虹彩なしの軽量な推論で記録したフレームは、実行時と同じく
+    虹彩まで推論していない結果として判定します。
+
+    Args:
+        recording: 記録ファイル
+        controller: 判定を行うコントローラー（推論は実行されない）
+
+    Yields:
+        (フレーム番号, ジェスチャー処理結果) の組
+    """
+    timestamps: np.ndarray = recording.timestamps
+    refined: np.ndarray = recording.refined
+    for index in range(len(recording)):
+        yield index, controller.process_landmarks(
+            recording.frame_points(index),
+            float(timestamps[index]),
+            bool(refined[index]),
+        )
+
+
+def run() -> None:
+    """記録ファイルを再生し、閾値を変えた場合に送信されるキーを表示します。"""
+    from gesturner.controller import GestureController
+    from gesturner.key_controller import KeyRecorder
+
+    parser = argparse.ArgumentParser(description="Play back a landmark recording")
+    parser.add_argument("recording", help="Landmark recording file")
+    parser.add_argument("--mouth-threshold", type=float, help="mouth_open threshold")
+    parser.add_argument("--up-threshold", type=float, help="look_up threshold")
+    parser.add_argument("--down-duration", type=float, help="mouth_open hold (s)")
+    parser.add_argument("--up-duration", type=float, help="look_up hold (s)")
+    args = parser.parse_args()
+
+    recorder: KeyRecorder = KeyRecorder()
+    controller: GestureController = GestureController(
+        adaptive=False, key_sender=recorder
+    )
+    if args.mouth_threshold is not None:
+        controller.update_rule("mouth_open", threshold=args.mouth_threshold)
+    if args.up_threshold is not None:
+        controller.update_rule("look_up", threshold=args.up_threshold)
+    if args.down_duration is not None:
+        controller.update_rule("mouth_open", hold=args.down_duration)
+    if args.up_duration is not None:
+        controller.update_rule("look_up", hold=args.up_duration)
+
+    recording: LandmarkRecording = LandmarkRecording(args.recording)
+    timestamps: np.ndarray = recording.timestamps
+    for index, _ in playback(recording, controller):
+        while recorder.keys:
+            key: str = recorder.keys.pop(0)
+            print(f"{timestamps[index]:9.3f}s frame={index} key={key}")
+
+
+if __name__ == "__main__":
+    run()
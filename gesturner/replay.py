@@ -0,0 +1,134 @@
+"""録画済みの動画や連番画像をGestureControllerに流すヘッドレスのリプレイモード。
+
+Webカメラ・オーバーレイ・実際のキー送信を使わずに検知処理を再現します。
+
+使い方:
+    python -m gesturner.replay <動画ファイルまたは画像ディレクトリ>
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Iterator, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from gesturner.controller import GestureController, ProcessResult
+from gesturner.key_controller import KeyRecorder
+
+# 連番画像として読み込む拡張子
+IMAGE_EXTENSIONS: Tuple[str, ...] = (".png", ".jpg", ".jpeg", ".bmp")
+
+
+@dataclass
+class ReplayFrame:
+    """リプレイした1フレーム分の結果。
+
+    Attributes:
+        index: フレーム番号
+        timestamp: 動画上の時刻（秒）
+        result: ジェスチャー処理結果
+        process_ms: GestureController.process の処理時間（ミリ秒）
+        keys: このフレームで送信されたキー名
+    """
+
+    index: int
+    timestamp: float
+    result: ProcessResult
+    process_ms: float
+    keys: List[str] = field(default_factory=list)
+
+
+def iter_frames(source: str, fps: float = 30.0) -> Iterator[Tuple[float, np.ndarray]]:
+    """動画ファイルまたは連番画像のディレクトリからフレームを読み出します。
+
+    Args:
+        source: 動画ファイルのパス、または画像ファイルを含むディレクトリ
+        fps: 連番画像、またはFPSを取得できない動画に使うフレームレート
+
+    Yields:
+        (動画上の時刻（秒）, BGR画像) の組
+    """
+    if os.path.isdir(source):
+        names: List[str] = sorted(
+            n for n in os.listdir(source) if n.lower().endswith(IMAGE_EXTENSIONS)
+        )
+        for index, name in enumerate(names):
+            image: Optional[np.ndarray] = cv2.imread(os.path.join(source, name))
+            if image is not None:
+                yield index / fps, image
+        return
+
+    cap: cv2.VideoCapture = cv2.VideoCapture(source)
+    if not cap.isOpened():
+        raise FileNotFoundError(f"Cannot open video source: {source}")
+    video_fps: float = cap.get(cv2.CAP_PROP_FPS) or fps
+    index = 0
+    try:
+        while True:
+            success: bool
+            frame: np.ndarray
+            success, frame = cap.read()
+            if not success:
+                break
+            yield index / video_fps, frame
+            index += 1
+    finally:
+        cap.release()
+
+
+def replay(
+    source: str, controller: GestureController, fps: float = 30.0
+) -> Iterator[ReplayFrame]:
+    """録画をGestureControllerに流し、フレームごとの結果を返します。
+
+    キーの記録のため、controller の key_sender は KeyRecorder に差し替えます。
+
+    Args:
+        source: 動画ファイルのパス、または画像ファイルを含むディレクトリ
+        controller: 検知処理を行うコントローラー
+        fps: 連番画像に使うフレームレート
+
+    Yields:
+        フレームごとのリプレイ結果
+    """
+    recorder: KeyRecorder = KeyRecorder()
+    controller.key_sender = recorder
+
+    for index, (timestamp, frame) in enumerate(iter_frames(source, fps)):
+        sent: int = len(recorder.keys)
+        start: float = time.perf_counter()
+        result: ProcessResult = controller.process(frame, timestamp)
+        process_ms: float = (time.perf_counter() - start) * 1000.0
+        yield ReplayFrame(index, timestamp, result, process_ms, recorder.keys[sent:])
+
+
+def run() -> None:
+    """リプレイを実行し、送信されたキーを表示します。"""
+    parser = argparse.ArgumentParser(description="Replay a recording headlessly")
+    parser.add_argument("source", help="Video file or directory of images")
+    parser.add_argument(
+        "--fps", type=float, default=30.0, help="Frame rate for image sequences"
+    )
+    parser.add_argument(
+        "--full-rate", action="store_true", help="Disable adaptive inference rate"
+    )
+    parser.add_argument(
+        "--no-roi", action="store_true", help="Disable face region tracking"
+    )
+    args = parser.parse_args()
+
+    controller: GestureController = GestureController(
+        adaptive=not args.full_rate, roi_tracking=not args.no_roi
+    )
+    for frame in replay(args.source, controller, args.fps):
+        for key in frame.keys:
+            print(f"{frame.timestamp:9.3f}s frame={frame.index} key={key}")
+
+
+if __name__ == "__main__":
+    run()
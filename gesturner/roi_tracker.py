@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+from typing import Optional, Tuple
+
+import numpy as np
+
+from gesturner.landmarks import NUM_LANDMARKS
+
+# 切り出し領域（ピクセル座標: x0, y0, x1, y1）
+Box = Tuple[int, int, int, int]
+
+
+class RoiTracker:
+    """前フレームの顔の位置から推論対象の領域を切り出すトラッカー。
+
+    顔を囲む正方形に余白を加えた領域だけを縮小して推論に渡すことで、
+    前処理と推論のコストをカメラ解像度ではなく顔の大きさに比例させます。
+    顔を見失った場合はフレーム全体の探索に戻ります。
+    """
+
+    def __init__(self, padding: float = 0.3, max_size: int = 320) -> None:
+        """RoiTrackerを初期化します。
+
+        Args:
+            padding: 顔の大きさに対して上下左右に加える余白の割合
+            max_size: 切り出した画像の一辺の最大ピクセル数（超える場合は縮小）
+        """
+        self.padding: float = padding
+        self.max_size: int = max_size
+        self.box: Optional[Box] = None  # 現在の追跡領域（Noneの場合は全体探索）
+
+    def crop(self, frame: np.ndarray) -> Tuple[np.ndarray, Optional[Box]]:
+        """追跡領域を切り出して縮小します。
+
+        Args:
+            frame: 入力画像（BGR形式）
+
+        Returns:
+            推論に渡す画像と、その切り出し領域（全体探索の場合はNone）
+        """
+        return self.crop_to(frame, self.box)
+
+    def crop_to(
+        self, frame: np.ndarray, box: Optional[Box]
+    ) -> Tuple[np.ndarray, Optional[Box]]:
+        """指定した領域を切り出して縮小します（追跡の状態は変更しません）。
+
+        Args:
+            frame: 入力画像（BGR形式）
+            box: 切り出し領域（Noneの場合はフレーム全体）
+
+        Returns:
+            推論に渡す画像と、その切り出し領域（全体探索の場合はNone）
+        """
+        if box is None:
+            return frame, None
+
+        x0, y0, x1, y1 = box
+        roi: np.ndarray = frame[y0:y1, x0:x1]
+        side: int = max(x1 - x0, y1 - y0)
+        if side > self.max_size:
+            # OpenCVは起動を遅らせないよう、初めて縮小する時点で読み込む
+            import cv2
+
+            scale: float = self.max_size / side
+            roi = cv2.resize(
+                roi,
+                (max(1, round((x1 - x0) * scale)), max(1, round((y1 - y0) * scale))),
+                interpolation=cv2.INTER_AREA,
+            )
+        return roi, box
+
+    @staticmethod
+    def to_full_frame(
+        points: np.ndarray, box: Box, frame_shape: Tuple[int, ...]
+    ) -> None:
+        """切り出し画像上の正規化座標をフレーム全体の正規化座標に変換します（インプレース）。
+
+        Args:
+            points: 形状 (F, N, 3) のランドマーク配列
+            box: 推論に使った切り出し領域
+            frame_shape: 元フレームの shape
+        """
+        h, w = frame_shape[:2]
+        x0, y0, x1, y1 = box
+        roi_w: float = float(x1 - x0)
+        roi_h: float = float(y1 - y0)
+        points[..., 0] *= roi_w / w
+        points[..., 0] += x0 / w
+        points[..., 1] *= roi_h / h
+        points[..., 1] += y0 / h
+        # z は画像の幅を基準としたスケールのため、幅の比率で補正する
+        points[..., 2] *= roi_w / w
+
+    @staticmethod
+    def bounds(points: np.ndarray) -> np.ndarray:
+        """顔ごとの外接矩形を求めます。
+
+        Args:
+            points: フレーム全体の正規化座標で表した形状 (F, N, 3) のランドマーク配列
+
+        Returns:
+            形状 (F, 4) の配列（正規化座標: min_x, min_y, max_x, max_y）
+        """
+        # 虹彩（軽量な推論ではNaN）は顔の内側にあるため、外接矩形には使わない
+        xy: np.ndarray = points[:, :NUM_LANDMARKS, :2]
+        return np.concatenate([xy.min(axis=1), xy.max(axis=1)], axis=1)
+
+    def update(self, points: np.ndarray, frame_shape: Tuple[int, ...]) -> None:
+        """検出結果から次フレームの追跡領域を更新します。
+
+        Args:
+            points: フレーム全体の正規化座標で表した形状 (F, N, 3) のランドマーク配列
+                （先頭の顔を追跡する）
+            frame_shape: 元フレームの shape
+        """
+        self.update_bounds(
+            self.bounds(points[:1])[0] if points.shape[0] > 0 else None, frame_shape
+        )
+
+    def update_bounds(
+        self, bounds: Optional[np.ndarray], frame_shape: Tuple[int, ...]
+    ) -> None:
+        """追跡する顔の外接矩形から次フレームの追跡領域を更新します。
+
+        Args:
+            bounds: bounds() で求めた1顔分の外接矩形（Noneの場合は顔を見失った）
+            frame_shape: 元フレームの shape
+        """
+        if bounds is None:
+            # 顔を見失ったら全体探索に戻す
+            self.box = None
+            return
+
+        h, w = frame_shape[:2]
+        min_x, min_y, max_x, max_y = (float(v) for v in bounds)
+
+        # 顔の中心を基準に、余白を加えた正方形の領域を求める
+        cx: float = (min_x + max_x) / 2.0 * w
+        cy: float = (min_y + max_y) / 2.0 * h
+        half: float = max((max_x - min_x) * w, (max_y - min_y) * h) * (
+            0.5 + self.padding
+        )
+
+        x0: int = max(0, int(cx - half))
+        y0: int = max(0, int(cy - half))
+        x1: int = min(w, int(cx + half))
+        y1: int = min(h, int(cy + half))
+        self.box = (x0, y0, x1, y1) if x1 - x0 > 1 and y1 - y0 > 1 else None
+
+    def reset(self) -> None:
+        """追跡を解除し、次のフレームで全体探索を行います。"""
+        self.box = None
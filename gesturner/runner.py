@@ -0,0 +1,315 @@
+"""UIに依存しない検知処理一式（キャプチャ・推論・判定・キー送信）の組み立て。
+
+GUIアプリ（gesturner.main）とヘッドレス実行（gesturner.headless）で共通の
+コマンドライン引数と起動処理をまとめます。このモジュールは tkinter や
+pywin32 を読み込まないため、デスクトップの無い Linux 環境でも使えます。
+"""
+
+from __future__ import annotations
+
+import argparse
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, List, Optional, Tuple
+
+from gesturner.actuation import BACKENDS, KeyActuator, KeyEvent, create_actuator
+from gesturner.capture import Capture, CaptureSettings, settings_from_args
+from gesturner.capture import add_arguments as add_capture_arguments
+from gesturner.controller import GestureController
+from gesturner.gestures import GestureRegistry, GestureRule
+from gesturner.landmarks import NUM_REFINED_LANDMARKS
+from gesturner.metrics import METRICS, MetricsExporter, StartupTimer
+from gesturner.performer import DEFAULT_MAX_FACES, PERFORMER_STRATEGIES
+from gesturner.scheduler import TIER_MODES
+from gesturner.pipeline import Pipeline, ProcessPipeline, StageTimings
+from gesturner.profile import Profile, ProfileWatcher
+from gesturner.recording import LandmarkRecorder
+
+
+def add_arguments(
+    parser: argparse.ArgumentParser, key_backend: str = "pyautogui"
+) -> None:
+    """検知処理のコマンドライン引数を追加します。
+
+    Args:
+        parser: 引数を追加するパーサー
+        key_backend: --key-backend の既定値
+    """
+    parser.add_argument(
+        "--full-rate",
+        action="store_true",
+        help="Run inference on every frame (disable adaptive inference rate)",
+    )
+    parser.add_argument(
+        "--no-roi",
+        action="store_true",
+        help="Run inference on the full frame (disable face region tracking)",
+    )
+    parser.add_argument(
+        "--no-smoothing",
+        action="store_true",
+        help="Threshold raw per-frame ratios (disable temporal smoothing)",
+    )
+    parser.add_argument(
+        "--max-faces",
+        type=int,
+        default=DEFAULT_MAX_FACES,
+        help=(
+            "Maximum number of faces to detect; at least 2 lets --performer "
+            f"tell the performer from bystanders (default: {DEFAULT_MAX_FACES})"
+        ),
+    )
+    parser.add_argument(
+        "--performer",
+        choices=PERFORMER_STRATEGIES,
+        default="largest",
+        help="Which face to follow when several are detected (default: largest)",
+    )
+    parser.add_argument(
+        "--tier",
+        choices=TIER_MODES,
+        default="auto",
+        help=(
+            "Detection tier: 'lite' runs iris refinement only while a gaze "
+            "gesture may be in progress, 'auto' switches to it when refined "
+            "inference exceeds --tier-budget (default: auto)"
+        ),
+    )
+    parser.add_argument(
+        "--tier-budget",
+        type=float,
+        default=50.0,
+        metavar="MS",
+        help="Refined inference time that makes --tier auto go lite (default: 50)",
+    )
+    parser.add_argument(
+        "--key-backend",
+        choices=sorted(BACKENDS),
+        default=key_backend,
+        help=f"Key injection backend (default: {key_backend})",
+    )
+    parser.add_argument(
+        "--profile",
+        metavar="PATH",
+        help=(
+            "Load thresholds, key bindings, capture, tier and window settings "
+            "from a profile (reloaded automatically when the file changes)"
+        ),
+    )
+    parser.add_argument(
+        "--record",
+        metavar="PATH",
+        help="Record per-frame landmarks and gesture results to a file",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=0,
+        help="Run inference in this many worker processes (default: 0, in-process)",
+    )
+    parser.add_argument(
+        "--metrics",
+        metavar="PATH",
+        help="Append per-stage timing histograms to a JSON-lines file",
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        help="Also serve the latest metrics as JSON on http://127.0.0.1:PORT/",
+    )
+    parser.add_argument(
+        "--metrics-interval",
+        type=float,
+        default=5.0,
+        help="Seconds between metrics log lines (default: 5)",
+    )
+    add_capture_arguments(parser)
+
+
+def parse_args(
+    parser: argparse.ArgumentParser,
+) -> Tuple[argparse.Namespace, Profile]:
+    """引数を解析し、--profile を指定した場合はプロファイルを読み込みます。
+
+    プロファイルの映像入力・検知の段階・演者の設定は引数の既定値として使い、
+    コマンドラインで明示した引数を優先します。
+
+    Args:
+        parser: add_arguments() で引数を追加したパーサー
+
+    Returns:
+        解析した引数と、読み込んだプロファイル（指定が無い場合は既定値）
+    """
+    args: argparse.Namespace = parser.parse_args()
+    if not args.profile:
+        return args, Profile()
+    try:
+        profile: Profile = Profile.load(args.profile, args.key_backend)
+    except (OSError, ValueError) as e:
+        parser.error(f"cannot load profile {args.profile}: {e}")
+    parser.set_defaults(**profile.argument_defaults())
+    return parser.parse_args(), profile
+
+
+class Runner:
+    """UIに依存しない検知処理一式。
+
+    start() でカメラを開く処理とモデルの準備を並行して行い、
+    パイプラインを起動します。処理結果は pipeline.get_result() で受け取ります。
+    """
+
+    def __init__(
+        self,
+        parser: argparse.ArgumentParser,
+        args: argparse.Namespace,
+        startup: StartupTimer,
+        on_key: Optional[Callable[[KeyEvent], None]] = None,
+        profile: Optional[Profile] = None,
+    ) -> None:
+        """引数を検証し、計測と記録を準備します。
+
+        Args:
+            parser: 引数の誤りを報告するパーサー
+            args: add_arguments() で追加した引数を解析した結果
+            startup: 起動時間の内訳の記録先
+            on_key: キーの送信が完了した時に呼び出す関数（ワーカースレッドから呼ばれる）
+            profile: parse_args() で読み込んだプロファイル
+        """
+        if args.workers and args.record:
+            parser.error("--record cannot be combined with --workers")
+        if args.max_faces < 1:
+            parser.error("--max-faces must be at least 1")
+        try:
+            self.capture_settings: CaptureSettings = settings_from_args(args)
+        except ValueError as e:
+            parser.error(str(e))
+
+        self.args: argparse.Namespace = args
+        self.startup: StartupTimer = startup
+        self.on_key: Optional[Callable[[KeyEvent], None]] = on_key
+        self.profile: Profile = profile or Profile()
+        self.watcher: Optional[ProfileWatcher] = None
+        self.timings: StageTimings = StageTimings()
+
+        # 計測は --metrics / --metrics-port を指定した場合のみ有効にする
+        self.exporter: Optional[MetricsExporter] = None
+        if args.metrics or args.metrics_port is not None:
+            METRICS.enabled = True
+            self.exporter = MetricsExporter(
+                METRICS, args.metrics, args.metrics_interval, args.metrics_port
+            )
+            self.exporter.start()
+
+        # 記録時は全フレームのランドマークを残すため毎フレーム推論する
+        # 割り当てたキーは推論を始める前に記録できるか確認する
+        self.recorder: Optional[LandmarkRecorder] = None
+        if args.record:
+            rules: List[GestureRule] = self.profile.rules(list(GestureRegistry()))
+            try:
+                self.recorder = LandmarkRecorder(
+                    args.record,
+                    NUM_REFINED_LANDMARKS,
+                    keys=[r.key for r in rules if r.key is not None],
+                )
+            except ValueError as e:
+                parser.error(f"cannot record to {args.record}: {e}")
+        self.actuator: Optional[KeyActuator] = None
+        self.controller: Optional[GestureController] = None
+        self.pipeline: Optional[Pipeline] = None
+
+    def _open_camera(self) -> Capture:
+        """設定に従ってカメラ（または動画ファイル）を開き、実際の設定を表示します。"""
+        with self.startup.phase("camera"):
+            capture: Capture = Capture(self.capture_settings)
+        if capture.mode is None:
+            print(f"[capture] cannot open source {self.capture_settings.source!r}")
+        else:
+            print(f"[capture] {capture.mode.describe()}")
+        return capture
+
+    def _emit(self, event: KeyEvent) -> None:
+        """キーの送信完了を記録します。"""
+        self.timings.record("actuation", event.latency_ms or 0.0)
+        if self.on_key is not None:
+            self.on_key(event)
+
+    def start(self) -> Pipeline:
+        """カメラ・キー送信・モデルを準備し、パイプラインを起動します。
+
+        Returns:
+            起動したパイプライン
+        """
+        args: argparse.Namespace = self.args
+        startup: StartupTimer = self.startup
+
+        # カメラを開く処理と、キー送信・モデルの準備を並行して行う
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            camera: Future[Capture] = executor.submit(self._open_camera)
+
+            # キー送信は専用スレッドで行い、検知スレッドを待たせない
+            with startup.phase("actuator"):
+                self.actuator = create_actuator(args.key_backend, on_emit=self._emit)
+            controller: GestureController = GestureController(
+                adaptive=not (args.full_rate or self.recorder),
+                roi_tracking=not args.no_roi,
+                key_sender=self.actuator,
+                smoothing=not args.no_smoothing,
+                max_faces=args.max_faces,
+                performer=args.performer,
+                tier=args.tier,
+                tier_budget_ms=args.tier_budget,
+                recorder=self.recorder,
+            )
+            if args.profile:
+                self.profile.apply(controller)
+            if args.workers == 0:
+                frame_shape: Tuple[int, int, int] = (
+                    self.capture_settings.height or 480,
+                    self.capture_settings.width or 640,
+                    3,
+                )
+                with startup.phase("model"):
+                    controller.landmark_engine
+                with startup.phase("warmup"):
+                    controller.warm_up(frame_shape)
+            capture: Capture = camera.result()
+        self.controller = controller
+
+        # --workers を指定した場合は推論をワーカープロセスで実行し、
+        # このプロセスではUIとキー送信だけを行う
+        pipeline: Pipeline
+        if args.workers > 0:
+            process_pipeline: ProcessPipeline = ProcessPipeline(
+                lambda: capture, controller, args.workers, self.timings
+            )
+            if capture.mode is not None:
+                with startup.phase("workers"):
+                    process_pipeline.pool.start(
+                        (capture.mode.output_height, capture.mode.output_width, 3)
+                    )
+            pipeline = process_pipeline
+        else:
+            pipeline = Pipeline(lambda: capture, controller, self.timings)
+
+        pipeline.start()
+        self.pipeline = pipeline
+
+        # プロファイルの変更はFaceMeshを作り直さずにフレームの合間で反映する
+        if args.profile:
+            self.watcher = ProfileWatcher(
+                args.profile, controller, self.profile, key_backend=args.key_backend
+            )
+            self.watcher.start()
+        return pipeline
+
+    def close(self) -> None:
+        """パイプライン・キー送信・計測・記録を終了します。"""
+        if self.watcher is not None:
+            self.watcher.stop()
+        if self.pipeline is not None:
+            self.pipeline.stop()
+        if self.actuator is not None:
+            self.actuator.close()
+        if self.exporter is not None:
+            self.exporter.stop()
+        if self.recorder is not None:
+            self.recorder.close()
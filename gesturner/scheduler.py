@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+from typing import Final, Optional, Tuple
+
+# 検知の精度の段階: auto（処理時間から自動選択）, full（常に虹彩まで推論）,
+# lite（視線のジェスチャーが起こりうる間だけ虹彩まで推論）
+TIER_MODES: Final[Tuple[str, ...]] = ("auto", "full", "lite")
+
+
+class AdaptiveScheduler:
+    """ジェスチャーの状態に応じて推論頻度を調整するスケジューラー。
+
+    検知結果が一定回数続けて落ち着いている（中立・口が閉じている）間は
+    推論を低頻度に落とし、比率が閾値に近づいた時点で毎フレーム推論に戻します。
+
+    低頻度の間は推論が idle_interval 秒おきになるため、ジェスチャーを急に始めた場合は
+    検知の開始（保持時間の計測開始）が最大 idle_interval 秒（と次のフレームまでの時間）遅れ、
+    キーの送信も同じだけ遅れます。既定の0.1秒は30fpsで3フレームに1回の推論にあたり、
+    推論を約3分の1に減らしつつ、保持時間（既定1秒）に比べて遅れを小さく抑えます。
+    ルールの approach の幅を通って徐々に閾値に近づく動きでは、閾値に達する前に
+    毎フレーム推論に戻るため遅れません。
+    """
+
+    def __init__(self, idle_interval: float = 0.1, steady_count: int = 15) -> None:
+        """AdaptiveSchedulerを初期化します。
+
+        Args:
+            idle_interval: 低頻度モードでの推論間隔（秒）
+            steady_count: 低頻度モードへ移行するまでに必要な連続した安定結果の数
+        """
+        self.idle_interval: float = idle_interval
+        self.steady_count: int = steady_count
+
+        self.last_inference_time: Optional[float] = None  # 最後に推論した時刻
+        self.calm_count: int = 0  # 連続した安定結果の数
+
+    @property
+    def idle(self) -> bool:
+        """低頻度モードかどうか。"""
+        return self.calm_count >= self.steady_count
+
+    def should_infer(self, current_time: float) -> bool:
+        """このフレームで推論を実行すべきかどうかを判定します。
+
+        Args:
+            current_time: 現在時刻（秒）
+
+        Returns:
+            推論を実行する場合True、前回の結果を再利用する場合False
+        """
+        if not self.idle or self.last_inference_time is None:
+            return True
+        return current_time - self.last_inference_time >= self.idle_interval
+
+    def update(self, current_time: float, calm: bool) -> None:
+        """推論結果を反映します。
+
+        Args:
+            current_time: 推論を実行した時刻（秒）
+            calm: 検知結果が閾値から十分離れていて安定しているかどうか
+        """
+        self.last_inference_time = current_time
+        if calm:
+            self.calm_count = min(self.calm_count + 1, self.steady_count)
+        else:
+            # 閾値に近づいたら即座に毎フレーム推論へ戻す
+            self.calm_count = 0
+
+
+class TierScheduler:
+    """虹彩まで推論する精密な段階（full）と軽量な段階（lite）を切り替えるスケジューラー。
+
+    lite の間は口の開閉と顔の有無を虹彩なしの軽量な推論で判定し、
+    視線のジェスチャーが閾値に近い・検知中・保持中の間と、
+    probe_interval ごとの確認時だけ虹彩まで推論します。
+    auto では精密な推論の処理時間を計測し、budget_ms を超えたら lite に、
+    budget_ms × recover_ratio を下回ったら full に戻します。
+    """
+
+    def __init__(
+        self,
+        mode: str = "auto",
+        budget_ms: float = 50.0,
+        probe_interval: float = 0.25,
+        recover_ratio: float = 0.6,
+        min_samples: int = 30,
+    ) -> None:
+        """TierSchedulerを初期化します。
+
+        Args:
+            mode: 段階の選び方（TIER_MODES のいずれか）
+            budget_ms: 精密な推論に許容する1フレームあたりの処理時間（ミリ秒）
+            probe_interval: lite の間に視線を確認する間隔（秒）
+            recover_ratio: full に戻す処理時間の budget_ms に対する割合
+            min_samples: 段階を切り替える判断に必要な計測回数
+
+        Raises:
+            ValueError: mode が未知の値の場合
+        """
+        if mode not in TIER_MODES:
+            raise ValueError(
+                f"Unknown detection tier {mode!r} "
+                f"(expected one of {', '.join(TIER_MODES)})"
+            )
+        self.mode: str = mode
+        self.budget_ms: float = budget_ms
+        self.probe_interval: float = probe_interval
+        self.recover_ratio: float = recover_ratio
+        self.min_samples: int = min_samples
+
+        self.lite: bool = mode == "lite"  # 現在 lite の段階かどうか
+        self.refined_ms: Optional[float] = None  # 精密な推論の処理時間の移動平均
+        self.samples: int = 0  # 精密な推論の計測回数
+        self.last_refined_time: Optional[float] = None  # 最後に精密な推論をした時刻
+        self.gaze_pending: bool = True  # 視線のジェスチャーが起こりうるかどうか
+
+    def configure(self, mode: str, budget_ms: float) -> None:
+        """段階の選び方と処理時間の上限を変更します（計測した処理時間は引き継ぎます）。
+
+        Args:
+            mode: 段階の選び方（TIER_MODES のいずれか）
+            budget_ms: 精密な推論に許容する1フレームあたりの処理時間（ミリ秒）
+
+        Raises:
+            ValueError: mode が未知の値の場合
+        """
+        if mode not in TIER_MODES:
+            raise ValueError(
+                f"Unknown detection tier {mode!r} "
+                f"(expected one of {', '.join(TIER_MODES)})"
+            )
+        self.mode = mode
+        self.budget_ms = budget_ms
+        if mode != "auto":
+            self.lite = mode == "lite"
+
+    def should_refine(self, current_time: float) -> bool:
+        """このフレームで虹彩まで推論すべきかどうかを判定します。
+
+        Args:
+            current_time: フレームの時刻（秒）
+
+        Returns:
+            精密な推論を行う場合True、軽量な推論で済ませる場合False
+        """
+        if not self.lite or self.gaze_pending or self.last_refined_time is None:
+            return True
+        return current_time - self.last_refined_time >= self.probe_interval
+
+    def update(self, current_time: float, refined: bool, gaze_calm: bool) -> None:
+        """推論結果を反映します。
+
+        Args:
+            current_time: 推論を実行したフレームの時刻（秒）
+            refined: 精密な推論だったかどうか
+            gaze_calm: 虹彩を使うジェスチャーが閾値から十分離れていて保持中でもないかどうか
+        """
+        if refined:
+            self.last_refined_time = current_time
+            self.gaze_pending = not gaze_calm
+
+    def record(self, refined: bool, elapsed_ms: float) -> bool:
+        """推論の処理時間を記録し、auto の場合は段階を選び直します。
+
+        Args:
+            refined: 精密な推論だったかどうか
+            elapsed_ms: 推論の処理時間（ミリ秒）
+
+        Returns:
+            段階を切り替えた場合True
+        """
+        if not refined:
+            return False
+        self.samples += 1
+        self.refined_ms = (
+            elapsed_ms
+            if self.refined_ms is None
+            else self.refined_ms + 0.1 * (elapsed_ms - self.refined_ms)
+        )
+        if self.mode != "auto" or self.samples < self.min_samples:
+            return False
+        if not self.lite and self.refined_ms > self.budget_ms:
+            self.lite = True
+            return True
+        if self.lite and self.refined_ms < self.budget_ms * self.recover_ratio:
+            self.lite = False
+            return True
+        return False
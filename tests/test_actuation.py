@@ -0,0 +1,94 @@
+import threading
+from typing import List
+
+import pytest
+
+from gesturner.actuation import BACKENDS, KeyActuator, KeyEvent, create_actuator
+from gesturner.key_controller import KeyRecorder
+
+
+class FailingBackend:
+    """最初の1回だけ送信に失敗するバックエンド。"""
+
+    def __init__(self) -> None:
+        self.keys: List[str] = []
+
+    def press(self, key: str) -> None:
+        if not self.keys:
+            self.keys.append("<failed>")
+            raise OSError("injection blocked")
+        self.keys.append(key)
+
+
+def test_recorder_backend_is_key_recorder() -> None:
+    assert BACKENDS["recorder"] is KeyRecorder
+
+
+def test_emits_every_key_in_order() -> None:
+    emitted: List[KeyEvent] = []
+    actuator: KeyActuator = create_actuator("recorder", on_emit=emitted.append)
+    for key in ["down", "up", "down"]:
+        actuator(key)
+    actuator.close()
+
+    assert isinstance(actuator.backend, KeyRecorder)
+    assert actuator.backend.keys == ["down", "up", "down"]
+    assert [e.key for e in emitted] == ["down", "up", "down"]
+    assert all(e.latency_ms is not None and e.latency_ms >= 0.0 for e in emitted)
+    assert list(actuator.history) == emitted
+
+
+def test_dedupes_bursts_by_frame_time() -> None:
+    recorder: KeyRecorder = KeyRecorder()
+    actuator: KeyActuator = KeyActuator(recorder, dedupe_window=0.3)
+    # 同じキーはフレームの取得時刻で 0.3 秒以内ならまとめる（別のキーは独立）
+    for key, frame_time in [
+        ("down", 10.0),
+        ("down", 10.1),
+        ("up", 10.1),
+        ("down", 10.29),
+        ("down", 10.3),
+        ("down", 10.5),
+        ("down", 11.0),
+    ]:
+        actuator(key, frame_time)
+    actuator.close()
+
+    assert recorder.keys == ["down", "up", "down", "down"]
+    assert actuator.dropped == 3
+    assert [e.frame_time for e in actuator.history] == [10.0, 10.1, 10.3, 11.0]
+
+
+def test_keys_without_frame_time_are_not_deduped() -> None:
+    recorder: KeyRecorder = KeyRecorder()
+    actuator: KeyActuator = KeyActuator(recorder)
+    actuator.submit("down")
+    actuator.submit("down")
+    actuator.close()
+    assert recorder.keys == ["down", "down"]
+
+
+def test_worker_survives_backend_errors(capsys: pytest.CaptureFixture[str]) -> None:
+    backend: FailingBackend = FailingBackend()
+    actuator: KeyActuator = KeyActuator(backend)
+    actuator("down", 0.0)
+    actuator("down", 1.0)
+    actuator.close()
+    assert backend.keys == ["<failed>", "down"]
+    assert len(actuator.history) == 1
+    assert "failed to press 'down'" in capsys.readouterr().out
+
+
+def test_submit_does_not_wait_for_the_backend() -> None:
+    release: threading.Event = threading.Event()
+
+    class BlockingBackend:
+        def press(self, key: str) -> None:
+            release.wait(timeout=5.0)
+
+    actuator: KeyActuator = KeyActuator(BlockingBackend())
+    actuator("down", 0.0)
+    actuator("up", 0.0)  # 1件目の送信中でもすぐに戻る
+    release.set()
+    actuator.close()
+    assert [e.key for e in actuator.history] == ["down", "up"]
@@ -0,0 +1,97 @@
+from typing import List
+
+import numpy as np
+import pytest
+
+from gesturner.calibration import (
+    KEY_RULES,
+    SweepResult,
+    load_sessions,
+    rank_key,
+    simulate_triggers,
+)
+from gesturner.controller import GestureController
+from gesturner.filters import hysteresis_mask
+from gesturner.key_controller import KeyRecorder
+from gesturner.landmarks import NUM_REFINED_LANDMARKS
+from gesturner.recording import LandmarkRecorder, LandmarkRecording, playback
+
+
+def _face(mouth_ratio: float) -> np.ndarray:
+    """口の開きの比率が mouth_ratio になる1顔分のランドマークを作ります（虹彩はNaN）。"""
+    points: np.ndarray = np.zeros((1, NUM_REFINED_LANDMARKS, 3), dtype=np.float32)
+    points[0, 10, 1] = 0.2  # 眉間
+    points[0, 152, 1] = 0.8  # 顎
+    points[0, 13, 1] = 0.5  # 上唇
+    points[0, 14, 1] = 0.5 + mouth_ratio * 0.6  # 下唇
+    return points
+
+
+def _write_session(path: str) -> None:
+    """口の開閉を繰り返す合成セッションを記録します（ジッターと短い開閉を含む）。"""
+    rng: np.random.Generator = np.random.default_rng(1)
+    recorder: LandmarkRecorder = LandmarkRecorder(path, NUM_REFINED_LANDMARKS)
+    timestamp: float = 0.0
+    for segment, (ratio, seconds) in enumerate(
+        [(0.01, 1.0), (0.09, 2.5), (0.02, 1.0), (0.07, 0.4), (0.01, 0.5), (0.1, 1.5)]
+        * 3
+    ):
+        end: float = timestamp + seconds
+        while timestamp < end:
+            noisy: float = ratio + float(rng.normal(0.0, 0.004))
+            recorder.write(timestamp, _face(noisy), False, None, None)
+            timestamp += 1.0 / 30.0 + float(rng.uniform(-0.004, 0.004))
+    recorder.close()
+
+
+def test_calibration_triggers_match_playback(tmp_path) -> None:
+    path: str = str(tmp_path / "session.gtlm")
+    labels = tmp_path / "labels.csv"
+    _write_session(path)
+    labels.write_text("time,key\n")
+
+    rule = KEY_RULES["down"]
+    session = load_sessions([(path, str(labels))])
+    recording: LandmarkRecording = LandmarkRecording(path)
+    frames: int = len(recording)
+    active: np.ndarray = hysteresis_mask(
+        session.mouth_ratio[:frames], rule.threshold, rule.threshold - rule.hysteresis
+    )
+    expected: np.ndarray = simulate_triggers(
+        session.timestamps[:frames], active, rule.hold
+    )
+
+    keys: KeyRecorder = KeyRecorder()
+    controller: GestureController = GestureController(adaptive=False, key_sender=keys)
+    sent_at: List[float] = [
+        float(recording.timestamps[index])
+        for index, result in playback(recording, controller)
+        if result["last_key_sent_time"] == float(recording.timestamps[index])
+    ]
+
+    assert expected.size >= 6
+    assert keys.keys == ["down"] * expected.size
+    np.testing.assert_allclose(sent_at, expected)
+
+
+def test_rank_key_prefers_fewer_misses() -> None:
+    def result(missed: float, false: float, latency: float) -> SweepResult:
+        return SweepResult("down", 0.05, 1.0, false, missed, latency)
+
+    results: List[SweepResult] = [
+        result(0.0, 5.0, 900.0),
+        result(0.1, 0.0, 100.0),
+        result(0.0, 1.0, float("nan")),
+        result(0.0, 1.0, 800.0),
+    ]
+    ranked: List[SweepResult] = sorted(results, key=rank_key)
+    assert ranked == [results[3], results[2], results[0], results[1]]
+
+
+@pytest.mark.parametrize("duration", [0.1, 1.0])
+def test_simulate_triggers_restarts_hold_after_firing(duration: float) -> None:
+    timestamps: np.ndarray = np.arange(100) * 0.05
+    active: np.ndarray = np.ones(100, dtype=bool)
+    triggers: np.ndarray = simulate_triggers(timestamps, active, duration)
+    assert np.all(np.diff(triggers) > duration)
+    assert triggers[0] > duration
@@ -0,0 +1,137 @@
+import queue
+import sys
+from types import SimpleNamespace
+from typing import Any, Iterator, List, Tuple
+
+import numpy as np
+import pytest
+
+from gesturner.detector_pool import DetectorPool, DetectorResult, _worker_main
+from gesturner.roi_tracker import RoiTracker
+from tests.test_landmark_engine import FakeFaceMesh
+
+FRAME_SHAPE: Tuple[int, int, int] = (120, 160, 3)
+FEATURES: Tuple[str, ...] = ("mouth_open",)
+
+
+@pytest.fixture
+def pool() -> Iterator[DetectorPool]:
+    """ワーカーを起動せずにリングバッファだけを持つプール。"""
+    detector: DetectorPool = DetectorPool(workers=0, slots=2)
+    detector.start(FRAME_SHAPE)
+    yield detector
+    detector.close()
+
+
+def _outline(min_x: float, min_y: float, max_x: float, max_y: float) -> np.ndarray:
+    """外接矩形の四辺の中点を外形とする1顔分の配列を作ります。"""
+    cx: float = (min_x + max_x) / 2
+    cy: float = (min_y + max_y) / 2
+    return np.array(
+        [[cx, min_y, 0.0], [cx, max_y, 0.0], [min_x, cy, 0.0], [max_x, cy, 0.0]]
+    )
+
+
+def _result(*faces: Tuple[float, float, float, float], slot: int = 0) -> Any:
+    """顔ごとに特徴量をインデックス値とした結果を作ります。"""
+    outlines: np.ndarray = (
+        np.stack([_outline(*face) for face in faces]) if faces else np.empty((0, 4, 3))
+    )
+    return DetectorResult(
+        frame_id=0,
+        slot=slot,
+        features=FEATURES,
+        values=np.arange(len(faces), dtype=float).reshape(-1, 1),
+        outlines=outlines,
+        bounds=RoiTracker.bounds(outlines),
+        inference_ms=1.0,
+    )
+
+
+def test_submit_copies_into_free_slots_and_drops_when_full(
+    pool: DetectorPool,
+) -> None:
+    frames: List[np.ndarray] = [
+        np.full(FRAME_SHAPE, value, dtype=np.uint8) for value in (1, 2, 3)
+    ]
+    assert pool.submit(0, frames[0], FEATURES)
+    assert pool.submit(1, frames[1], FEATURES, refine=False)
+    assert not pool.submit(2, frames[2], FEATURES)
+    assert pool.dropped == 1
+
+    tasks: List[Any] = [pool._tasks.get(timeout=1.0) for _ in range(2)]
+    assert [task[0] for task in tasks] == [0, 1]
+    assert [task[3] for task in tasks] == [True, False]
+    assert pool._ring is not None
+    for frame_id, slot, features, _, box in tasks:
+        assert features == FEATURES and box is None
+        np.testing.assert_array_equal(pool._ring[slot], frames[frame_id])
+
+    # 結果を回収するとスロットが空き、再び依頼できる
+    pool._results.put(_result(slot=tasks[0][1]))
+    assert len(pool.collect(timeout=1.0)) == 1
+    assert pool.submit(3, frames[2], FEATURES)
+
+
+def test_submit_rejects_a_different_frame_shape(pool: DetectorPool) -> None:
+    with pytest.raises(ValueError, match="Frame shape changed"):
+        pool.submit(0, np.zeros((10, 10, 3), dtype=np.uint8), FEATURES)
+
+
+def test_select_follows_the_performer_and_tracks_its_region(
+    pool: DetectorPool,
+) -> None:
+    bystander: Tuple[float, float, float, float] = (0.0, 0.0, 0.1, 0.1)
+    performer: Tuple[float, float, float, float] = (0.4, 0.4, 0.7, 0.7)
+    np.testing.assert_array_equal(pool.select(_result(bystander, performer)), [1.0])
+    assert pool.roi_tracker is not None and pool.roi_tracker.box is not None
+    x0, y0, x1, y1 = pool.roi_tracker.box
+    assert x0 < 0.4 * 160 and x1 > 0.7 * 160 and y0 < 0.4 * 120 and y1 > 0.7 * 120
+
+    # 次のフレームは追跡中の領域をワーカーに渡す
+    pool.submit(0, np.zeros(FRAME_SHAPE, dtype=np.uint8), FEATURES)
+    assert pool._tasks.get(timeout=1.0)[4] == pool.roi_tracker.box
+
+    assert np.isnan(pool.select(_result())).all()
+    assert pool.roi_tracker.box is None
+
+
+def test_worker_returns_every_face(monkeypatch: pytest.MonkeyPatch) -> None:
+    module: Any = SimpleNamespace(
+        solutions=SimpleNamespace(face_mesh=SimpleNamespace(FaceMesh=FakeFaceMesh))
+    )
+    monkeypatch.setitem(sys.modules, "mediapipe", module)
+    detector: DetectorPool = DetectorPool(workers=0, slots=1)
+    detector.start(FRAME_SHAPE)
+    assert detector._shm is not None and detector._ring is not None
+    detector._ring[0, 10:50, 10:50] = 1
+    detector._ring[0, 60:110, 80:150] = 2
+
+    tasks: "queue.Queue[Any]" = queue.Queue()
+    results: "queue.Queue[DetectorResult]" = queue.Queue()
+    tasks.put((7, 0, FEATURES, False, None))
+    tasks.put(None)
+    try:
+        _worker_main(
+            detector._shm.name,
+            detector._ring.shape,
+            True,
+            2,
+            tasks,
+            results,
+        )
+    finally:
+        detector.close()
+
+    result: DetectorResult = results.get_nowait()
+    assert (result.frame_id, result.slot, result.refined) == (7, 0, False)
+    assert result.num_faces == 2
+    assert result.values.shape == (2, len(FEATURES))
+    np.testing.assert_allclose(
+        result.bounds,
+        [
+            [10 / 160, 10 / 120, 50 / 160, 50 / 120],
+            [80 / 160, 60 / 120, 150 / 160, 110 / 120],
+        ],
+        atol=1e-6,
+    )
@@ -0,0 +1,65 @@
+from typing import List
+
+import numpy as np
+
+from gesturner.gestures import GestureEngine, GestureRule
+
+FRAME_INTERVAL: float = 1.0 / 32.0
+
+
+def _run(engine: GestureEngine, values: List[float]) -> List[float]:
+    """値を1フレームずつ流し、キーを送信した時刻を返します。"""
+    fired_at: List[float] = []
+    for frame, value in enumerate(values):
+        timestamp: float = frame * FRAME_INTERVAL
+        if engine.update(np.array([value]), timestamp).any():
+            fired_at.append(timestamp)
+    return fired_at
+
+
+def test_hold_fires_after_duration_and_restarts() -> None:
+    engine: GestureEngine = GestureEngine(
+        [GestureRule("open", "mouth_open", 0.05, hold=0.5)], smoothing=False
+    )
+    # 0.5秒を超えた最初のフレーム（17フレーム目）で送信し、次のフレームから保持をやり直す
+    fired_at: List[float] = _run(engine, [0.1] * 40)
+    assert fired_at == [17 * FRAME_INTERVAL, 35 * FRAME_INTERVAL]
+
+
+def test_short_gesture_does_not_fire() -> None:
+    engine: GestureEngine = GestureEngine(
+        [GestureRule("open", "mouth_open", 0.05, hold=0.5)], smoothing=False
+    )
+    assert _run(engine, ([0.1] * 10 + [0.0]) * 4) == []
+
+
+def test_cooldown_suppresses_repeats() -> None:
+    engine: GestureEngine = GestureEngine(
+        [GestureRule("blink", "eye_openness", 0.01, "below", hold=0.1, cooldown=1.0)],
+        smoothing=False,
+    )
+    fired_at: List[float] = _run(engine, [0.0] * 64)
+    assert fired_at[0] == 4 * FRAME_INTERVAL
+    assert np.all(np.diff(fired_at) >= 1.0)
+    assert len(fired_at) == 2
+
+
+def test_hysteresis_keeps_gesture_active_until_exit() -> None:
+    engine: GestureEngine = GestureEngine(
+        [GestureRule("open", "mouth_open", 0.05, hysteresis=0.01, hold=0.5)],
+        smoothing=False,
+    )
+    # 閾値を下回っても exit（0.04）を上回る間は保持を続ける
+    values: List[float] = [0.06] + [0.045, 0.055] * 10
+    assert _run(engine, values) == [17 * FRAME_INTERVAL]
+    assert engine.state() == {"open": True}
+
+    engine.update(np.array([0.039]), len(values) * FRAME_INTERVAL)
+    assert engine.state() == {"open": False}
+
+
+def test_nan_ends_gesture() -> None:
+    engine: GestureEngine = GestureEngine(
+        [GestureRule("open", "mouth_open", 0.05, hold=0.5)], smoothing=False
+    )
+    assert _run(engine, [0.1] * 10 + [np.nan] + [0.1] * 10) == []
@@ -0,0 +1,160 @@
+import sys
+from types import SimpleNamespace
+from typing import Any, List, Tuple
+
+import numpy as np
+import pytest
+
+from gesturner.landmark_engine import LandmarkEngine
+from gesturner.landmarks import (
+    FACE_OUTLINE_INDICES,
+    NUM_LANDMARKS,
+    NUM_REFINED_LANDMARKS,
+)
+from gesturner.roi_tracker import RoiTracker
+
+FRAME_SHAPE: Tuple[int, int, int] = (480, 640, 3)
+
+
+class FakeFaceMesh:
+    """画像に描いた矩形を顔として返すFaceMesh。
+
+    画素値ごと（1, 2, ...）に1つの顔とみなし、その外接矩形の正規化座標で
+    外形のランドマークを、中心で残りのランドマークを返します。
+    """
+
+    instances: List["FakeFaceMesh"] = []
+
+    def __init__(self, max_num_faces: int, refine_landmarks: bool) -> None:
+        self.max_num_faces: int = max_num_faces
+        self.refine_landmarks: bool = refine_landmarks
+        self.shapes: List[Tuple[int, ...]] = []  # 推論した画像の shape
+        self.closed: bool = False
+        FakeFaceMesh.instances.append(self)
+
+    def process(self, image: np.ndarray) -> Any:
+        self.shapes.append(image.shape)
+        h, w = image.shape[:2]
+        count: int = NUM_REFINED_LANDMARKS if self.refine_landmarks else NUM_LANDMARKS
+        faces: List[Any] = []
+        for value in np.unique(image[..., 0])[1:][: self.max_num_faces]:
+            ys, xs = np.nonzero(image[..., 0] == value)
+            x0, x1 = xs.min() / w, (xs.max() + 1) / w
+            y0, y1 = ys.min() / h, (ys.max() + 1) / h
+            points: np.ndarray = np.tile(
+                [(x0 + x1) / 2, (y0 + y1) / 2, 0.0], (count, 1)
+            )
+            points[FACE_OUTLINE_INDICES] = [
+                [(x0 + x1) / 2, y0, 0.0],
+                [(x0 + x1) / 2, y1, 0.0],
+                [x0, (y0 + y1) / 2, 0.0],
+                [x1, (y0 + y1) / 2, 0.0],
+            ]
+            faces.append(
+                SimpleNamespace(
+                    landmark=[SimpleNamespace(x=x, y=y, z=z) for x, y, z in points]
+                )
+            )
+        return SimpleNamespace(multi_face_landmarks=faces or None)
+
+    def close(self) -> None:
+        self.closed = True
+
+
+@pytest.fixture(autouse=True)
+def fake_mediapipe(monkeypatch: pytest.MonkeyPatch) -> None:
+    """MediaPipeの代わりに FakeFaceMesh を使わせます。"""
+    FakeFaceMesh.instances = []
+    module: Any = SimpleNamespace(
+        solutions=SimpleNamespace(face_mesh=SimpleNamespace(FaceMesh=FakeFaceMesh))
+    )
+    monkeypatch.setitem(sys.modules, "mediapipe", module)
+
+
+def _frame(*faces: Tuple[int, int, int, int]) -> np.ndarray:
+    """(x0, y0, x1, y1) の矩形を画素値 1, 2, ... で描いたフレームを作ります。"""
+    frame: np.ndarray = np.zeros(FRAME_SHAPE, dtype=np.uint8)
+    for value, (x0, y0, x1, y1) in enumerate(faces, start=1):
+        frame[y0:y1, x0:x1] = value
+    return frame
+
+
+def _normalized(box: Tuple[int, int, int, int]) -> np.ndarray:
+    """ピクセル座標の矩形を正規化座標にします。"""
+    h, w = FRAME_SHAPE[:2]
+    x0, y0, x1, y1 = box
+    return np.array([x0 / w, y0 / h, x1 / w, y1 / h])
+
+
+def test_tracked_region_is_mapped_back_to_the_full_frame() -> None:
+    face: Tuple[int, int, int, int] = (300, 200, 400, 300)
+    engine: LandmarkEngine = LandmarkEngine()
+    mesh: FakeFaceMesh = FakeFaceMesh.instances[0]
+
+    first: np.ndarray = engine.process(_frame(face))
+    second: np.ndarray = engine.process(_frame(face))
+
+    # 1フレームにつき1回だけ推論し、2フレーム目は顔の周辺だけを推論する
+    assert mesh.shapes[0] == FRAME_SHAPE
+    assert len(mesh.shapes) == 2 and mesh.shapes[1][0] < FRAME_SHAPE[0]
+    for points in (first, second):
+        assert points.shape == (1, NUM_REFINED_LANDMARKS, 3)
+        np.testing.assert_allclose(
+            RoiTracker.bounds(points)[0], _normalized(face), atol=1e-6
+        )
+
+
+def test_lost_region_falls_back_to_the_full_frame() -> None:
+    engine: LandmarkEngine = LandmarkEngine()
+    mesh: FakeFaceMesh = FakeFaceMesh.instances[0]
+    engine.process(_frame((300, 200, 400, 300)))
+
+    # 追跡領域に顔が無ければフレーム全体で探索し直すが、離れた顔には
+    # patience フレームの間は乗り換えない
+    moved: Tuple[int, int, int, int] = (20, 20, 120, 120)
+    for _ in range(engine.performer.patience):
+        assert engine.process(_frame(moved)).shape[0] == 0
+        assert mesh.shapes[-1] == FRAME_SHAPE
+    points: np.ndarray = engine.process(_frame(moved))
+    np.testing.assert_allclose(
+        RoiTracker.bounds(points)[0], _normalized(moved), atol=1e-6
+    )
+
+
+def test_only_the_performer_is_converted() -> None:
+    performer: Tuple[int, int, int, int] = (300, 150, 460, 310)
+    bystander: Tuple[int, int, int, int] = (40, 40, 100, 100)
+    engine: LandmarkEngine = LandmarkEngine(
+        roi_tracking=False, max_num_faces=2, performer="largest"
+    )
+
+    points: np.ndarray = engine.process(_frame(bystander, performer))
+    assert points.shape == (1, NUM_REFINED_LANDMARKS, 3)
+    np.testing.assert_allclose(
+        RoiTracker.bounds(points)[0], _normalized(performer), atol=1e-6
+    )
+
+    faces: np.ndarray = engine.detect_faces(_frame(bystander, performer))
+    assert faces.shape == (2, NUM_REFINED_LANDMARKS, 3)
+
+
+def test_lite_mesh_is_created_on_demand_and_padded() -> None:
+    engine: LandmarkEngine = LandmarkEngine(roi_tracking=False)
+    assert len(FakeFaceMesh.instances) == 1
+
+    points: np.ndarray = engine.process(_frame((300, 200, 400, 300)), refine=False)
+    lite: FakeFaceMesh = FakeFaceMesh.instances[1]
+    assert not lite.refine_landmarks and len(lite.shapes) == 1
+    assert points.shape == (1, NUM_REFINED_LANDMARKS, 3)
+    assert np.isnan(points[0, NUM_LANDMARKS:]).all()
+    assert not np.isnan(points[0, :NUM_LANDMARKS]).any()
+
+    engine.close()
+    assert all(mesh.closed for mesh in FakeFaceMesh.instances)
+
+
+def test_no_face() -> None:
+    engine: LandmarkEngine = LandmarkEngine()
+    points: np.ndarray = engine.process(_frame())
+    assert points.shape == (0, NUM_REFINED_LANDMARKS, 3)
+    assert engine.roi_tracker is not None and engine.roi_tracker.box is None
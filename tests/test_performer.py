@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+from gesturner.performer import DEFAULT_MAX_FACES, PerformerSelector
+from gesturner.profile import Profile
+
+
+def _face(x: float, y: float, size: float) -> np.ndarray:
+    """中心 (x, y)、一辺 size の正方形の四隅を外形とする顔を作ります。"""
+    half: float = size / 2.0
+    return np.array(
+        [
+            [x - half, y - half, 0.0],
+            [x + half, y - half, 0.0],
+            [x - half, y + half, 0.0],
+            [x + half, y + half, 0.0],
+        ]
+    )
+
+
+def _faces(*faces: np.ndarray) -> np.ndarray:
+    """顔を形状 (F, N, 3) の配列にまとめます。"""
+    if not faces:
+        return np.empty((0, 4, 3))
+    return np.stack(faces)
+
+
+def test_default_detects_more_than_one_face() -> None:
+    assert DEFAULT_MAX_FACES >= 2
+    assert Profile().max_faces == DEFAULT_MAX_FACES
+
+
+def test_strategies() -> None:
+    small_center: np.ndarray = _face(0.5, 0.5, 0.1)
+    large_edge: np.ndarray = _face(0.2, 0.3, 0.3)
+    assert PerformerSelector("largest").select(_faces(small_center, large_edge)) == 1
+    assert PerformerSelector("central").select(_faces(small_center, large_edge)) == 0
+
+
+def test_unknown_strategy() -> None:
+    with pytest.raises(ValueError, match="Unknown performer strategy"):
+        PerformerSelector("loudest")
+
+
+def test_keeps_performer_when_a_larger_face_appears() -> None:
+    selector: PerformerSelector = PerformerSelector("largest")
+    assert selector.select(_faces(_face(0.5, 0.5, 0.2))) == 0
+    # 後から大きな顔が映り込んでも、少し動いた演者を選び続ける
+    bystander: np.ndarray = _face(0.2, 0.5, 0.4)
+    assert selector.select(_faces(bystander, _face(0.53, 0.5, 0.2))) == 1
+
+
+def test_waits_for_lost_performer_before_switching() -> None:
+    selector: PerformerSelector = PerformerSelector("largest", patience=2)
+    selector.select(_faces(_face(0.5, 0.5, 0.2)))
+    bystander: np.ndarray = _faces(_face(0.1, 0.5, 0.2))
+    # patience フレームの間は他の顔に乗り換えない
+    assert selector.select(bystander) == -1
+    assert selector.select(_faces()) == -1
+    assert selector.select(bystander) == 0
@@ -0,0 +1,114 @@
+import threading
+import time
+from typing import Any, List, Optional, Tuple
+
+import numpy as np
+
+from gesturner.pipeline import LatestQueue, Pipeline, ResultPacket, StageTimings
+
+
+class FakeSource:
+    """フレーム番号を画素値に持つフレームを count 枚返す映像入力。"""
+
+    def __init__(self, count: int, interval: float = 0.0) -> None:
+        self.count: int = count
+        self.interval: float = interval
+        self.index: int = 0
+        self.released: bool = False
+        self.captured_at: float = 0.0
+
+    def isOpened(self) -> bool:
+        return not self.released
+
+    def read(self) -> Tuple[bool, Optional[np.ndarray]]:
+        time.sleep(self.interval)
+        if self.index >= self.count:
+            return False, None
+        self.captured_at = 100.0 + self.index
+        frame: np.ndarray = np.full((2, 2, 3), self.index, dtype=np.uint8)
+        self.index += 1
+        return True, frame
+
+    def release(self) -> None:
+        self.released = True
+
+
+class FakeController:
+    """フレームの画素値と時刻を記録するだけのコントローラー。"""
+
+    def __init__(self, delay: float = 0.0) -> None:
+        self.delay: float = delay
+        self.processed: List[Tuple[int, float]] = []
+
+    def process(self, frame: np.ndarray, timestamp: float) -> Any:
+        time.sleep(self.delay)
+        self.processed.append((int(frame[0, 0, 0]), timestamp))
+        return {"frame": int(frame[0, 0, 0])}
+
+
+def _run(pipeline: Pipeline) -> List[ResultPacket]:
+    """映像入力が終わるまでパイプラインを動かし、受け取った結果を返します。"""
+    results: List[ResultPacket] = []
+    pipeline.start()
+    deadline: float = time.perf_counter() + 5.0
+    while pipeline.running and time.perf_counter() < deadline:
+        packet: Optional[ResultPacket] = pipeline.get_result(timeout=0.05)
+        if packet is not None:
+            results.append(packet)
+    pipeline.stop()
+    packet = pipeline.results.get(timeout=0)
+    if packet is not None:
+        results.append(packet)
+    return results
+
+
+def test_latest_queue_drops_oldest() -> None:
+    queue: LatestQueue[int] = LatestQueue(maxsize=2)
+    for item in range(5):
+        queue.put(item)
+    assert queue.dropped == 3
+    assert queue.get(timeout=0) == 3
+    assert queue.get(timeout=0) == 4
+    assert queue.get(timeout=0.01) is None
+
+
+def test_latest_queue_wakes_waiting_consumer() -> None:
+    queue: LatestQueue[str] = LatestQueue()
+    received: List[Optional[str]] = []
+    consumer: threading.Thread = threading.Thread(
+        target=lambda: received.append(queue.get(timeout=5.0))
+    )
+    consumer.start()
+    time.sleep(0.05)
+    queue.put("frame")
+    consumer.join(timeout=5.0)
+    assert received == ["frame"]
+
+
+def test_pipeline_processes_frames_in_order_with_capture_time() -> None:
+    source: FakeSource = FakeSource(5, interval=0.02)
+    controller: FakeController = FakeController()
+    timings: StageTimings = StageTimings()
+    results: List[ResultPacket] = _run(
+        Pipeline(lambda: source, controller, timings)  # type: ignore[arg-type]
+    )
+
+    assert source.released
+    assert controller.processed == [(i, 100.0 + i) for i in range(5)]
+    assert [r.frame.frame_id for r in results] == sorted(
+        r.frame.frame_id for r in results
+    )
+    assert results[-1].result == {"frame": 4}
+    assert {"capture", "queue", "inference"} <= set(timings.snapshot())
+
+
+def test_slow_inference_skips_to_the_latest_frame() -> None:
+    source: FakeSource = FakeSource(20, interval=0.005)
+    controller: FakeController = FakeController(delay=0.03)
+    pipeline: Pipeline = Pipeline(lambda: source, controller)  # type: ignore[arg-type]
+    _run(pipeline)
+
+    frames: List[int] = [frame for frame, _ in controller.processed]
+    assert len(frames) < 20
+    assert frames == sorted(frames)
+    assert pipeline.frames.dropped > 0
@@ -0,0 +1,80 @@
+import json
+from typing import Any, Dict
+
+import pytest
+
+from gesturner.profile import Profile
+
+
+@pytest.mark.parametrize(
+    "data, message",
+    [
+        ({"mouth_treshold": 0.05}, "unknown setting 'mouth_treshold'"),
+        ({"mouth_threshold": float("nan")}, "mouth_threshold"),
+        ({"look_up_duration": float("inf")}, "look_up_duration"),
+        ({"look_down_duration": -1.0}, "look_down_duration"),
+        ({"mouth_threshold": True}, "mouth_threshold"),
+        ({"gaze_up_threshold": 0.7}, "gaze_up_threshold must be below"),
+        ({"tier": "turbo"}, "tier must be one of"),
+        ({"performer": "loudest"}, "performer must be one of"),
+        ({"max_faces": 0}, "max_faces"),
+        ({"max_faces": True}, "max_faces"),
+        ({"tier_budget_ms": True}, "tier_budget_ms"),
+        ({"capture": {"resolution": "abc"}}, "capture.resolution"),
+        ({"capture": {"resolution": "0x480"}}, "capture.resolution"),
+        ({"capture": {"fourcc": "MJPEGX"}}, "capture.fourcc"),
+        ({"capture": {"fps": float("nan")}}, "capture.fps"),
+        ({"capture": {"fps": True}}, "capture.fps"),
+        ({"capture": {"source": False}}, "capture.source"),
+        ({"capture": {"buffer_size": True}}, "capture.buffer_size"),
+        ({"capture": {"max_width": True}}, "capture.max_width"),
+        ({"capture": {"zoom": 2}}, "capture: unknown setting 'zoom'"),
+        ({"gestures": {"mouth_open": {"threshold": "high"}}}, "finite number"),
+        ({"gestures": {"mouth_open": {"hold": -1.0}}}, "must not be negative"),
+        ({"gestures": {"mouth_open": {"cooldown": False}}}, "finite number"),
+        ({"gestures": {"mouth_open": {"speed": 1.0}}}, "unknown setting 'speed'"),
+        ({"gestures": {"wink": {"key": "a"}}}, "need feature and threshold"),
+        (
+            {"gestures": {"wink": {"feature": "wink", "threshold": 0.1}}},
+            "unknown feature",
+        ),
+        ({"overlay": {"x": 1}}, "overlay must be an object with x and y"),
+        ({"overlay": {"x": True, "y": 0}}, "overlay.x must be an integer"),
+    ],
+)
+def test_from_dict_rejects(data: Dict[str, Any], message: str) -> None:
+    with pytest.raises(ValueError, match=message):
+        Profile.from_dict(data)
+
+
+def test_from_dict_reports_every_error() -> None:
+    with pytest.raises(ValueError) as e:
+        Profile.from_dict({"tier": "turbo", "performer": "loudest"})
+    assert "tier" in str(e.value) and "performer" in str(e.value)
+
+
+def test_from_dict_accepts_valid_profile() -> None:
+    profile: Profile = Profile.from_dict(
+        {
+            "mouth_threshold": 0.06,
+            "gestures": {"look_up": None, "mouth_open": {"key": "pagedown"}},
+            "capture": {"resolution": "1280x720", "fourcc": "MJPG"},
+        }
+    )
+    assert profile.mouth_threshold == 0.06
+    assert profile.capture == {"resolution": "1280x720", "fourcc": "MJPG"}
+    profile.check_keys("os")
+
+
+def test_check_keys_rejects_unsupported_key() -> None:
+    profile: Profile = Profile.from_dict({"gestures": {"mouth_open": {"key": "pgdn"}}})
+    with pytest.raises(ValueError, match="'pgdn' is not supported by the os"):
+        profile.check_keys("os")
+
+
+def test_load_checks_keys(tmp_path) -> None:
+    path = tmp_path / "profile.json"
+    path.write_text(json.dumps({"gestures": {"mouth_open": {"key": "pgdn"}}}))
+    assert Profile.load(str(path)).gestures["mouth_open"] == {"key": "pgdn"}
+    with pytest.raises(ValueError, match="not supported"):
+        Profile.load(str(path), "os")
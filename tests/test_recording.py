@@ -0,0 +1,167 @@
+import os
+from dataclasses import replace
+from typing import List, Optional
+
+import numpy as np
+import pytest
+
+from gesturner.controller import GestureController
+from gesturner.gestures import BUILTIN_RULES, GestureRule
+from gesturner.key_controller import KeyRecorder
+from gesturner.recording import (
+    HEADER_SIZE,
+    KEY_SLOTS,
+    KEY_TABLE_SIZE,
+    LandmarkRecorder,
+    LandmarkRecording,
+    playback,
+)
+
+NUM_LANDMARKS: int = 8
+
+
+def _write(path: str, frames: int) -> List[Optional[np.ndarray]]:
+    """推論あり・顔なし・推論省略のフレームを混ぜて記録し、書き込んだ点を返します。"""
+    rng: np.random.Generator = np.random.default_rng(0)
+    recorder: LandmarkRecorder = LandmarkRecorder(path, NUM_LANDMARKS)
+    written: List[Optional[np.ndarray]] = []
+    for index in range(frames):
+        points: Optional[np.ndarray]
+        if index % 3 == 0:
+            points = rng.random((1, NUM_LANDMARKS, 3), dtype=np.float32)
+        elif index % 3 == 1:
+            points = np.empty((0, NUM_LANDMARKS, 3), dtype=np.float32)
+        else:
+            points = None
+        key: Optional[str] = {2: "down", 4: "pagedown", 7: "down"}.get(index)
+        recorder.write(10.0 + index * 0.5, points, index % 2 == 0, "UP", key)
+        written.append(points)
+    recorder.close()
+    return written
+
+
+def test_round_trip(tmp_path) -> None:
+    path: str = str(tmp_path / "session.gtlm")
+    written: List[Optional[np.ndarray]] = _write(path, 9)
+
+    recording: LandmarkRecording = LandmarkRecording(path)
+    assert len(recording) == 9
+    assert recording.num_landmarks == NUM_LANDMARKS
+    np.testing.assert_allclose(recording.timestamps, np.arange(9) * 0.5)
+    assert recording.inferred.tolist() == [p is not None for p in written]
+    assert [recording.key_name(i) for i in range(9)] == [
+        None,
+        None,
+        "down",
+        None,
+        "pagedown",
+        None,
+        None,
+        "down",
+        None,
+    ]
+    for index, points in enumerate(written):
+        loaded: Optional[np.ndarray] = recording.frame_points(index)
+        if points is None:
+            assert loaded is None
+        else:
+            assert loaded is not None
+            np.testing.assert_array_equal(loaded, points)
+
+
+def test_empty_recording(tmp_path) -> None:
+    path: str = str(tmp_path / "empty.gtlm")
+    LandmarkRecorder(path, NUM_LANDMARKS).close()
+    recording: LandmarkRecording = LandmarkRecording(path)
+    assert len(recording) == 0
+    assert recording.landmarks.shape == (0, NUM_LANDMARKS, 3)
+
+
+def test_truncated_recording_is_rejected(tmp_path) -> None:
+    path: str = str(tmp_path / "truncated.gtlm")
+    _write(path, 3)
+    with open(path, "r+b") as f:
+        f.truncate(os.path.getsize(path) - 5)
+    with pytest.raises(ValueError, match="Truncated"):
+        LandmarkRecording(path)
+
+
+def test_not_a_recording(tmp_path) -> None:
+    path = tmp_path / "other.bin"
+    path.write_bytes(b"\0" * (HEADER_SIZE + KEY_TABLE_SIZE))
+    with pytest.raises(ValueError, match="Not a landmark recording"):
+        LandmarkRecording(str(path))
+
+
+def test_key_name_too_long(tmp_path) -> None:
+    path = tmp_path / "k.gtlm"
+    with pytest.raises(ValueError, match="too long"):
+        LandmarkRecorder(str(path), 1, keys=["x" * 17])
+    assert not path.exists()
+
+
+def test_unrecordable_key_does_not_raise(tmp_path) -> None:
+    path: str = str(tmp_path / "full.gtlm")
+    recorder: LandmarkRecorder = LandmarkRecorder(path, 1)
+    recorder.key_names += recorder.check_keys(
+        f"k{i}" for i in range(KEY_SLOTS - len(recorder.key_names))
+    )
+    recorder.write(0.0, None, False, None, "x" * 17)
+    recorder.write(0.5, None, False, None, "extra")
+    recorder.close()
+
+    recording: LandmarkRecording = LandmarkRecording(path)
+    assert [recording.key_name(i) for i in range(2)] == [None, None]
+
+
+def test_refined_flag_round_trip(tmp_path) -> None:
+    path: str = str(tmp_path / "tier.gtlm")
+    recorder: LandmarkRecorder = LandmarkRecorder(path, NUM_LANDMARKS)
+    points: np.ndarray = np.zeros((1, NUM_LANDMARKS, 3), dtype=np.float32)
+    recorder.write(0.0, points, False, None, None, refined=True)
+    recorder.write(0.1, points, False, None, None, refined=False)
+    recorder.write(0.2, None, False, None, None, refined=True)
+    recorder.close()
+
+    recording: LandmarkRecording = LandmarkRecording(path)
+    assert recording.inferred.tolist() == [True, True, False]
+    assert recording.refined.tolist() == [True, False, False]
+
+
+class _RefinedSpy(GestureController):
+    """process_landmarks に渡された refined を記録するコントローラー。"""
+
+    def __init__(self) -> None:
+        super().__init__(adaptive=False, key_sender=KeyRecorder())
+        self.refined_flags: List[bool] = []
+
+    def process_landmarks(self, points, timestamp, refined=True):  # type: ignore
+        self.refined_flags.append(refined)
+        return super().process_landmarks(points, timestamp, refined)
+
+
+def test_playback_passes_refined_flag(tmp_path) -> None:
+    path: str = str(tmp_path / "tier.gtlm")
+    recorder: LandmarkRecorder = LandmarkRecorder(path, NUM_LANDMARKS)
+    points: np.ndarray = np.zeros((0, NUM_LANDMARKS, 3), dtype=np.float32)
+    for index, refined in enumerate([True, False, False, True]):
+        recorder.write(index * 0.1, points, False, None, None, refined=refined)
+    recorder.close()
+
+    controller: _RefinedSpy = _RefinedSpy()
+    list(playback(LandmarkRecording(path), controller))
+    assert controller.refined_flags == [True, False, False, True]
+
+
+def test_rules_with_unrecordable_keys_are_rejected(tmp_path) -> None:
+    recorder: LandmarkRecorder = LandmarkRecorder(str(tmp_path / "r.gtlm"), 1)
+    controller: GestureController = GestureController(
+        adaptive=False, key_sender=KeyRecorder(), recorder=recorder
+    )
+    rule: GestureRule = BUILTIN_RULES["mouth_open"]
+    with pytest.raises(ValueError, match="too long"):
+        controller.apply_rules([replace(rule, key="x" * 17)])
+    with pytest.raises(ValueError, match="too long"):
+        controller.update_rule("mouth_open", key="x" * 17)
+    assert controller.gestures["mouth_open"].key == rule.key
+    recorder.close()
@@ -0,0 +1,47 @@
+from typing import List
+
+import cv2
+import numpy as np
+import pytest
+
+mediapipe = pytest.importorskip("mediapipe")
+if not hasattr(mediapipe, "solutions"):
+    pytest.skip(
+        "FaceMesh (mediapipe.solutions) is not available", allow_module_level=True
+    )
+
+from gesturner.benchmark import CONFIGURATIONS, BenchmarkReport, benchmark  # noqa: E402
+from gesturner.controller import GestureController  # noqa: E402
+from gesturner.replay import ReplayFrame, replay  # noqa: E402
+
+FRAMES: int = 12
+
+
+@pytest.fixture
+def video(tmp_path) -> str:
+    """灰色の無地のフレームだけの短い動画を作ります。"""
+    path: str = str(tmp_path / "clip.avi")
+    writer: cv2.VideoWriter = cv2.VideoWriter(
+        path, cv2.VideoWriter_fourcc(*"MJPG"), 30.0, (320, 240)
+    )
+    frame: np.ndarray = np.full((240, 320, 3), 128, dtype=np.uint8)
+    for _ in range(FRAMES):
+        writer.write(frame)
+    writer.release()
+    return path
+
+
+def test_replay_smoke(video: str) -> None:
+    controller: GestureController = GestureController(adaptive=False)
+    frames: List[ReplayFrame] = list(replay(video, controller))
+    assert [f.index for f in frames] == list(range(FRAMES))
+    assert all(f.result["inferred"] for f in frames)
+    assert all(f.process_ms >= 0.0 for f in frames)
+
+
+@pytest.mark.parametrize("config", sorted(CONFIGURATIONS))
+def test_benchmark_smoke(video: str, config: str) -> None:
+    report: BenchmarkReport = benchmark(video, config)
+    assert report.config == config
+    assert report.frames == FRAMES
+    assert report.p50_ms <= report.p95_ms <= report.p99_ms
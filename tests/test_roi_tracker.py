@@ -0,0 +1,71 @@
+from typing import Tuple
+
+import numpy as np
+
+from gesturner.landmarks import NUM_LANDMARKS, NUM_REFINED_LANDMARKS
+from gesturner.roi_tracker import Box, RoiTracker
+
+FRAME_SHAPE: Tuple[int, int, int] = (480, 640, 3)
+
+
+def _face(min_x: float, min_y: float, max_x: float, max_y: float) -> np.ndarray:
+    """外接矩形が指定した正規化座標になる1顔分のランドマーク配列を作ります。"""
+    points: np.ndarray = np.zeros((1, NUM_REFINED_LANDMARKS, 3), dtype=np.float32)
+    points[0, :NUM_LANDMARKS, 0] = np.linspace(min_x, max_x, NUM_LANDMARKS)
+    points[0, :NUM_LANDMARKS, 1] = np.linspace(min_y, max_y, NUM_LANDMARKS)
+    points[0, NUM_LANDMARKS:, :2] = ((min_x + max_x) / 2, (min_y + max_y) / 2)
+    return points
+
+
+def test_to_full_frame() -> None:
+    box: Box = (100, 50, 300, 250)
+    points: np.ndarray = np.array(
+        [[[0.0, 0.0, 0.1], [1.0, 1.0, -0.2], [0.5, 0.25, 0.0]]], dtype=np.float32
+    )
+    RoiTracker.to_full_frame(points, box, FRAME_SHAPE)
+    np.testing.assert_allclose(
+        points[0],
+        [
+            [100 / 640, 50 / 480, 0.1 * 200 / 640],
+            [300 / 640, 250 / 480, -0.2 * 200 / 640],
+            [200 / 640, 100 / 480, 0.0],
+        ],
+        rtol=1e-6,
+    )
+
+
+def test_bounds_ignore_iris() -> None:
+    points: np.ndarray = _face(0.2, 0.3, 0.4, 0.6)
+    points[0, NUM_LANDMARKS:] = np.nan
+    np.testing.assert_allclose(
+        RoiTracker.bounds(points), [[0.2, 0.3, 0.4, 0.6]], rtol=1e-6
+    )
+
+
+def test_update_pads_a_square_and_clips_to_the_frame() -> None:
+    tracker: RoiTracker = RoiTracker(padding=0.5)
+    tracker.update(_face(0.25, 0.25, 0.5, 0.5), FRAME_SHAPE)
+    # 幅160px・高さ120px の顔の中心 (240, 180) から一辺 160 × 2 の正方形
+    assert tracker.box == (80, 20, 400, 340)
+
+    tracker.update(_face(0.0, 0.0, 0.1, 0.1), FRAME_SHAPE)
+    assert tracker.box is not None and tracker.box[:2] == (0, 0)
+
+    tracker.update(_face(0, 0, 0, 0)[:0], FRAME_SHAPE)
+    assert tracker.box is None
+
+
+def test_crop_to_downscales_large_regions() -> None:
+    frame: np.ndarray = np.zeros(FRAME_SHAPE, dtype=np.uint8)
+    tracker: RoiTracker = RoiTracker(max_size=100)
+
+    roi, box = tracker.crop_to(frame, (0, 0, 400, 200))
+    assert box == (0, 0, 400, 200)
+    assert roi.shape == (50, 100, 3)
+
+    roi, box = tracker.crop_to(frame, (10, 20, 60, 90))
+    assert box == (10, 20, 60, 90)
+    assert roi.shape == (70, 50, 3)
+
+    roi, box = tracker.crop(frame)
+    assert box is None and roi is frame
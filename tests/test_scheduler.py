@@ -0,0 +1,72 @@
+from typing import List, Optional
+
+import numpy as np
+import pytest
+
+from gesturner.controller import GestureController
+from gesturner.key_controller import KeyRecorder
+from gesturner.scheduler import AdaptiveScheduler
+
+# 2進数で割り切れるフレーム間隔（1秒 = 32フレーム）
+FRAME_INTERVAL: float = 1.0 / 32.0
+
+
+def _onset_latency(onset_frame: int, adaptive: bool, smoothing: bool) -> float:
+    """口を急に開けてから下キーが送信されるまでの時間を、推論頻度の調整込みで求めます。"""
+    keys: KeyRecorder = KeyRecorder()
+    controller: GestureController = GestureController(
+        adaptive=adaptive, key_sender=keys, smoothing=smoothing
+    )
+    features: List[str] = controller.gesture_engine.features
+    for frame in range(onset_frame + 96):
+        timestamp: float = frame * FRAME_INTERVAL
+        values: Optional[np.ndarray] = None
+        if controller.should_infer(timestamp):
+            values = np.array(
+                [
+                    {"mouth_open": 0.1 if frame >= onset_frame else 0.01}.get(name, 0.5)
+                    for name in features
+                ]
+            )
+        result = controller.process_features(values, timestamp)
+        if keys.keys:
+            assert keys.keys == ["down"]
+            return result["last_key_sent_time"] - onset_frame * FRAME_INTERVAL
+    pytest.fail("key was not sent")
+
+
+@pytest.mark.parametrize("smoothing", [True, False])
+@pytest.mark.parametrize("phase", range(4))
+def test_idle_rate_delays_onset_by_at_most_idle_interval(
+    smoothing: bool, phase: int
+) -> None:
+    hold: float = 1.0
+    idle_interval: float = AdaptiveScheduler().idle_interval
+    latency: float = _onset_latency(64 + phase, adaptive=True, smoothing=smoothing)
+    # 推論は idle_interval が経過した次のフレームで行われる
+    assert latency <= hold + idle_interval + FRAME_INTERVAL
+
+
+def test_full_rate_onset_latency_is_hold_plus_filter_lag() -> None:
+    latency: float = _onset_latency(64, adaptive=False, smoothing=True)
+    assert 1.0 < latency <= 1.0 + 3 * FRAME_INTERVAL
+
+
+def test_near_threshold_returns_to_full_rate() -> None:
+    controller: GestureController = GestureController(key_sender=KeyRecorder())
+    features: List[str] = controller.gesture_engine.features
+    scheduler: Optional[AdaptiveScheduler] = controller.scheduler
+    assert scheduler is not None
+
+    def values(mouth: float) -> np.ndarray:
+        return np.array([{"mouth_open": mouth}.get(name, 0.5) for name in features])
+
+    frame: int = 0
+    while not scheduler.idle:
+        controller.process_features(values(0.01), frame * FRAME_INTERVAL)
+        frame += 1
+    timestamp: float = frame * FRAME_INTERVAL + scheduler.idle_interval
+    assert controller.should_infer(timestamp)
+    # 閾値（0.05）の approach の幅（0.02）に入ったら、次のフレームから毎フレーム推論する
+    controller.process_features(values(0.04), timestamp)
+    assert controller.should_infer(timestamp + FRAME_INTERVAL)